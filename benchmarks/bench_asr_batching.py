@@ -0,0 +1,123 @@
+"""
+Throughput of ASR with concurrent voice clients, with and without batching.
+
+Every client sends utterances one after another. They are transcribed either
+each in its own thread (as before ASRBatcher), or through ASRBatcher. Prints
+utterances per second as the number of clients grows.
+
+By default, the model is simulated: a forward pass costs --pass-ms plus
+--utterance-ms per utterance of the batch, and runs one at a time (like
+threads contending for one model). With --conf, the ASR engine configured in
+that file is benchmarked instead, on --wav (or on noise).
+
+Usage (from the project root):
+    uv run python benchmarks/bench_asr_batching.py [--clients 1 2 4 8 16 32]
+    uv run python benchmarks/bench_asr_batching.py --conf conf.yaml --wav speech.wav
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from typing import List
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from open_llm_vtuber.asr.asr_batcher import ASRBatcher
+
+
+class SimulatedASR:
+    """A model whose forward pass has a fixed cost and a cost per utterance"""
+
+    BATCH_INFERENCE = True
+
+    def __init__(self, pass_ms: float, utterance_ms: float):
+        self.pass_seconds = pass_ms / 1000
+        self.utterance_seconds = utterance_ms / 1000
+        self._model_lock = threading.Lock()
+
+    def transcribe_np(self, audio: np.ndarray) -> str:
+        return self.transcribe_batch_np([audio])[0]
+
+    def transcribe_batch_np(self, audios: List[np.ndarray]) -> List[str]:
+        with self._model_lock:
+            time.sleep(self.pass_seconds + self.utterance_seconds * len(audios))
+        return ["hello" for _ in audios]
+
+
+def load_engine(conf_path: str):
+    from open_llm_vtuber.asr.asr_factory import ASRFactory
+    from open_llm_vtuber.config_manager.utils import read_yaml, validate_config
+
+    asr_config = validate_config(read_yaml(conf_path)).character_config.asr_config
+    return ASRFactory.get_asr_system(
+        asr_config.asr_model,
+        **getattr(asr_config, asr_config.asr_model).model_dump(),
+    )
+
+
+def load_audio(wav_path: str | None, seconds: float) -> np.ndarray:
+    if wav_path:
+        import soundfile as sf
+
+        audio, _ = sf.read(wav_path, dtype="float32")
+        return audio if audio.ndim == 1 else audio.mean(axis=1)
+    rng = np.random.default_rng(0)
+    return rng.uniform(-0.1, 0.1, int(seconds * 16000)).astype(np.float32)
+
+
+async def run_clients(
+    transcribe, clients: int, utterances: int, audio: np.ndarray
+) -> float:
+    """Utterances per second when every client sends `utterances` in turn"""
+
+    async def client() -> None:
+        for _ in range(utterances):
+            await transcribe(audio)
+
+    started = time.monotonic()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return clients * utterances / (time.monotonic() - started)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--utterances", type=int, default=5)
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    parser.add_argument("--pass-ms", type=float, default=50)
+    parser.add_argument("--utterance-ms", type=float, default=5)
+    parser.add_argument("--conf", help="benchmark the ASR engine of this config")
+    parser.add_argument("--wav", help="utterance to transcribe (16 kHz)")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    if args.conf:
+        engine = load_engine(args.conf)
+    else:
+        engine = SimulatedASR(args.pass_ms, args.utterance_ms)
+    audio = load_audio(args.wav, args.seconds)
+
+    async def in_thread(audio: np.ndarray) -> str:
+        return await asyncio.to_thread(engine.transcribe_np, audio)
+
+    for clients in args.clients:
+        threads = await run_clients(in_thread, clients, args.utterances, audio)
+        batcher = ASRBatcher(engine, args.max_batch_size, args.max_wait_ms)
+        batched = await run_clients(batcher.transcribe, clients, args.utterances, audio)
+        stats = batcher.stats()
+        print(
+            f"{clients:3d} clients: threads {threads:7.1f} utt/s, "
+            f"batched {batched:7.1f} utt/s ({batched / threads:.1f}x, "
+            f"avg batch {stats['avg_batch_size']:.1f}, "
+            f"avg wait {stats['avg_wait_ms']:.0f} ms)"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+"""
+CPU cost of Silero VAD with concurrent microphones, per window and batched.
+
+Every client sends a chunk of --chunk-ms of audio at a time. The windows are
+evaluated either one forward pass per window and per client (as before
+batching), or all together: one forward pass per window index, for all
+clients at once. Prints the CPU time per second of audio per client.
+
+Usage (from the project root):
+    uv run python benchmarks/bench_vad_batching.py [--clients 1 2 4 8 16 32]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import torch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from open_llm_vtuber.vad.silero import RecurrentState, SileroVADModel
+
+WINDOW = 512
+SAMPLE_RATE = 16000
+
+
+def per_window(model: SileroVADModel, states, chunks) -> None:
+    for state, windows in zip(states, chunks):
+        for window in windows:
+            model.speech_probs([(state, window[None])])
+
+
+def batched(model: SileroVADModel, states, chunks) -> None:
+    model.speech_probs(list(zip(states, chunks)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--chunk-ms", type=float, default=256)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--threads", type=int, default=1, help="torch threads")
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    model = SileroVADModel(SAMPLE_RATE)
+    rng = np.random.default_rng(0)
+    windows_per_chunk = max(1, int(args.chunk_ms / 1000 * SAMPLE_RATE) // WINDOW)
+    chunk_count = max(1, int(args.seconds * SAMPLE_RATE) // WINDOW // windows_per_chunk)
+    audio_seconds = chunk_count * windows_per_chunk * WINDOW / SAMPLE_RATE
+
+    for clients in args.clients:
+        results = {}
+        for name, run in (("per window", per_window), ("batched", batched)):
+            states = [RecurrentState() for _ in range(clients)]
+            started = time.process_time()
+            for _ in range(chunk_count):
+                chunks = rng.uniform(
+                    -0.1, 0.1, (clients, windows_per_chunk, WINDOW)
+                ).astype(np.float32)
+                run(model, states, chunks)
+            cpu = time.process_time() - started
+            results[name] = cpu / audio_seconds / clients * 1000
+        print(
+            f"{clients:3d} clients: per window {results['per window']:6.2f} ms, "
+            f"batched {results['batched']:6.2f} ms of CPU per second of audio "
+            f"per client ({results['per window'] / results['batched']:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Micro-benchmark of the volume envelope sent with every audio payload.
+
+Compares `_get_volume_by_chunks` (one NumPy pass) with the previous
+implementation based on pydub's make_chunks and AudioSegment.rms, checks that
+both give the same output and prints the time per call.
+
+Usage (from the project root):
+    uv run python benchmarks/bench_volume_envelope.py [--seconds 10] [--chunk-ms 20]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+from pydub import AudioSegment
+from pydub.utils import make_chunks
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from open_llm_vtuber.utils.stream_audio import _get_volume_by_chunks
+
+
+def pydub_volume_by_chunks(audio: AudioSegment, chunk_length_ms: int) -> list:
+    """The previous implementation, kept as the reference"""
+    chunks = make_chunks(audio, chunk_length_ms)
+    volumes = [chunk.rms for chunk in chunks]
+    max_volume = max(volumes)
+    if max_volume == 0:
+        raise ValueError("Audio is empty or all zero.")
+    return [volume / max_volume for volume in volumes]
+
+
+def make_speech_like_audio(
+    seconds: float, frame_rate: int, channels: int, sample_width: int
+) -> AudioSegment:
+    """Noise with a slowly varying envelope, roughly like speech"""
+    rng = np.random.default_rng(0)
+    n = int(seconds * frame_rate)
+    envelope = np.abs(np.sin(np.linspace(0, seconds * 3 * np.pi, n)))
+    max_amplitude = 2 ** (8 * sample_width - 1) - 1
+    samples = rng.uniform(-1, 1, (n, channels)) * envelope[:, None] * max_amplitude
+    dtype = {1: np.int8, 2: np.int16, 4: np.int32}[sample_width]
+    return AudioSegment(
+        samples.astype(dtype).tobytes(),
+        frame_rate=frame_rate,
+        sample_width=sample_width,
+        channels=channels,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--chunk-ms", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for frame_rate, channels, sample_width in [
+        (24000, 1, 2),
+        (22050, 1, 2),
+        (44100, 2, 2),
+        (16000, 1, 4),
+    ]:
+        audio = make_speech_like_audio(args.seconds, frame_rate, channels, sample_width)
+        expected = pydub_volume_by_chunks(audio, args.chunk_ms)
+        actual = _get_volume_by_chunks(audio, args.chunk_ms)
+        assert len(actual) == len(expected)
+        assert np.allclose(actual, expected, rtol=0, atol=1e-12)
+
+        before = timeit.timeit(
+            lambda audio=audio: pydub_volume_by_chunks(audio, args.chunk_ms),
+            number=args.repeat,
+        )
+        after = timeit.timeit(
+            lambda audio=audio: _get_volume_by_chunks(audio, args.chunk_ms),
+            number=args.repeat,
+        )
+        print(
+            f"{frame_rate} Hz, {channels} ch, {8 * sample_width} bit, "
+            f"{args.seconds:g} s, {len(actual)} chunks: "
+            f"pydub {before / args.repeat * 1000:.2f} ms, "
+            f"numpy {after / args.repeat * 1000:.2f} ms "
+            f"({before / after:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -66,6 +66,8 @@ class AgentFactory:
                 ),
                 segment_method=basic_memory_settings.get("segment_method", "pysbd"),
                 interrupt_method=interrupt_method,
+                coalesce_max_chars=basic_memory_settings.get("coalesce_max_chars", 80),
+                coalesce_linger_ms=basic_memory_settings.get("coalesce_linger_ms", 150),
             )
 
         elif conversation_agent_choice == "mem0_agent":
@@ -1,9 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import AsyncIterator
+from typing import AsyncIterator, List
 from loguru import logger
 
 from ..output_types import BaseOutput
 from ..input_types import BaseInput
+from ...chat_history_manager import HistoryMessage
 
 
 class AgentInterface(ABC):
@@ -43,12 +44,22 @@ class AgentInterface(ABC):
         pass
 
     @abstractmethod
-    def set_memory_from_history(self, conf_uid: str, history_uid: str) -> None:
+    def set_memory_from_history(
+        self,
+        conf_uid: str,
+        history_uid: str,
+        messages: List[HistoryMessage] | None = None,
+        metadata: dict | None = None,
+    ) -> None:
         """
         Load the agent's working memory from chat history
 
         Args:
             conf_uid: str - Configuration ID
             history_uid: str - History ID
+            messages: List[HistoryMessage] | None - Messages of the history if
+                the caller already read them, to avoid reading them again
+            metadata: dict | None - Metadata of the history if the caller
+                already read it
         """
         pass
@@ -4,11 +4,12 @@ from loguru import logger
 from .agent_interface import AgentInterface
 from ..output_types import SentenceOutput, DisplayText
 from ..stateless_llm.stateless_llm_interface import StatelessLLMInterface
-from ...chat_history_manager import get_history
+from ...chat_history_manager import get_history, HistoryMessage
 from ..transformers import (
     sentence_divider,
     actions_extractor,
     tts_filter,
+    sentence_coalescer,
     display_processor,
 )
 from ...config_manager import TTSPreprocessorConfig
@@ -37,6 +38,8 @@ class BasicMemoryAgent(AgentInterface):
         faster_first_response: bool = True,
         segment_method: str = "pysbd",
         interrupt_method: Literal["system", "user"] = "user",
+        coalesce_max_chars: int = 80,
+        coalesce_linger_ms: int = 150,
     ):
         """
         Initialize the agent with LLM, system prompt and configuration
@@ -50,6 +53,9 @@ class BasicMemoryAgent(AgentInterface):
             segment_method: `str` - Method for sentence segmentation
             interrupt_method: `Literal["system", "user"]` -
                 Methods for writing interruptions signal in chat history.
+            coalesce_max_chars: `int` - Merge the short sentences following the
+                first one up to this many characters (0 to disable)
+            coalesce_linger_ms: `int` - How long to wait for a sentence to merge
 
         """
         super().__init__()
@@ -58,6 +64,8 @@ class BasicMemoryAgent(AgentInterface):
         self._tts_preprocessor_config = tts_preprocessor_config
         self._faster_first_response = faster_first_response
         self._segment_method = segment_method
+        self._coalesce_max_chars = coalesce_max_chars
+        self._coalesce_linger_ms = coalesce_linger_ms
         self.interrupt_method = interrupt_method
         # Flag to ensure a single interrupt handling per conversation
         self._interrupt_handled = False
@@ -126,9 +134,16 @@ class BasicMemoryAgent(AgentInterface):
 
         self._memory.append(message_data)
 
-    def set_memory_from_history(self, conf_uid: str, history_uid: str) -> None:
+    def set_memory_from_history(
+        self,
+        conf_uid: str,
+        history_uid: str,
+        messages: List[HistoryMessage] | None = None,
+        metadata: dict | None = None,
+    ) -> None:
         """Load the memory from chat history"""
-        messages = get_history(conf_uid, history_uid)
+        if messages is None:
+            messages = get_history(conf_uid, history_uid)
 
         self._memory = []
         self._memory.append(
@@ -243,8 +258,12 @@ class BasicMemoryAgent(AgentInterface):
 
         The pipeline:
         LLM tokens -> sentence_divider -> actions_extractor -> display_processor -> tts_filter
+        -> sentence_coalescer
         """
 
+        @sentence_coalescer(
+            max_chars=self._coalesce_max_chars, linger_ms=self._coalesce_linger_ms
+        )
         @tts_filter(self._tts_preprocessor_config)
         @display_processor()
         @actions_extractor(self._live2d_model)
@@ -1,6 +1,6 @@
 import asyncio
 import base64
-from typing import AsyncIterator, Optional
+from typing import AsyncIterator, List, Optional
 import json
 import websockets
 from loguru import logger
@@ -9,7 +9,8 @@ from pathlib import Path
 from .agent_interface import AgentInterface
 from ..output_types import AudioOutput, Actions, DisplayText
 from ..input_types import BatchInput
-from ...chat_history_manager import get_metadata, update_metadate
+from ...chat_history_manager import get_metadata, update_metadate, HistoryMessage
+from ...utils.cache_manager import get_cache_manager
 
 
 class HumeAIAgent(AgentInterface):
@@ -87,7 +88,8 @@ class HumeAIAgent(AgentInterface):
                 new_chat_group_id = data.get("chat_group_id")
 
                 if not resume_chat_group_id and self._current_history_uid:
-                    update_metadate(
+                    await asyncio.to_thread(
+                        update_metadate,
                         self._current_conf_uid,
                         self._current_history_uid,
                         {"resume_id": new_chat_group_id, "agent_type": self.AGENT_TYPE},
@@ -119,18 +121,27 @@ class HumeAIAgent(AgentInterface):
         if not self._connected or not self._ws or self._ws.closed:
             await self.connect(self._chat_group_id)
 
-    def set_memory_from_history(self, conf_uid: str, history_uid: str) -> None:
+    def set_memory_from_history(
+        self,
+        conf_uid: str,
+        history_uid: str,
+        messages: List[HistoryMessage] | None = None,
+        metadata: dict | None = None,
+    ) -> None:
         """
         Set chat group ID based on history
 
         Args:
             conf_uid: Configuration ID
             history_uid: History ID
+            messages: Unused, Hume AI keeps the conversation on its side
+            metadata: Metadata of the history, read here if None
         """
         self._current_conf_uid = conf_uid
         self._current_history_uid = history_uid
 
-        metadata = get_metadata(conf_uid, history_uid)
+        if metadata is None:
+            metadata = get_metadata(conf_uid, history_uid)
 
         agent_type = metadata.get("agent_type")
         if agent_type and agent_type != self.AGENT_TYPE:
@@ -198,7 +209,9 @@ class HumeAIAgent(AgentInterface):
                     elif msg_type == "audio_output":
                         if msg_id == self._current_id and self._current_text:
                             audio_data = base64.b64decode(response_data["data"])
-                            cache_file = self.cache_dir / f"evi_audio_{msg_id}.wav"
+                            cache_file = get_cache_manager().temp_path(
+                                f"evi_audio_{msg_id}_", ".wav"
+                            )
 
                             with open(cache_file, "wb") as f:
                                 f.write(audio_data)
@@ -206,7 +219,7 @@ class HumeAIAgent(AgentInterface):
 
                             # Create AudioOutput with DisplayText
                             yield AudioOutput(
-                                audio_path=str(cache_file),
+                                audio_path=cache_file,
                                 display_text=DisplayText(text=self._current_text),
                                 transcript=self._current_text,
                                 actions=Actions(),
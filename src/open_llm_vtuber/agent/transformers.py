@@ -1,3 +1,4 @@
+import asyncio
 from typing import AsyncIterator, Tuple, Callable, List
 from functools import wraps
 from .output_types import Actions, SentenceOutput, DisplayText
@@ -147,3 +148,124 @@ def tts_filter(
         return wrapper
 
     return decorator
+
+
+def _join_text(first: str, second: str) -> str:
+    """Join two sentences, with a space unless the first one ends with a
+    non-ASCII character (e.g. CJK punctuation, where no space is used)"""
+    if not first or not second or first[-1].isspace() or second[0].isspace():
+        return first + second
+    if ord(first[-1]) < 128:
+        return f"{first} {second}"
+    return first + second
+
+
+def _merge_actions(actions: List[Actions]) -> Actions:
+    merged = Actions()
+    for field in ("expressions", "pictures", "sounds"):
+        values = [
+            value for action in actions for value in (getattr(action, field) or [])
+        ]
+        if values:
+            setattr(merged, field, values)
+    return merged
+
+
+def _merge_sentences(sentences: List[SentenceOutput]) -> SentenceOutput:
+    if len(sentences) == 1:
+        return sentences[0]
+    display_text = ""
+    tts_text = ""
+    for sentence in sentences:
+        display_text = _join_text(display_text, sentence.display_text.text)
+        tts_text = _join_text(tts_text, sentence.tts_text)
+    first_display = sentences[0].display_text
+    return SentenceOutput(
+        display_text=DisplayText(
+            text=display_text, name=first_display.name, avatar=first_display.avatar
+        ),
+        tts_text=tts_text,
+        actions=_merge_actions([sentence.actions for sentence in sentences]),
+    )
+
+
+def sentence_coalescer(max_chars: int = 80, linger_ms: int = 150):
+    """
+    Decorator that merges consecutive short sentences into one, so that they
+    are synthesized and sent as one audio clip.
+
+    The first sentence is always passed through at once. The next ones are
+    held and merged until adding a sentence would exceed `max_chars`, or no
+    new sentence came for `linger_ms`. Sentences without TTS text (e.g. think
+    tags) are never merged.
+
+    Args:
+        max_chars: int - Maximum length of the TTS text of a merged sentence
+            (0 to disable merging)
+        linger_ms: int - How long to wait for a next sentence to merge
+    """
+
+    def decorator(
+        func: Callable[..., AsyncIterator[SentenceOutput]],
+    ) -> Callable[..., AsyncIterator[SentenceOutput]]:
+        @wraps(func)
+        async def wrapper(*args, **kwargs) -> AsyncIterator[SentenceOutput]:
+            stream = func(*args, **kwargs)
+            if max_chars <= 0:
+                async for sentence in stream:
+                    yield sentence
+                return
+
+            stream = stream.__aiter__()
+            linger = linger_ms / 1000
+            buffer: List[SentenceOutput] = []
+            buffered_chars = 0
+            first_sent = False
+            next_sentence: asyncio.Task | None = None
+
+            try:
+                while True:
+                    if next_sentence is None:
+                        next_sentence = asyncio.ensure_future(stream.__anext__())
+                    done, _ = await asyncio.wait(
+                        {next_sentence}, timeout=linger if buffer else None
+                    )
+                    if not done:
+                        # Nothing new in time: send what we have
+                        yield _merge_sentences(buffer)
+                        buffer, buffered_chars = [], 0
+                        continue
+
+                    task, next_sentence = next_sentence, None
+                    try:
+                        sentence = task.result()
+                    except StopAsyncIteration:
+                        break
+
+                    tts_chars = len(sentence.tts_text.strip())
+                    if not first_sent or tts_chars == 0:
+                        if buffer:
+                            yield _merge_sentences(buffer)
+                            buffer, buffered_chars = [], 0
+                        first_sent = True
+                        yield sentence
+                        continue
+
+                    if buffer and buffered_chars + tts_chars > max_chars:
+                        yield _merge_sentences(buffer)
+                        buffer, buffered_chars = [], 0
+                    buffer.append(sentence)
+                    buffered_chars += tts_chars
+                    if buffered_chars >= max_chars:
+                        yield _merge_sentences(buffer)
+                        buffer, buffered_chars = [], 0
+            finally:
+                if next_sentence is not None:
+                    next_sentence.cancel()
+
+            if buffer:
+                yield _merge_sentences(buffer)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,182 @@
+import time
+import asyncio
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+from loguru import logger
+
+
+@dataclass(eq=False)
+class _Request:
+    audio: np.ndarray
+    future: asyncio.Future
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+class ASRBatcher:
+    """Runs the transcriptions of all clients sharing an ASR engine in
+    batches, one batch at a time.
+
+    Threads transcribing at once contend for the same model, so instead a
+    single worker takes the utterances waiting (up to `max_batch_size`,
+    waiting at most `max_wait_ms` for more once the first one arrived) and
+    transcribes them with one `transcribe_batch_np` call. While a batch runs,
+    the next one fills up. Engines whose model cannot run a batch in one pass
+    (no `BATCH_INFERENCE`) get one utterance at a time, so that each one is
+    answered as soon as it is transcribed.
+
+    `model_lock` is held while the model runs; other users of the model
+    (e.g. streams decoding partial transcripts) take it too.
+    """
+
+    def __init__(self, asr_engine, max_batch_size: int = 8, max_wait_ms: float = 5):
+        self.asr_engine = asr_engine
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+        self.model_lock = threading.Lock()
+
+        self._queue: List[_Request] = []
+        self._queued = asyncio.Event()
+        self._worker: asyncio.Task | None = None
+        self._worker_loop: asyncio.AbstractEventLoop | None = None
+
+        self.batches = 0
+        self.utterances = 0
+        self.max_batch = 0
+        self._total_wait = 0.0
+        self._total_inference = 0.0
+
+    async def transcribe(self, audio: np.ndarray) -> str:
+        """Transcribe an utterance in the next batch"""
+        self._ensure_worker()
+        request = _Request(audio, asyncio.get_running_loop().create_future())
+        self._queue.append(request)
+        self._queued.set()
+        try:
+            return await request.future
+        except asyncio.CancelledError:
+            if request in self._queue:
+                self._queue.remove(request)
+            raise
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker_loop is not loop:
+            self._queued = asyncio.Event()
+            self._worker = loop.create_task(self._run())
+            self._worker_loop = loop
+
+    async def _run(self) -> None:
+        while True:
+            if not self._queue:
+                self._queued.clear()
+                await self._queued.wait()
+
+            batch_size = self.max_batch_size if self.asr_engine.BATCH_INFERENCE else 1
+
+            # Give other utterances a chance to join the batch
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+            while len(self._queue) < batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._queued.clear()
+                try:
+                    await asyncio.wait_for(self._queued.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            batch = self._queue[:batch_size]
+            del self._queue[:batch_size]
+            batch = [request for request in batch if not request.future.done()]
+            if batch:
+                await self._run_batch(batch)
+
+    async def _run_batch(self, batch: List[_Request]) -> None:
+        started = time.monotonic()
+        try:
+            texts = await asyncio.to_thread(
+                self._transcribe_batch, [request.audio for request in batch]
+            )
+        except Exception as e:
+            logger.error(
+                f"Batched transcription of {len(batch)} utterances failed: {e}"
+            )
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        for request, text in zip(batch, texts):
+            if not request.future.done():
+                request.future.set_result(text)
+        if len(texts) < len(batch):
+            error = RuntimeError(
+                f"ASR engine returned {len(texts)} transcriptions "
+                f"for {len(batch)} utterances"
+            )
+            logger.error(str(error))
+            for request in batch[len(texts) :]:
+                if not request.future.done():
+                    request.future.set_exception(error)
+
+        self.batches += 1
+        self.utterances += len(batch)
+        self.max_batch = max(self.max_batch, len(batch))
+        self._total_wait += sum(started - request.queued_at for request in batch)
+        self._total_inference += time.monotonic() - started
+
+    def _transcribe_batch(self, audios: List[np.ndarray]) -> List[str]:
+        with self.model_lock:
+            return self.asr_engine.transcribe_batch_np(audios)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "queued": len(self._queue),
+            "batches": self.batches,
+            "utterances": self.utterances,
+            "avg_batch_size": self.utterances / self.batches if self.batches else 0.0,
+            "max_batch": self.max_batch,
+            "avg_wait_ms": (
+                self._total_wait / self.utterances * 1000 if self.utterances else 0.0
+            ),
+            "avg_inference_ms": (
+                self._total_inference / self.batches * 1000 if self.batches else 0.0
+            ),
+        }
+
+
+# One batcher per engine instance, shared by every client using the engine
+_batchers: "weakref.WeakKeyDictionary[object, ASRBatcher]" = weakref.WeakKeyDictionary()
+
+
+def get_asr_batcher(
+    asr_engine,
+    max_batch_size: int | None = None,
+    max_wait_ms: float | None = None,
+) -> ASRBatcher:
+    """Get the batcher of an ASR engine, creating it if needed. Settings given
+    here are applied to the batcher."""
+    batcher = _batchers.get(asr_engine)
+    if batcher is None:
+        batcher = ASRBatcher(asr_engine)
+        _batchers[asr_engine] = batcher
+        logger.debug(f"Created ASR batcher for {type(asr_engine).__module__}")
+    if max_batch_size is not None:
+        batcher.max_batch_size = max(1, max_batch_size)
+    if max_wait_ms is not None:
+        batcher.max_wait_ms = max(0.0, max_wait_ms)
+    return batcher
+
+
+def get_asr_batcher_stats() -> list:
+    """Batching metrics of every ASR engine in use"""
+    return [
+        {"engine": type(engine).__module__.rsplit(".", 1)[-1], **batcher.stats()}
+        for engine, batcher in list(_batchers.items())
+    ]
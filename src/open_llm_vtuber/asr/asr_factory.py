@@ -13,6 +13,9 @@ class ASRFactory:
                 download_root=kwargs.get("download_root"),
                 language=kwargs.get("language"),
                 device=kwargs.get("device"),
+                streaming=kwargs.get("streaming", False),
+                streaming_window_seconds=kwargs.get("streaming_window_seconds", 10.0),
+                streaming_step_seconds=kwargs.get("streaming_step_seconds", 1.0),
             )
         elif system_name == "whisper_cpp":
             from .whisper_cpp_asr import VoiceRecognition as WhisperCPPASR
@@ -1,18 +1,30 @@
 import abc
 import numpy as np
 import asyncio
+from typing import List, Optional
+
+from .asr_batcher import get_asr_batcher
+from .asr_stream import ASRStream, PartialCallback
 
 
 class ASRInterface(metaclass=abc.ABCMeta):
     SAMPLE_RATE = 16000
     NUM_CHANNELS = 1
     SAMPLE_WIDTH = 2
+    # Local models set this: transcriptions of all clients then go through
+    # the engine's ASRBatcher instead of contending for the model in threads
+    BATCHED = False
+    # Set if transcribe_batch_np runs several utterances in one pass of the
+    # model. Otherwise the batcher passes one utterance at a time.
+    BATCH_INFERENCE = False
 
     async def async_transcribe_np(self, audio: np.ndarray) -> str:
         """Asynchronously transcribe speech audio in numpy array format.
 
-        By default, this runs the synchronous transcribe_np in a coroutine.
-        Subclasses can override this method to provide true async implementation.
+        By default, this runs the synchronous transcribe_np in a coroutine,
+        or queues the audio for the next batch of transcribe_batch_np if the
+        engine is BATCHED. Subclasses can override this method to provide
+        true async implementation.
 
         Args:
             audio: The numpy array of the audio data to transcribe.
@@ -22,8 +34,34 @@ class ASRInterface(metaclass=abc.ABCMeta):
         """
         if audio.dtype != np.float32:
             audio = audio.astype(np.float32)
+        if self.BATCHED:
+            return await get_asr_batcher(self).transcribe(audio)
         return await asyncio.to_thread(self.transcribe_np, audio)
 
+    def transcribe_batch_np(self, audios: List[np.ndarray]) -> List[str]:
+        """Transcribe several utterances, in order.
+
+        By default, this transcribes them one after another. Engines whose
+        model can run a batch in one pass should override this method.
+        """
+        return [self.transcribe_np(audio) for audio in audios]
+
+    def create_stream(
+        self, on_partial: Optional[PartialCallback] = None
+    ) -> Optional[ASRStream]:
+        """Start the recognition of an utterance fed while the user speaks.
+
+        Engines that can transcribe incrementally override this method.
+
+        Args:
+            on_partial: Called with each new partial transcript.
+
+        Returns:
+            ASRStream | None: The stream, or None if the engine only
+            transcribes whole utterances (with async_transcribe_np).
+        """
+        return None
+
     @abc.abstractmethod
     def transcribe_np(self, audio: np.ndarray) -> str:
         """Transcribe speech audio in numpy array format and return the transcription.
@@ -0,0 +1,168 @@
+import abc
+import asyncio
+import threading
+from contextlib import nullcontext
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+# Called with each new partial transcript
+PartialCallback = Callable[[str], Awaitable[None]]
+
+# (start in seconds, end in seconds, text) of a recognized segment
+Segment = Tuple[float, float, str]
+
+
+class ASRStream(metaclass=abc.ABCMeta):
+    """Recognition of one utterance, fed with audio while the user speaks.
+
+    Audio passed to `accept_audio` is decoded in the background, in a
+    thread, as soon as `min_decode_samples` new samples are pending. Each new
+    hypothesis is passed to `on_partial`. Since the audio has mostly been
+    decoded when the user stops speaking, `finish` only has the end left.
+
+    Decoding holds `model_lock`, if given, so that streams and batched
+    transcriptions do not run the shared model at the same time.
+    """
+
+    # Samples to wait for before decoding again
+    min_decode_samples = 0
+
+    def __init__(
+        self,
+        on_partial: Optional[PartialCallback] = None,
+        model_lock: Optional[threading.Lock] = None,
+    ) -> None:
+        self.partial = ""
+        self._on_partial = on_partial
+        self._model_lock = model_lock if model_lock is not None else nullcontext()
+        self._pending: List[np.ndarray] = []
+        self._pending_samples = 0
+        self._lock = threading.Lock()
+        self._decoding: Optional[asyncio.Task] = None
+
+    async def accept_audio(self, audio: np.ndarray) -> None:
+        """Feed float32 mono samples at the sample rate of the ASR engine"""
+        if len(audio) == 0:
+            return
+        with self._lock:
+            self._pending.append(np.asarray(audio, dtype=np.float32))
+            self._pending_samples += len(audio)
+        if self._pending_samples >= self.min_decode_samples and (
+            self._decoding is None or self._decoding.done()
+        ):
+            self._decoding = asyncio.create_task(self._decode_pending())
+
+    async def finish(self) -> str:
+        """Get the final transcript, once the utterance ended"""
+        if self._decoding is not None:
+            # Let the decoding in progress end rather than decoding twice
+            await asyncio.wait([self._decoding])
+        return await asyncio.to_thread(self._finish_blocking)
+
+    def cancel(self) -> None:
+        """Stop decoding, e.g. when the client disconnects"""
+        if self._decoding is not None:
+            self._decoding.cancel()
+
+    async def _decode_pending(self) -> None:
+        try:
+            while self._pending_samples and self._pending_samples >= (
+                self.min_decode_samples
+            ):
+                text = await asyncio.to_thread(self._decode_blocking)
+                if text and text != self.partial:
+                    self.partial = text
+                    if self._on_partial is not None:
+                        await self._on_partial(text)
+        except Exception as e:
+            logger.error(f"Error decoding partial transcript: {e}")
+
+    def _take_pending(self) -> np.ndarray:
+        with self._lock:
+            if not self._pending:
+                return np.zeros(0, dtype=np.float32)
+            audio = np.concatenate(self._pending)
+            self._pending = []
+            self._pending_samples = 0
+        return audio
+
+    def _decode_blocking(self) -> str:
+        with self._model_lock:
+            return self._decode(self._take_pending())
+
+    def _finish_blocking(self) -> str:
+        with self._model_lock:
+            return self._finish(self._take_pending()).strip()
+
+    @abc.abstractmethod
+    def _decode(self, audio: np.ndarray) -> str:
+        """Add new samples and return the current hypothesis (blocking)"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _finish(self, audio: np.ndarray) -> str:
+        """Add the last samples and return the final transcript (blocking)"""
+        raise NotImplementedError
+
+
+class WindowedASRStream(ASRStream):
+    """Streaming for engines that only transcribe whole utterances.
+
+    The audio not committed yet is transcribed again every `step_seconds`.
+    Once it is longer than `window_seconds`, the segments before the last
+    one are committed and their audio dropped, so every decode (and the
+    final one) covers at most a window of audio.
+    """
+
+    def __init__(
+        self,
+        transcribe_segments: Callable[[np.ndarray], List[Segment]],
+        sample_rate: int = 16000,
+        window_seconds: float = 10.0,
+        step_seconds: float = 1.0,
+        on_partial: Optional[PartialCallback] = None,
+        model_lock: Optional[threading.Lock] = None,
+    ) -> None:
+        super().__init__(on_partial, model_lock)
+        self._transcribe_segments = transcribe_segments
+        self._sample_rate = sample_rate
+        self._window_samples = int(window_seconds * sample_rate)
+        self.min_decode_samples = int(step_seconds * sample_rate)
+        self._audio = np.zeros(0, dtype=np.float32)
+        self._committed = ""
+        self._tail = ""
+        # Samples of self._audio the tail transcript covers
+        self._decoded_samples = 0
+
+    def _decode(self, audio: np.ndarray) -> str:
+        self._audio = np.concatenate([self._audio, audio])
+        segments = self._transcribe_segments(self._audio)
+        self._decoded_samples = len(self._audio)
+
+        if len(self._audio) > self._window_samples:
+            if len(segments) > 1:
+                # The last segment may still change: keep its audio
+                self._committed += "".join(text for _, _, text in segments[:-1])
+                cut = int(segments[-1][0] * self._sample_rate)
+                segments = segments[-1:]
+            else:
+                # No boundary in the window: commit it all
+                self._committed += "".join(text for _, _, text in segments)
+                cut = len(self._audio)
+                segments = []
+            self._audio = self._audio[cut:]
+            self._decoded_samples -= cut
+
+        self._tail = "".join(text for _, _, text in segments)
+        return (self._committed + self._tail).strip()
+
+    def _finish(self, audio: np.ndarray) -> str:
+        if len(audio):
+            self._audio = np.concatenate([self._audio, audio])
+        if len(self._audio) > self._decoded_samples:
+            self._tail = "".join(
+                text for _, _, text in self._transcribe_segments(self._audio)
+            )
+        return self._committed + self._tail
@@ -5,10 +5,9 @@ from loguru import logger
 import azure.cognitiveservices.speech as speechsdk
 from .asr_interface import ASRInterface
 import soundfile as sf
-import uuid
 import asyncio
 
-CACHE_DIR = "cache"
+from ..utils.cache_manager import get_cache_manager
 
 
 class VoiceRecognition(ASRInterface):
@@ -77,10 +76,9 @@ class VoiceRecognition(ASRInterface):
         Raises:
             Exception: If transcription fails
         """
-        temp_file = os.path.join(CACHE_DIR, f"{uuid.uuid4()}.wav")
+        temp_file = get_cache_manager().temp_path("azure_asr_", ".wav")
 
         try:
-            os.makedirs(CACHE_DIR, exist_ok=True)
             sf.write(temp_file, audio, 16000, "PCM_16")
 
             audio_config = speechsdk.AudioConfig(filename=temp_file)
@@ -118,11 +116,7 @@ class VoiceRecognition(ASRInterface):
             logger.error(f"Transcription failed: {e}")
             raise
         finally:
-            try:
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
-            except Exception as e:
-                logger.debug(f"Failed to remove temporary file {temp_file}: {e}")
+            get_cache_manager().release(temp_file)
 
     def transcribe_np(self, audio: np.ndarray) -> str:
         """
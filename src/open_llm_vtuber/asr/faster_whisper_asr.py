@@ -1,10 +1,17 @@
+from typing import List, Optional
+
 import numpy as np
 from faster_whisper import WhisperModel
+from .asr_batcher import get_asr_batcher
 from .asr_interface import ASRInterface
+from .asr_stream import ASRStream, PartialCallback, Segment, WindowedASRStream
 
 
 class VoiceRecognition(ASRInterface):
     BEAM_SEARCH = True
+    # Utterances are transcribed one at a time by the batcher: the model only
+    # batches the chunks of a single audio
+    BATCHED = True
     # SAMPLE_RATE # Defined in asr_interface.py
 
     def __init__(
@@ -13,9 +20,15 @@ class VoiceRecognition(ASRInterface):
         download_root: str = None,
         language: str = "en",
         device: str = "auto",
+        streaming: bool = False,
+        streaming_window_seconds: float = 10.0,
+        streaming_step_seconds: float = 1.0,
     ) -> None:
         self.MODEL_PATH = model_path
         self.LANG = language
+        self.streaming = streaming
+        self.streaming_window_seconds = streaming_window_seconds
+        self.streaming_step_seconds = streaming_step_seconds
 
         self.model = WhisperModel(
             model_path,
@@ -24,15 +37,33 @@ class VoiceRecognition(ASRInterface):
             compute_type="float32",
         )
 
-    def transcribe_np(self, audio: np.ndarray) -> str:
+    def create_stream(
+        self, on_partial: Optional[PartialCallback] = None
+    ) -> Optional[ASRStream]:
+        """Re-transcribe a sliding window of the utterance while the user
+        speaks (Whisper has no streaming decoder)"""
+        if not self.streaming:
+            return None
+        return WindowedASRStream(
+            self._transcribe_segments,
+            sample_rate=self.SAMPLE_RATE,
+            window_seconds=self.streaming_window_seconds,
+            step_seconds=self.streaming_step_seconds,
+            on_partial=on_partial,
+            model_lock=get_asr_batcher(self).model_lock,
+        )
+
+    def _transcribe_segments(self, audio: np.ndarray) -> List[Segment]:
         segments, info = self.model.transcribe(
             audio,
             beam_size=5 if self.BEAM_SEARCH else 1,
             language=self.LANG,
             condition_on_previous_text=False,
         )
+        return [(segment.start, segment.end, segment.text) for segment in segments]
 
-        text = [segment.text for segment in segments]
+    def transcribe_np(self, audio: np.ndarray) -> str:
+        text = [text for _, _, text in self._transcribe_segments(audio)]
 
         if not text:
             return ""
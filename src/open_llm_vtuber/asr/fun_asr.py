@@ -1,5 +1,6 @@
 import io
 import re
+from typing import List
 import torch
 import numpy as np
 import soundfile as sf
@@ -12,6 +13,9 @@ from .asr_interface import ASRInterface
 
 
 class VoiceRecognition(ASRInterface):
+    BATCHED = True
+    BATCH_INFERENCE = True
+
     def __init__(
         self,
         model_name: str = "iic/SenseVoiceSmall",
@@ -40,17 +44,20 @@ class VoiceRecognition(ASRInterface):
         self.language = language
 
     def transcribe_np(self, audio: np.ndarray) -> str:
-        audio_tensor = torch.tensor(audio, dtype=torch.float32)
+        return self.transcribe_batch_np([audio])[0]
 
+    def transcribe_batch_np(self, audios: List[np.ndarray]) -> List[str]:
+        """Transcribe several utterances with one call of generate"""
         res = self.model.generate(
-            input=audio_tensor,
+            input=[torch.tensor(audio, dtype=torch.float32) for audio in audios],
             batch_size_s=300,
             use_itn=self.use_itn,
             language=self.language,
         )
+        return [self._remove_tags(result["text"]) for result in res]
 
-        full_text = res[0]["text"]
-
+    @staticmethod
+    def _remove_tags(full_text: str) -> str:
         # SenseVoiceSmall may spits out some tags
         # like this: '<|zh|><|NEUTRAL|><|Speech|><|woitn|>欢迎大家来体验达摩院推出的语音识别模型'
         # we should remove those tags from the result
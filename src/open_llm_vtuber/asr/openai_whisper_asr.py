@@ -4,6 +4,8 @@ from .asr_interface import ASRInterface
 
 
 class VoiceRecognition(ASRInterface):
+    BATCHED = True
+
     def __init__(
         self,
         name: str = "base",
@@ -18,5 +20,5 @@ class VoiceRecognition(ASRInterface):
 
     def transcribe_np(self, audio: np.ndarray) -> str:
         result = self.model.transcribe(audio)
-        full_text = result['text']
+        full_text = result["text"]
         return full_text
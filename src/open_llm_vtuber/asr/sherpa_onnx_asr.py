@@ -1,13 +1,20 @@
 import os
+import threading
+from typing import List, Optional
+
 import numpy as np
 import sherpa_onnx
 from loguru import logger
+from .asr_batcher import get_asr_batcher
 from .asr_interface import ASRInterface
+from .asr_stream import ASRStream, PartialCallback
 from .utils import download_and_extract, check_and_extract_local_file
 import onnxruntime
 
 
 class VoiceRecognition(ASRInterface):
+    BATCHED = True
+
     def __init__(
         self,
         model_type: str = "paraformer",  # or "transducer", "nemo_ctc", "wenet_ctc", "whisper", "tdnn_ctc", "sense_voice"
@@ -37,6 +44,7 @@ class VoiceRecognition(ASRInterface):
         feature_dim: int = 80,  # Feature dimension
         use_itn: bool = True,  # Use ITN for SenseVoice models
         provider: str = "cpu",  # Provider for inference (cpu or cuda)
+        streaming: bool = False,  # Use the online recognizer (transducer or paraformer)
     ) -> None:
         self.model_type = model_type
         self.encoder = encoder
@@ -64,6 +72,9 @@ class VoiceRecognition(ASRInterface):
         self.SAMPLE_RATE = sample_rate
         self.feature_dim = feature_dim
         self.use_itn = use_itn
+        self.streaming = streaming
+        # The online recognizer decodes utterances one after another
+        self.BATCH_INFERENCE = not streaming
 
         # we need to find a way to get cuda version of sherpa-onnx before we can
         # use the gpu provider.
@@ -80,7 +91,47 @@ class VoiceRecognition(ASRInterface):
                 self.provider = "cpu"
         logger.info(f"Sherpa-Onnx-ASR: Using {self.provider} for inference")
 
-        self.recognizer = self._create_recognizer()
+        if self.streaming:
+            self.recognizer = self._create_online_recognizer()
+        else:
+            self.recognizer = self._create_recognizer()
+
+    def _create_online_recognizer(self):
+        """Create a streaming recognizer, which decodes audio as it arrives"""
+        if self.model_type == "transducer":
+            return sherpa_onnx.OnlineRecognizer.from_transducer(
+                encoder=self.encoder,
+                decoder=self.decoder,
+                joiner=self.joiner,
+                tokens=self.tokens,
+                num_threads=self.num_threads,
+                sample_rate=self.SAMPLE_RATE,
+                feature_dim=self.feature_dim,
+                decoding_method=self.decoding_method,
+                hotwords_file=self.hotwords_file,
+                hotwords_score=self.hotwords_score,
+                modeling_unit=self.modeling_unit,
+                bpe_vocab=self.bpe_vocab,
+                blank_penalty=self.blank_penalty,
+                debug=self.debug,
+                provider=self.provider,
+            )
+        elif self.model_type == "paraformer":
+            return sherpa_onnx.OnlineRecognizer.from_paraformer(
+                encoder=self.encoder,
+                decoder=self.decoder,
+                tokens=self.tokens,
+                num_threads=self.num_threads,
+                sample_rate=self.SAMPLE_RATE,
+                feature_dim=self.feature_dim,
+                decoding_method=self.decoding_method,
+                debug=self.debug,
+                provider=self.provider,
+            )
+        else:
+            raise ValueError(
+                f"Streaming is not supported for model type: {self.model_type}"
+            )
 
     def _create_recognizer(self):
         if self.model_type == "transducer":
@@ -198,8 +249,69 @@ class VoiceRecognition(ASRInterface):
 
         return recognizer
 
+    def create_stream(
+        self, on_partial: Optional[PartialCallback] = None
+    ) -> Optional[ASRStream]:
+        if not self.streaming:
+            return None
+        return SherpaOnnxStream(
+            self.recognizer,
+            self.SAMPLE_RATE,
+            on_partial,
+            model_lock=get_asr_batcher(self).model_lock,
+        )
+
     def transcribe_np(self, audio: np.ndarray) -> str:
-        stream = self.recognizer.create_stream()
-        stream.accept_waveform(self.SAMPLE_RATE, audio)
-        self.recognizer.decode_streams([stream])
-        return stream.result.text
+        return self.transcribe_batch_np([audio])[0]
+
+    def transcribe_batch_np(self, audios: List[np.ndarray]) -> List[str]:
+        """Decode several utterances in one pass of the recognizer"""
+        if self.streaming:
+            return [
+                SherpaOnnxStream(self.recognizer, self.SAMPLE_RATE)._finish(audio)
+                for audio in audios
+            ]
+        streams = []
+        for audio in audios:
+            stream = self.recognizer.create_stream()
+            stream.accept_waveform(self.SAMPLE_RATE, audio)
+            streams.append(stream)
+        self.recognizer.decode_streams(streams)
+        return [stream.result.text for stream in streams]
+
+
+class SherpaOnnxStream(ASRStream):
+    """Utterance decoded by an online recognizer, frame by frame"""
+
+    # Silence fed at the end, so that the last frames are decoded
+    TAIL_PADDING_SECONDS = 0.5
+
+    def __init__(
+        self,
+        recognizer: sherpa_onnx.OnlineRecognizer,
+        sample_rate: int,
+        on_partial: Optional[PartialCallback] = None,
+        model_lock: Optional[threading.Lock] = None,
+    ) -> None:
+        super().__init__(on_partial, model_lock)
+        self._recognizer = recognizer
+        self._sample_rate = sample_rate
+        self._stream = recognizer.create_stream()
+
+    def _decode(self, audio: np.ndarray) -> str:
+        self._stream.accept_waveform(self._sample_rate, audio)
+        while self._recognizer.is_ready(self._stream):
+            self._recognizer.decode_stream(self._stream)
+        return self._recognizer.get_result(self._stream)
+
+    def _finish(self, audio: np.ndarray) -> str:
+        tail_padding = np.zeros(
+            int(self.TAIL_PADDING_SECONDS * self._sample_rate), dtype=np.float32
+        )
+        self._stream.accept_waveform(
+            self._sample_rate, np.concatenate([audio, tail_padding])
+        )
+        self._stream.input_finished()
+        while self._recognizer.is_ready(self._stream):
+            self._recognizer.decode_stream(self._stream)
+        return self._recognizer.get_result(self._stream)
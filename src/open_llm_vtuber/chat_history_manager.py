@@ -1,63 +1,73 @@
-import os
-import re
-import json
-import uuid
-from datetime import datetime
-from typing import Literal, List, TypedDict, Optional
-from loguru import logger
+"""Chat history API used by the conversation chain and the WebSocket handler.
 
+The functions here validate their arguments and delegate to the active
+history backend (see `history/`). The JSONL file backend is used until
+`set_history_backend` is called with the one chosen in the system config.
+"""
 
-class HistoryMessage(TypedDict):
-    role: Literal["human", "ai"]
-    timestamp: str
-    content: str
-    # Optional display information for the message
-    name: Optional[str]
-    avatar: Optional[str]
+from typing import Literal, List
+from loguru import logger
 
+from .history.history_interface import HistoryInterface, HistoryMessage
+from .history.write_behind import WriteBehindHistory
 
-def _is_safe_filename(filename: str) -> bool:
-    """Validate filename for safety and allowed characters"""
-    if not filename or len(filename) > 255:
-        return False
+__all__ = [
+    "HistoryMessage",
+    "set_history_backend",
+    "get_history_backend",
+    "close_history_backend",
+    "create_new_history",
+    "store_message",
+    "get_metadata",
+    "update_metadate",
+    "get_history",
+    "delete_history",
+    "get_history_list",
+    "modify_latest_message",
+    "rename_history_file",
+    "search_history",
+    "paginate_history",
+]
 
-    # Allow alphanumeric, hyphen, underscore, and common unicode characters
-    # Block any filesystem special characters, control characters, and path separators
-    pattern = re.compile(r"^[\w\-_\u0020-\u007E\u00A0-\uFFFF]+$")
-    return bool(pattern.match(filename))
+_backend: HistoryInterface | None = None
 
 
-def _sanitize_path_component(component: str) -> str:
-    """Sanitize and validate a path component"""
-    # Remove any path components, get just the basename
-    sanitized = os.path.basename(component.strip())
+def set_history_backend(backend: HistoryInterface) -> None:
+    """Set the backend used by all chat history functions"""
+    global _backend
+    if _backend is not None and _backend is not backend:
+        _backend.close()
+    _backend = backend
 
-    if not _is_safe_filename(sanitized):
-        raise ValueError(f"Invalid characters in path component: {component}")
 
-    return sanitized
+def get_history_backend() -> HistoryInterface:
+    """Get the active backend, creating the default JSONL backend if none is set"""
+    global _backend
+    if _backend is None:
+        from .history.jsonl_history import HistoryBackend as JSONLHistoryBackend
 
+        _backend = JSONLHistoryBackend()
+    return _backend
 
-def _ensure_conf_dir(conf_uid: str) -> str:
-    """Ensure the directory for a specific conf exists and return its path"""
-    if not conf_uid:
-        raise ValueError("conf_uid cannot be empty")
 
-    safe_conf_uid = _sanitize_path_component(conf_uid)
-    base_dir = os.path.join("chat_history", safe_conf_uid)
-    os.makedirs(base_dir, exist_ok=True)
-    return base_dir
+async def close_history_backend() -> None:
+    """Write everything still queued, fsync it and close the active backend.
 
+    Called when the server shuts down.
+    """
+    global _backend
+    backend, _backend = _backend, None
+    if backend is None:
+        return
 
-def _get_safe_history_path(conf_uid: str, history_uid: str) -> str:
-    """Get sanitized path for history file"""
-    safe_conf_uid = _sanitize_path_component(conf_uid)
-    safe_history_uid = _sanitize_path_component(history_uid)
-    base_dir = os.path.join("chat_history", safe_conf_uid)
-    full_path = os.path.normpath(os.path.join(base_dir, f"{safe_history_uid}.json"))
-    if not full_path.startswith(base_dir):
-        raise ValueError("Invalid path: Path traversal detected")
-    return full_path
+    try:
+        if isinstance(backend, WriteBehindHistory):
+            await backend.aclose()
+        else:
+            backend.sync()
+            backend.close()
+    except Exception as e:
+        logger.error(f"Failed to close chat history backend: {e}")
 
 
 def create_new_history(conf_uid: str) -> str:
@@ -66,28 +76,7 @@ def create_new_history(conf_uid: str) -> str:
         logger.warning("No conf_uid provided")
         return ""
 
-    # Use uuid.uuid4().hex to generate a UUID without hyphens
-    # New format: UUID_YYYY-MM-DD_HH-MM-SS
-    history_uid = f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_{uuid.uuid4().hex}"
-    conf_dir = _ensure_conf_dir(conf_uid)  # conf_uid is sanitized here
-
-    # Create history file with empty metadata
-    try:
-        filepath = os.path.join(conf_dir, f"{history_uid}.json")
-        initial_data = [
-            {
-                "role": "metadata",
-                "timestamp": datetime.now().isoformat(timespec="seconds"),
-            }
-        ]
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(initial_data, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        logger.error(f"Failed to create new history file: {e}")
-        return ""
-
-    logger.debug(f"Created new history file with empty metadata: {filepath}")
-    return history_uid
+    return get_history_backend().create_new_history(conf_uid)
 
 
 def store_message(
@@ -115,36 +104,9 @@ def store_message(
             logger.warning("Missing history_uid")
         return
 
-    filepath = _get_safe_history_path(conf_uid, history_uid)
-    logger.debug(f"Storing {role} message to {filepath}")
-
-    history_data = []
-    if os.path.exists(filepath):
-        try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                history_data = json.load(f)
-        except Exception:
-            logger.error(f"Failed to load history file: {filepath}")
-            pass
-
-    now_str = datetime.now().isoformat(timespec="seconds")
-    new_item = {
-        "role": role,
-        "timestamp": now_str,
-        "content": content,
-    }
-
-    # Add optional display information if provided
-    if name is not None:
-        new_item["name"] = name
-    if avatar is not None:
-        new_item["avatar"] = avatar
-
-    history_data.append(new_item)
-
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(history_data, f, ensure_ascii=False, indent=2)
-    logger.debug(f"Successfully stored {role} message")
+    get_history_backend().store_message(
+        conf_uid, history_uid, role, content, name=name, avatar=avatar
+    )
 
 
 def get_metadata(conf_uid: str, history_uid: str) -> dict:
@@ -152,19 +114,7 @@ def get_metadata(conf_uid: str, history_uid: str) -> dict:
     if not conf_uid or not history_uid:
         return {}
 
-    filepath = _get_safe_history_path(conf_uid, history_uid)
-    if not os.path.exists(filepath):
-        return {}
-
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            history_data = json.load(f)
-
-        if history_data and history_data[0]["role"] == "metadata":
-            return history_data[0]
-    except Exception as e:
-        logger.error(f"Failed to get metadata: {e}")
-    return {}
+    return get_history_backend().get_metadata(conf_uid, history_uid)
 
 
 def update_metadate(conf_uid: str, history_uid: str, metadata: dict) -> bool:
@@ -176,34 +126,7 @@ def update_metadate(conf_uid: str, history_uid: str, metadata: dict) -> bool:
     if not conf_uid or not history_uid:
         return False
 
-    filepath = _get_safe_history_path(conf_uid, history_uid)
-    if not os.path.exists(filepath):
-        return False
-
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            history_data = json.load(f)
-
-        if history_data and history_data[0]["role"] == "metadata":
-            # Update existing metadata while preserving other fields
-            history_data[0].update(metadata)
-        else:
-            # Create new metadata with timestamp if none exists
-            new_metadata = {
-                "role": "metadata",
-                "timestamp": datetime.now().isoformat(timespec="seconds"),
-            }
-            new_metadata.update(metadata)  # Add new fields
-            history_data.insert(0, new_metadata)
-
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(history_data, f, ensure_ascii=False, indent=2)
-
-        logger.debug(f"Updated metadata for history {history_uid}")
-        return True
-    except Exception as e:
-        logger.error(f"Failed to set metadata: {e}")
-    return False
+    return get_history_backend().update_metadata(conf_uid, history_uid, metadata)
 
 
 def get_history(conf_uid: str, history_uid: str) -> List[HistoryMessage]:
@@ -215,19 +138,7 @@ def get_history(conf_uid: str, history_uid: str) -> List[HistoryMessage]:
             logger.warning("Missing history_uid")
         return []
 
-    filepath = _get_safe_history_path(conf_uid, history_uid)
-
-    if not os.path.exists(filepath):
-        logger.warning(f"History file not found: {filepath}")
-        return []
-
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            history_data = json.load(f)
-            # Filter out metadata
-            return [msg for msg in history_data if msg["role"] != "metadata"]
-    except Exception:
-        return []
+    return get_history_backend().get_history(conf_uid, history_uid)
 
 
 def delete_history(conf_uid: str, history_uid: str) -> bool:
@@ -236,15 +147,7 @@ def delete_history(conf_uid: str, history_uid: str) -> bool:
         logger.warning("Missing conf_uid or history_uid")
         return False
 
-    filepath = _get_safe_history_path(conf_uid, history_uid)
-    try:
-        if os.path.exists(filepath):
-            os.remove(filepath)
-            logger.debug(f"Successfully deleted history file: {filepath}")
-            return True
-    except Exception as e:
-        logger.error(f"Failed to delete history file: {e}")
-    return False
+    return get_history_backend().delete_history(conf_uid, history_uid)
 
 
 def get_history_list(conf_uid: str) -> List[dict]:
@@ -252,60 +155,7 @@ def get_history_list(conf_uid: str) -> List[dict]:
     if not conf_uid:
         return []
 
-    histories = []
-    conf_dir = _ensure_conf_dir(conf_uid)
-    empty_history_uids = []
-
-    try:
-        for filename in os.listdir(conf_dir):
-            if not filename.endswith(".json"):
-                continue
-
-            history_uid = filename[:-5]
-            filepath = os.path.join(conf_dir, filename)
-
-            try:
-                with open(filepath, "r", encoding="utf-8") as f:
-                    messages = json.load(f)
-
-                    # Filter out metadata for checking if history is empty
-                    actual_messages = [
-                        msg for msg in messages if msg["role"] != "metadata"
-                    ]
-                    if not actual_messages:
-                        empty_history_uids.append(history_uid)
-                        continue
-
-                    latest_message = actual_messages[-1]
-                    history_info = {
-                        "uid": history_uid,
-                        "latest_message": latest_message,
-                        "timestamp": (
-                            latest_message["timestamp"] if latest_message else None
-                        ),
-                    }
-                    histories.append(history_info)
-            except Exception as e:
-                logger.error(f"Error reading history file {filename}: {e}")
-                continue
-
-        # Clean up empty histories if there are other non-empty ones
-        if len(empty_history_uids) > 0 and len(os.listdir(conf_dir)) > 1:
-            for uid in empty_history_uids:
-                try:
-                    os.remove(os.path.join(conf_dir, f"{uid}.json"))
-                    logger.info(f"Removed empty history file: {uid}")
-                except Exception as e:
-                    logger.error(f"Failed to remove empty history file {uid}: {e}")
-
-        histories.sort(
-            key=lambda x: x["timestamp"] if x["timestamp"] else "", reverse=True
-        )
-        return histories
-
-    except Exception as e:
-        logger.error(f"Error listing histories: {e}")
-        return []
+    return get_history_backend().get_history_list(conf_uid)
 
 
 def modify_latest_message(
@@ -319,36 +169,9 @@ def modify_latest_message(
         logger.warning("Missing conf_uid or history_uid")
         return False
 
-    filepath = _get_safe_history_path(conf_uid, history_uid)
-    if not os.path.exists(filepath):
-        logger.warning(f"History file not found: {filepath}")
-        return False
-
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            history_data = json.load(f)
-
-        if not history_data:
-            logger.warning("History is empty")
-            return False
-
-        latest_message = history_data[-1]
-        if latest_message["role"] != role:
-            logger.warning(
-                f"Latest message role ({latest_message['role']}) doesn't match requested role ({role})"
-            )
-            return False
-
-        latest_message["content"] = new_content
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(history_data, f, ensure_ascii=False, indent=2)
-
-        logger.debug(f"Successfully modified latest {role} message")
-        return True
-
-    except Exception as e:
-        logger.error(f"Failed to modify latest message: {e}")
-        return False
+    return get_history_backend().modify_latest_message(
+        conf_uid, history_uid, role, new_content
+    )
 
 
 def rename_history_file(
@@ -359,16 +182,51 @@ def rename_history_file(
         logger.warning("Missing required parameters for rename")
         return False
 
-    old_filepath = _get_safe_history_path(conf_uid, old_history_uid)
-    new_filepath = _get_safe_history_path(conf_uid, new_history_uid)
+    return get_history_backend().rename_history(
+        conf_uid, old_history_uid, new_history_uid
+    )
+
+
+def search_history(conf_uid: str, query: str, limit: int = 20) -> List[dict]:
+    """Search the messages of all histories of a conf
+
+    Args:
+        conf_uid: Configuration unique identifier
+        query: Text to search for
+        limit: Maximum number of results (default 20)
+
+    Returns:
+        List[dict]: Matches with the history "uid", the "message" and a "snippet"
+    """
+    if not conf_uid or not query:
+        return []
 
     try:
-        if os.path.exists(old_filepath):
-            os.rename(old_filepath, new_filepath)
-            logger.info(
-                f"Renamed history file from {old_history_uid} to {new_history_uid}"
-            )
-            return True
+        return get_history_backend().search_history(conf_uid, query, limit)
     except Exception as e:
-        logger.error(f"Failed to rename history file: {e}")
-    return False
+        logger.error(f"Failed to search histories: {e}")
+        return []
+
+
+def paginate_history(
+    messages: List[HistoryMessage], cursor: int | None = None, page_size: int = 50
+) -> dict:
+    """Take one page of messages, going back from the newest ones
+
+    Args:
+        messages: All messages of a history, oldest first
+        cursor: Index the page ends before (None for the latest page)
+        page_size: Maximum number of messages in the page
+
+    Returns:
+        dict: "messages" in the page (oldest first), "cursor" to pass to get
+        the previous page (None when there are no older messages) and "total"
+    """
+    total = len(messages)
+    end = total if cursor is None else max(0, min(cursor, total))
+    start = max(0, end - max(1, page_size))
+    return {
+        "messages": messages[start:end],
+        "cursor": start if start > 0 else None,
+        "total": total,
+    }
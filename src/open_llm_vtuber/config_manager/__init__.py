@@ -8,6 +8,9 @@ and utility functions for loading/saving configurations.
 # Import main configuration classes
 from .main import Config
 from .system import SystemConfig
+from .chat_history import ChatHistoryConfig, JSONLHistoryConfig, SQLiteHistoryConfig
+from .http_client import HTTPClientConfig
+from .cache_dir import CacheDirConfig
 from .character import CharacterConfig
 from .stateless_llm import (
     OpenAICompatibleConfig,
@@ -16,6 +19,7 @@ from .stateless_llm import (
 )
 from .asr import (
     ASRConfig,
+    ASRBatchConfig,
     AzureASRConfig,
     FasterWhisperConfig,
     WhisperCPPConfig,
@@ -26,6 +30,8 @@ from .asr import (
 )
 from .tts import (
     TTSConfig,
+    TTSCacheConfig,
+    TTSSchedulerConfig,
     AzureTTSConfig,
     BarkTTSConfig,
     EdgeTTSConfig,
@@ -68,6 +74,12 @@ __all__ = [
     "Config",
     "SystemConfig",
     "CharacterConfig",
+    # Chat history related classes
+    "ChatHistoryConfig",
+    "JSONLHistoryConfig",
+    "SQLiteHistoryConfig",
+    "HTTPClientConfig",
+    "CacheDirConfig",
     # LLM related classes
     "OpenAICompatibleConfig",
     "ClaudeConfig",
@@ -83,6 +95,7 @@ __all__ = [
     "Mem0EmbedderConfig",
     # ASR related classes
     "ASRConfig",
+    "ASRBatchConfig",
     "AzureASRConfig",
     "FasterWhisperConfig",
     "WhisperCPPConfig",
@@ -92,6 +105,8 @@ __all__ = [
     "GroqWhisperASRConfig",
     # TTS related classes
     "TTSConfig",
+    "TTSCacheConfig",
+    "TTSSchedulerConfig",
     "AzureTTSConfig",
     "BarkTTSConfig",
     "EdgeTTSConfig",
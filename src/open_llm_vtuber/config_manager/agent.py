@@ -29,6 +29,8 @@ class BasicMemoryAgentConfig(I18nMixin, BaseModel):
 
     faster_first_response: Optional[bool] = Field(True, alias="faster_first_response")
     segment_method: Literal["regex", "pysbd"] = Field("pysbd", alias="segment_method")
+    coalesce_max_chars: int = Field(80, alias="coalesce_max_chars")
+    coalesce_linger_ms: int = Field(150, alias="coalesce_linger_ms")
     DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
         "llm_provider": Description(
             en="LLM provider to use for this agent",
@@ -42,6 +44,14 @@ class BasicMemoryAgentConfig(I18nMixin, BaseModel):
             en="Method for segmenting sentences: 'regex' or 'pysbd' (default: 'pysbd')",
             zh="分割句子的方法：'regex' 或 'pysbd'（默认：'pysbd'）",
         ),
+        "coalesce_max_chars": Description(
+            en="Merge the short sentences after the first one into clips of up to this many characters, to make fewer TTS calls and shorter gaps between clips; 0 to disable (default: 80)",
+            zh="将第一句之后的短句合并为不超过此字符数的片段，以减少 TTS 调用和片段间的停顿；0 表示禁用（默认：80）",
+        ),
+        "coalesce_linger_ms": Description(
+            en="How long to wait for a next sentence to merge before sending the held ones, in milliseconds (default: 150)",
+            zh="发送已暂存的句子前等待下一句可合并句子的时间（毫秒，默认：150）",
+        ),
     }
 
 
@@ -32,6 +32,9 @@ class FasterWhisperConfig(I18nMixin):
     download_root: str = Field(..., alias="download_root")
     language: Optional[str] = Field(None, alias="language")
     device: Literal["auto", "cpu", "cuda"] = Field("auto", alias="device")
+    streaming: bool = Field(False, alias="streaming")
+    streaming_window_seconds: float = Field(10.0, alias="streaming_window_seconds")
+    streaming_step_seconds: float = Field(1.0, alias="streaming_step_seconds")
 
     DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
         "model_path": Description(
@@ -48,8 +51,30 @@ class FasterWhisperConfig(I18nMixin):
             en="Device to use for inference (cpu, cuda, or auto)",
             zh="推理设备（cpu、cuda 或 auto）",
         ),
+        "streaming": Description(
+            en="Transcribe while the user speaks and send partial transcripts, by re-transcribing a sliding window",
+            zh="在用户说话时进行转录并发送部分结果（通过重新转录滑动窗口）",
+        ),
+        "streaming_window_seconds": Description(
+            en="Longest audio transcribed again while streaming (seconds)",
+            zh="流式转录时重新转录的最长音频（秒）",
+        ),
+        "streaming_step_seconds": Description(
+            en="New audio between two partial transcripts (seconds)",
+            zh="两次部分转录之间的新音频时长（秒）",
+        ),
     }
 
+    @model_validator(mode="after")
+    def check_streaming(cls, values):
+        if values.streaming_step_seconds <= 0 or (
+            values.streaming_window_seconds < values.streaming_step_seconds
+        ):
+            raise ValueError(
+                "streaming_step_seconds must be positive and at most streaming_window_seconds"
+            )
+        return values
+
 
 class WhisperCPPConfig(I18nMixin):
     """Configuration for WhisperCPP ASR."""
@@ -190,6 +215,7 @@ class SherpaOnnxASRConfig(I18nMixin):
     num_threads: int = Field(4, alias="num_threads")
     use_itn: bool = Field(True, alias="use_itn")
     provider: Literal["cpu", "cuda"] = Field("cpu", alias="provider")
+    streaming: bool = Field(False, alias="streaming")
 
     DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
         "model_type": Description(
@@ -231,17 +257,31 @@ class SherpaOnnxASRConfig(I18nMixin):
             en="Provider for inference (cpu or cuda) (cuda option needs additional settings. Please check our docs)",
             zh="推理平台（cpu 或 cuda）(cuda 需要额外配置，请参考文档)",
         ),
+        "streaming": Description(
+            en="Use a streaming model (transducer, or paraformer with encoder and decoder) and send partial transcripts while the user speaks",
+            zh="使用流式模型（transducer，或带 encoder 和 decoder 的 paraformer），在用户说话时发送部分转录结果",
+        ),
     }
 
     @model_validator(mode="after")
     def check_model_paths(cls, values: "SherpaOnnxASRConfig", info: ValidationInfo):
         model_type = values.model_type
 
+        if values.streaming and model_type not in ("transducer", "paraformer"):
+            raise ValueError(
+                "streaming is only supported for transducer and paraformer model types"
+            )
+
         if model_type == "transducer":
             if not all([values.encoder, values.decoder, values.joiner, values.tokens]):
                 raise ValueError(
                     "encoder, decoder, joiner, and tokens must be provided for transducer model type"
                 )
+        elif model_type == "paraformer" and values.streaming:
+            if not all([values.encoder, values.decoder, values.tokens]):
+                raise ValueError(
+                    "encoder, decoder, and tokens must be provided for streaming paraformer model type"
+                )
         elif model_type == "paraformer":
             if not all([values.paraformer, values.tokens]):
                 raise ValueError(
@@ -276,6 +316,32 @@ class SherpaOnnxASRConfig(I18nMixin):
         return values
 
 
+class ASRBatchConfig(I18nMixin):
+    """Configuration for the batching of transcriptions on shared ASR engines."""
+
+    max_batch_size: int = Field(8, alias="max_batch_size")
+    max_wait_ms: float = Field(5, alias="max_wait_ms")
+
+    DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
+        "max_batch_size": Description(
+            en="Maximum number of utterances transcribed in one batch by a local ASR model, across all clients",
+            zh="本地 ASR 模型一批转录的最大语音段数（所有客户端合计）",
+        ),
+        "max_wait_ms": Description(
+            en="How long an utterance waits for others to join its batch (milliseconds)",
+            zh="语音段等待其他语音段加入同一批次的时间（毫秒）",
+        ),
+    }
+
+    @model_validator(mode="after")
+    def check_values(cls, values):
+        if values.max_batch_size < 1 or values.max_wait_ms < 0:
+            raise ValueError(
+                "max_batch_size must be at least 1 and max_wait_ms not negative"
+            )
+        return values
+
+
 class ASRConfig(I18nMixin):
     """Configuration for Automatic Speech Recognition."""
 
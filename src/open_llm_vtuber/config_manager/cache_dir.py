@@ -0,0 +1,33 @@
+# config_manager/cache_dir.py
+from pydantic import Field, model_validator
+from typing import Dict, ClassVar
+from .i18n import I18nMixin, Description
+
+
+class CacheDirConfig(I18nMixin):
+    """Configuration for the temporary files of the cache directory."""
+
+    max_size_mb: float = Field(1024, alias="max_size_mb")
+    orphan_ttl_seconds: float = Field(3600, alias="orphan_ttl_seconds")
+    sweep_interval_seconds: float = Field(300, alias="sweep_interval_seconds")
+
+    DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
+        "max_size_mb": Description(
+            en="Maximum size of the cache directory in MB; least recently modified files are removed first",
+            zh="缓存目录的最大大小（MB），超出时优先删除最久未修改的文件",
+        ),
+        "orphan_ttl_seconds": Description(
+            en="Age in seconds after which files no session owns are removed",
+            zh="不属于任何会话的文件在多少秒后被删除",
+        ),
+        "sweep_interval_seconds": Description(
+            en="Seconds between two sweeps of the cache directory",
+            zh="两次清理缓存目录之间的间隔（秒）",
+        ),
+    }
+
+    @model_validator(mode="after")
+    def check_values(cls, values):
+        if values.max_size_mb <= 0 or values.sweep_interval_seconds <= 0:
+            raise ValueError("max_size_mb and sweep_interval_seconds must be positive")
+        return values
@@ -1,6 +1,6 @@
 # config_manager/character.py
 from pydantic import Field, field_validator
-from typing import Dict, ClassVar
+from typing import Dict, ClassVar, List
 from .i18n import I18nMixin, Description
 from .asr import ASRConfig
 from .tts import TTSConfig
@@ -27,6 +27,7 @@ class CharacterConfig(I18nMixin):
     tts_preprocessor_config: TTSPreprocessorConfig = Field(
         ..., alias="tts_preprocessor_config"
     )
+    phrase_bank: List[str] = Field(default_factory=list, alias="phrase_bank")
 
     DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
         "conf_name": Description(
@@ -61,6 +62,10 @@ class CharacterConfig(I18nMixin):
             en="Configuration for Text-to-Speech Preprocessor",
             zh="语音合成预处理器配置",
         ),
+        "phrase_bank": Description(
+            en="Lines spoken often (greetings, fallbacks), synthesized when the TTS loads and served from memory when the text to speak matches exactly",
+            zh="常说的台词（问候语、出错提示等），在加载 TTS 时预先合成，要朗读的文本完全一致时直接从内存播放",
+        ),
         "human_name": Description(
             en="Name of the human user in conversation", zh="对话中人类用户的名字"
         ),
@@ -0,0 +1,69 @@
+# config_manager/chat_history.py
+from pydantic import Field
+from typing import Literal, Dict, ClassVar
+from .i18n import I18nMixin, Description
+
+
+class JSONLHistoryConfig(I18nMixin):
+    """Configuration for the JSONL file chat history backend."""
+
+    history_dir: str = Field("chat_history", alias="history_dir")
+
+    DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
+        "history_dir": Description(
+            en="Directory where one JSONL file per conversation is stored",
+            zh="存放对话记录 JSONL 文件的目录（每个对话一个文件）",
+        ),
+    }
+
+
+class SQLiteHistoryConfig(I18nMixin):
+    """Configuration for the SQLite chat history backend."""
+
+    db_path: str = Field("chat_history/history.db", alias="db_path")
+
+    DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
+        "db_path": Description(
+            en="Path of the SQLite database file", zh="SQLite 数据库文件路径"
+        ),
+    }
+
+
+class ChatHistoryConfig(I18nMixin):
+    """Configuration for chat history storage."""
+
+    history_backend: Literal["jsonl", "sqlite"] = Field(
+        "jsonl", alias="history_backend"
+    )
+    jsonl: JSONLHistoryConfig = Field(default_factory=JSONLHistoryConfig, alias="jsonl")
+    sqlite: SQLiteHistoryConfig = Field(
+        default_factory=SQLiteHistoryConfig, alias="sqlite"
+    )
+    write_behind: bool = Field(True, alias="write_behind")
+    flush_interval: float = Field(0.5, alias="flush_interval")
+    max_batch_size: int = Field(32, alias="max_batch_size")
+
+    DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
+        "history_backend": Description(
+            en="Chat history storage backend: 'jsonl' (one file per conversation) or 'sqlite' (single database with full-text search)",
+            zh="对话记录存储后端：'jsonl'（每个对话一个文件）或 'sqlite'（单个数据库，支持全文搜索）",
+        ),
+        "jsonl": Description(
+            en="Configuration for the JSONL backend", zh="JSONL 后端配置"
+        ),
+        "sqlite": Description(
+            en="Configuration for the SQLite backend", zh="SQLite 后端配置"
+        ),
+        "write_behind": Description(
+            en="Queue new messages in memory and write them in batches in the background, so saving history never blocks the conversation",
+            zh="将新消息暂存在内存中并在后台批量写入，使保存对话记录不会阻塞对话",
+        ),
+        "flush_interval": Description(
+            en="Maximum time in seconds a queued message waits before being written",
+            zh="暂存消息写入前的最长等待时间（秒）",
+        ),
+        "max_batch_size": Description(
+            en="Write queued messages immediately once this many are waiting",
+            zh="暂存消息达到此数量时立即写入",
+        ),
+    }
@@ -0,0 +1,53 @@
+# config_manager/http_client.py
+from pydantic import Field, model_validator
+from typing import Dict, ClassVar
+from .i18n import I18nMixin, Description
+
+
+class HTTPClientConfig(I18nMixin):
+    """Configuration for the HTTP client shared by remote TTS and translation engines."""
+
+    timeout: float = Field(120, alias="timeout")
+    connect_timeout: float = Field(10, alias="connect_timeout")
+    max_connections: int = Field(100, alias="max_connections")
+    max_connections_per_host: int = Field(10, alias="max_connections_per_host")
+    max_keepalive_connections: int = Field(20, alias="max_keepalive_connections")
+    keepalive_expiry: float = Field(30, alias="keepalive_expiry")
+    http2: bool = Field(True, alias="http2")
+
+    DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
+        "timeout": Description(
+            en="Default timeout of a request in seconds (reading the response included)",
+            zh="请求的默认超时时间（秒，包括读取响应）",
+        ),
+        "connect_timeout": Description(
+            en="Timeout for opening a connection in seconds",
+            zh="建立连接的超时时间（秒）",
+        ),
+        "max_connections": Description(
+            en="Maximum number of open connections, all hosts included",
+            zh="所有主机合计的最大连接数",
+        ),
+        "max_connections_per_host": Description(
+            en="Maximum number of requests in progress to a single host",
+            zh="对单个主机同时进行的最大请求数",
+        ),
+        "max_keepalive_connections": Description(
+            en="Maximum number of idle connections kept open for reuse",
+            zh="保持打开以供复用的最大空闲连接数",
+        ),
+        "keepalive_expiry": Description(
+            en="Seconds an idle connection is kept open",
+            zh="空闲连接保持打开的时间（秒）",
+        ),
+        "http2": Description(
+            en="Use HTTP/2 with HTTPS servers that support it (requires the h2 package)",
+            zh="对支持 HTTP/2 的 HTTPS 服务器使用 HTTP/2（需要 h2 包）",
+        ),
+    }
+
+    @model_validator(mode="after")
+    def check_limits(cls, values):
+        if values.max_connections < 1 or values.max_connections_per_host < 1:
+            raise ValueError("Connection limits must be at least 1")
+        return values
@@ -2,6 +2,11 @@
 from pydantic import Field, model_validator
 from typing import Dict, ClassVar
 from .i18n import I18nMixin, Description
+from .chat_history import ChatHistoryConfig
+from .http_client import HTTPClientConfig
+from .cache_dir import CacheDirConfig
+from .tts import TTSCacheConfig, TTSSchedulerConfig
+from .asr import ASRBatchConfig
 
 
 class SystemConfig(I18nMixin):
@@ -12,6 +17,25 @@ class SystemConfig(I18nMixin):
     port: int = Field(..., alias="port")
     config_alts_dir: str = Field(..., alias="config_alts_dir")
     tool_prompts: Dict[str, str] = Field(..., alias="tool_prompts")
+    max_utterance_seconds: float = Field(120, alias="max_utterance_seconds")
+    chat_history_config: ChatHistoryConfig = Field(
+        default_factory=ChatHistoryConfig, alias="chat_history_config"
+    )
+    tts_cache_config: TTSCacheConfig = Field(
+        default_factory=TTSCacheConfig, alias="tts_cache_config"
+    )
+    tts_scheduler_config: TTSSchedulerConfig = Field(
+        default_factory=TTSSchedulerConfig, alias="tts_scheduler_config"
+    )
+    asr_batch_config: ASRBatchConfig = Field(
+        default_factory=ASRBatchConfig, alias="asr_batch_config"
+    )
+    http_client_config: HTTPClientConfig = Field(
+        default_factory=HTTPClientConfig, alias="http_client_config"
+    )
+    cache_dir_config: CacheDirConfig = Field(
+        default_factory=CacheDirConfig, alias="cache_dir_config"
+    )
 
     DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
         "conf_version": Description(en="Configuration version", zh="配置文件版本"),
@@ -24,6 +48,33 @@ class SystemConfig(I18nMixin):
             en="Tool prompts to be inserted into persona prompt",
             zh="要插入到角色提示词中的工具提示词",
         ),
+        "max_utterance_seconds": Description(
+            en="Longest microphone audio kept for one utterance, in seconds (0 for no limit)",
+            zh="单段语音保留的最长麦克风音频（秒，0 表示不限制）",
+        ),
+        "chat_history_config": Description(
+            en="Chat history storage settings", zh="对话记录存储设置"
+        ),
+        "tts_cache_config": Description(
+            en="Cache of synthesized audio for repeated lines",
+            zh="重复语句的合成音频缓存",
+        ),
+        "tts_scheduler_config": Description(
+            en="Scheduling of syntheses on TTS engines shared by clients",
+            zh="客户端共享的 TTS 引擎的合成调度",
+        ),
+        "asr_batch_config": Description(
+            en="Batching of transcriptions on local ASR models shared by clients",
+            zh="客户端共享的本地 ASR 模型的批量转录",
+        ),
+        "http_client_config": Description(
+            en="Shared HTTP client of the remote TTS and translation engines",
+            zh="远程 TTS 与翻译引擎共享的 HTTP 客户端",
+        ),
+        "cache_dir_config": Description(
+            en="Quota and cleanup of the temporary files of the cache directory",
+            zh="缓存目录临时文件的配额与清理",
+        ),
     }
 
     @model_validator(mode="after")
@@ -301,6 +301,64 @@ class SherpaOnnxTTSConfig(I18nMixin):
     }
 
 
+class TTSCacheConfig(I18nMixin):
+    """Configuration for the on-disk cache of synthesized audio."""
+
+    enabled: bool = Field(True, alias="enabled")
+    cache_dir: str = Field("tts_cache", alias="cache_dir")
+    max_size_mb: float = Field(256, alias="max_size_mb")
+    ttl_seconds: float = Field(0, alias="ttl_seconds")
+
+    DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
+        "enabled": Description(
+            en="Reuse the audio of lines that were already synthesized with the same TTS settings",
+            zh="复用使用相同 TTS 设置合成过的语句的音频",
+        ),
+        "cache_dir": Description(
+            en="Directory of the cached audio files", zh="缓存音频文件的目录"
+        ),
+        "max_size_mb": Description(
+            en="Maximum size of the cache in MB; least recently used files are removed first",
+            zh="缓存的最大大小（MB），优先删除最久未使用的文件",
+        ),
+        "ttl_seconds": Description(
+            en="Remove cached audio older than this many seconds (0 to keep until evicted)",
+            zh="删除早于此秒数的缓存音频（0 表示保留至被淘汰）",
+        ),
+    }
+
+
+class TTSSchedulerConfig(I18nMixin):
+    """Configuration for the scheduling of syntheses on shared TTS engines."""
+
+    max_concurrency: int = Field(2, alias="max_concurrency")
+    remote_max_concurrency: int = Field(0, alias="remote_max_concurrency")
+    first_sentence_priority: bool = Field(True, alias="first_sentence_priority")
+
+    DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
+        "max_concurrency": Description(
+            en="Maximum number of sentences synthesized at once by a local TTS engine running in the server (sherpa_onnx_tts, melo_tts, coqui_tts, bark_tts, pyttsx3_tts), across all clients",
+            zh="在服务器中运行的本地 TTS 引擎（sherpa_onnx_tts、melo_tts、coqui_tts、bark_tts、pyttsx3_tts）同时合成的最大语句数（所有客户端合计）",
+        ),
+        "remote_max_concurrency": Description(
+            en="Maximum number of sentences synthesized at once by a TTS engine calling a server or API (edge_tts, azure_tts, fish_api_tts, gpt_sovits_tts...), across all clients (0 for no limit)",
+            zh="调用服务器或 API 的 TTS 引擎（edge_tts、azure_tts、fish_api_tts、gpt_sovits_tts 等）同时合成的最大语句数（所有客户端合计，0 表示不限制）",
+        ),
+        "first_sentence_priority": Description(
+            en="Synthesize the first sentence of each answer before the other waiting sentences",
+            zh="优先合成每个回答的第一句话",
+        ),
+    }
+
+    @model_validator(mode="after")
+    def check_max_concurrency(cls, values):
+        if values.max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if values.remote_max_concurrency < 0:
+            raise ValueError("remote_max_concurrency must be at least 0")
+        return values
+
+
 class TTSConfig(I18nMixin):
     """Configuration for Text-to-Speech."""
 
@@ -331,6 +389,8 @@ class TTSConfig(I18nMixin):
     sherpa_onnx_tts: Optional[SherpaOnnxTTSConfig] = Field(
         None, alias="sherpa_onnx_tts"
     )
+    worker_processes: int = Field(0, alias="worker_processes")
+    worker_timeout_seconds: float = Field(60, alias="worker_timeout_seconds")
 
     DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
         "tts_model": Description(
@@ -357,6 +417,14 @@ class TTSConfig(I18nMixin):
         "sherpa_onnx_tts": Description(
             en="Configuration for Sherpa Onnx TTS", zh="Sherpa Onnx TTS 配置"
         ),
+        "worker_processes": Description(
+            en="Number of worker processes running local CPU-bound engines (sherpa_onnx, melo, coqui, bark, pyttsx3) in parallel; 0 runs them in the server process",
+            zh="并行运行本地 CPU 密集型引擎（sherpa_onnx、melo、coqui、bark、pyttsx3）的工作进程数；0 表示在服务器进程中运行",
+        ),
+        "worker_timeout_seconds": Description(
+            en="Longest a worker process may take to synthesize a sentence, in seconds, before it is restarted",
+            zh="工作进程合成一句话的最长时间（秒），超时后重启该进程",
+        ),
     }
 
     @model_validator(mode="after")
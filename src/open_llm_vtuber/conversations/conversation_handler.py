@@ -9,6 +9,8 @@ from loguru import logger
 from ..chat_group import ChatGroupManager
 from ..chat_history_manager import store_message
 from ..service_context import ServiceContext
+from ..asr.asr_stream import ASRStream
+from ..utils.audio_buffer import AudioBuffer
 from .group_conversation import process_group_conversation
 from .single_conversation import process_single_conversation
 from .conversation_utils import EMOJI_LIST
@@ -24,7 +26,8 @@ async def handle_conversation_trigger(
     client_contexts: Dict[str, ServiceContext],
     client_connections: Dict[str, WebSocket],
     chat_group_manager: ChatGroupManager,
-    received_data_buffers: Dict[str, np.ndarray],
+    received_data_buffers: Dict[str, AudioBuffer],
+    asr_streams: Dict[str, ASRStream],
     current_conversation_tasks: Dict[str, Optional[asyncio.Task]],
     broadcast_to_group: Callable,
 ) -> None:
@@ -42,8 +45,11 @@ async def handle_conversation_trigger(
     elif msg_type == "text-input":
         user_input = data.get("text", "")
     else:  # mic-audio-end
-        user_input = received_data_buffers[client_uid]
-        received_data_buffers[client_uid] = np.array([])
+        user_input = received_data_buffers[client_uid].take()
+        # Already transcribed while the user spoke: only the end is left
+        asr_stream = asr_streams.pop(client_uid, None)
+        if asr_stream is not None:
+            user_input = asr_stream
 
     images = data.get("images")
     session_emoji = np.random.choice(EMOJI_LIST)
@@ -70,6 +76,10 @@ async def handle_conversation_trigger(
                     session_emoji=session_emoji,
                 )
             )
+        elif isinstance(user_input, ASRStream):
+            # The input is dropped while the group conversation runs: stop
+            # transcribing it
+            user_input.cancel()
     else:
         # Use client_uid as task key for individual conversations
         current_conversation_tasks[client_uid] = asyncio.create_task(
@@ -80,6 +90,10 @@ async def handle_conversation_trigger(
                 user_input=user_input,
                 images=images,
                 session_emoji=session_emoji,
+                websocket_send_bytes=(
+                    websocket.send_bytes if context.binary_audio else None
+                ),
+                audio_codecs=context.audio_codecs,
             )
         )
 
@@ -1,4 +1,3 @@
-import asyncio
 import re
 from typing import Optional, Union, Any, List, Dict
 import numpy as np
@@ -11,9 +10,11 @@ from .tts_manager import TTSTaskManager
 from ..agent.output_types import SentenceOutput, AudioOutput
 from ..agent.input_types import BatchInput, TextData, ImageData, TextSource, ImageSource
 from ..asr.asr_interface import ASRInterface
+from ..asr.asr_stream import ASRStream
 from ..live2d_model import Live2dModel
 from ..tts.tts_interface import TTSInterface
 from ..utils.stream_audio import prepare_audio_payload
+from ..utils.cache_manager import get_cache_manager
 
 
 # Convert class methods to standalone functions
@@ -94,7 +95,7 @@ async def handle_sentence_output(
 
         if translate_engine:
             if len(re.sub(r'[\s.,!?，。！？\'"』」）】\s]+', "", tts_text)):
-                tts_text = translate_engine.translate(tts_text)
+                tts_text = await translate_engine.async_translate(tts_text)
             logger.info(f"🏃 Text after translation: '''{tts_text}'''...")
         else:
             logger.debug("🚫 No translation engine available. Skipping translation.")
@@ -124,6 +125,9 @@ async def handle_audio_output(
             display_text=display_text,
             actions=actions.to_dict() if actions else None,
         )
+        # The payload holds the audio: the file is not needed anymore
+        if audio_path:
+            get_cache_manager().release(audio_path)
         await websocket_send(json.dumps(audio_payload))
     return full_response
 
@@ -142,14 +146,17 @@ async def send_conversation_start_signals(websocket_send: WebSocketSend) -> None
 
 
 async def process_user_input(
-    user_input: Union[str, np.ndarray],
+    user_input: Union[str, np.ndarray, ASRStream],
     asr_engine: ASRInterface,
     websocket_send: WebSocketSend,
 ) -> str:
     """Process user input, converting audio to text if needed"""
-    if isinstance(user_input, np.ndarray):
+    if isinstance(user_input, (np.ndarray, ASRStream)):
         logger.info("Transcribing audio input...")
-        input_text = await asr_engine.async_transcribe_np(user_input)
+        if isinstance(user_input, ASRStream):
+            input_text = await user_input.finish()
+        else:
+            input_text = await asr_engine.async_transcribe_np(user_input)
         await websocket_send(
             json.dumps({"type": "user-input-transcription", "text": input_text})
         )
@@ -165,7 +172,7 @@ async def finalize_conversation_turn(
 ) -> None:
     """Finalize a conversation turn"""
     if tts_manager.task_list:
-        await asyncio.gather(*tts_manager.task_list)
+        await tts_manager.wait_until_done()
         await websocket_send(json.dumps({"type": "backend-synth-complete"}))
 
         response = await message_handler.wait_for_response(
@@ -20,6 +20,7 @@ from .types import (
     WebSocketSend,
 )
 from ..service_context import ServiceContext
+from ..asr.asr_stream import ASRStream
 from ..chat_history_manager import store_message
 from .tts_manager import TTSTaskManager
 
@@ -30,7 +31,7 @@ async def process_group_conversation(
     broadcast_func: BroadcastFunc,
     group_members: List[str],
     initiator_client_uid: str,
-    user_input: Union[str, np.ndarray],
+    user_input: Union[str, np.ndarray, ASRStream],
     images: Optional[List[Dict[str, Any]]] = None,
     session_emoji: str = np.random.choice(EMOJI_LIST),
 ) -> None:
@@ -47,7 +48,19 @@ async def process_group_conversation(
         session_emoji: Emoji identifier for the conversation
     """
     # Create TTSTaskManager for each member
-    tts_managers = {uid: TTSTaskManager() for uid in group_members}
+    tts_managers = {
+        uid: TTSTaskManager(
+            websocket_send_bytes=(
+                client_connections[uid].send_bytes
+                if client_contexts[uid].binary_audio
+                else None
+            ),
+            client_uid=uid,
+            audio_codecs=client_contexts[uid].audio_codecs,
+            phrase_bank=client_contexts[uid].phrase_bank,
+        )
+        for uid in group_members
+    }
 
     try:
         logger.info(f"Group Conversation Chain {session_emoji} started!")
@@ -170,7 +183,7 @@ def init_group_conversation_contexts(
 
 
 async def process_group_input(
-    user_input: Union[str, np.ndarray],
+    user_input: Union[str, np.ndarray, ASRStream],
     initiator_context: ServiceContext,
     initiator_ws_send: WebSocketSend,
     broadcast_func: BroadcastFunc,
@@ -243,7 +256,7 @@ async def handle_group_member_turn(
     )
 
     if tts_manager.task_list:
-        await asyncio.gather(*tts_manager.task_list)
+        await tts_manager.wait_until_done()
         await current_ws_send(json.dumps({"type": "backend-synth-complete"}))
 
         broadcast_ctx = BroadcastContext(
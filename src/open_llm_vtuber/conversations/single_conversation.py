@@ -13,19 +13,22 @@ from .conversation_utils import (
     cleanup_conversation,
     EMOJI_LIST,
 )
-from .types import WebSocketSend
+from .types import WebSocketSend, WebSocketSendBytes
 from .tts_manager import TTSTaskManager
 from ..chat_history_manager import store_message
 from ..service_context import ServiceContext
+from ..asr.asr_stream import ASRStream
 
 
 async def process_single_conversation(
     context: ServiceContext,
     websocket_send: WebSocketSend,
     client_uid: str,
-    user_input: Union[str, np.ndarray],
+    user_input: Union[str, np.ndarray, ASRStream],
     images: Optional[List[Dict[str, Any]]] = None,
     session_emoji: str = np.random.choice(EMOJI_LIST),
+    websocket_send_bytes: Optional[WebSocketSendBytes] = None,
+    audio_codecs: Optional[List[str]] = None,
 ) -> str:
     """Process a single-user conversation turn
 
@@ -36,12 +39,20 @@ async def process_single_conversation(
         user_input: Text or audio input from user
         images: Optional list of image data
         session_emoji: Emoji identifier for the conversation
+        websocket_send_bytes: Binary send function if the client receives
+            audio in binary frames
+        audio_codecs: Audio codecs the client plays, preferred first
 
     Returns:
         str: Complete response text
     """
     # Create TTSTaskManager for this conversation
-    tts_manager = TTSTaskManager()
+    tts_manager = TTSTaskManager(
+        websocket_send_bytes=websocket_send_bytes,
+        client_uid=client_uid,
+        audio_codecs=audio_codecs,
+        phrase_bank=context.phrase_bank,
+    )
 
     try:
         # Send initial signals
@@ -83,7 +94,7 @@ async def process_single_conversation(
 
         # Wait for any pending TTS tasks
         if tts_manager.task_list:
-            await asyncio.gather(*tts_manager.task_list)
+            await tts_manager.wait_until_done()
             await websocket_send(json.dumps({"type": "backend-synth-complete"}))
 
         await finalize_conversation_turn(
@@ -1,31 +1,64 @@
-import asyncio
-import json
 import re
-import uuid
-from datetime import datetime
-from typing import List, Optional, Dict
+import time
+import base64
+import asyncio
+from collections import deque
+from contextlib import aclosing
+from typing import AsyncIterator, Deque, List, Optional, Dict, Tuple
 from loguru import logger
 
 from ..agent.output_types import DisplayText, Actions
 from ..live2d_model import Live2dModel
-from ..tts.tts_interface import TTSInterface
-from ..utils.stream_audio import prepare_audio_payload
-from .types import WebSocketSend
+from ..tts.tts_interface import TTSInterface, GeneratedAudio
+from ..tts.tts_scheduler import get_tts_scheduler
+from ..tts.phrase_bank import PhraseBank
+from ..utils.stream_audio import prepare_audio_payload, send_audio_payload
+from .types import WebSocketSend, WebSocketSendBytes
 
 
 class TTSTaskManager:
     """Manages TTS tasks and ensures ordered delivery to frontend while allowing parallel TTS generation"""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        websocket_send_bytes: Optional[WebSocketSendBytes] = None,
+        client_uid: str = "",
+        audio_codecs: Optional[List[str]] = None,
+        phrase_bank: Optional[PhraseBank] = None,
+    ) -> None:
+        """
+        Args:
+            websocket_send_bytes: Binary send function, for clients that
+                negotiated binary audio frames. Audio is sent base64-encoded in
+                JSON when None.
+            client_uid: Client the audio is for, so that the TTS scheduler
+                can share the engine fairly between clients
+            audio_codecs: Codecs the client plays, preferred first. WAV when
+                None.
+            phrase_bank: Pre-synthesized phrases, served without synthesis
+                when the text to speak matches one exactly
+        """
+        self._websocket_send_bytes = websocket_send_bytes
+        self._client_uid = client_uid
+        self._audio_codecs = audio_codecs or ["wav"]
+        self._phrase_bank = phrase_bank
         self.task_list: List[asyncio.Task] = []
         self._lock = asyncio.Lock()
         # Queue to store ordered payloads
-        self._payload_queue: asyncio.Queue[Dict] = asyncio.Queue()
+        self._payload_queue: asyncio.Queue[Tuple[Optional[Dict], int, bool]] = (
+            asyncio.Queue()
+        )
         # Task to handle sending payloads in order
         self._sender_task: Optional[asyncio.Task] = None
         # Counter for maintaining order
         self._sequence_counter = 0
         self._next_sequence_to_send = 0
+        # Whether no synthesis was queued yet in the current turn. Managers
+        # live for a whole conversation (one per member in group chats), so
+        # this is reset at the end of each turn.
+        self._first_in_turn = True
+        # When clear() cancelled syntheses still running
+        self._interrupted_at: Optional[float] = None
 
     async def speak(
         self,
@@ -85,28 +118,48 @@ class TTSTaskManager:
                 live2d_model=live2d_model,
                 tts_engine=tts_engine,
                 sequence_number=current_sequence,
+                # The first audio of the turn is scheduled first
+                priority=self._first_in_turn,
             )
         )
+        self._first_in_turn = False
         self.task_list.append(task)
 
     async def _process_payload_queue(self, websocket_send: WebSocketSend) -> None:
         """
         Process and send payloads in correct order.
         Runs continuously until all payloads are processed.
+
+        Queue items are (payload, sequence_number, is_last). A sentence can
+        be sent as several payloads: they are sent as soon as they arrive if
+        the sentence is the next one to send, and the following sentence
+        starts after the item with is_last. A None payload only marks the end.
         """
-        buffered_payloads: Dict[int, Dict] = {}
+        buffered_payloads: Dict[int, Deque[Tuple[Optional[Dict], bool]]] = {}
 
         while True:
             try:
                 # Get payload from queue
-                payload, sequence_number = await self._payload_queue.get()
-                buffered_payloads[sequence_number] = payload
+                payload, sequence_number, is_last = await self._payload_queue.get()
+                buffered_payloads.setdefault(sequence_number, deque()).append(
+                    (payload, is_last)
+                )
 
                 # Send payloads in order
-                while self._next_sequence_to_send in buffered_payloads:
-                    next_payload = buffered_payloads.pop(self._next_sequence_to_send)
-                    await websocket_send(json.dumps(next_payload))
-                    self._next_sequence_to_send += 1
+                while buffered_payloads.get(self._next_sequence_to_send):
+                    next_payload, is_last = buffered_payloads[
+                        self._next_sequence_to_send
+                    ].popleft()
+                    if next_payload is not None:
+                        await send_audio_payload(
+                            next_payload,
+                            websocket_send,
+                            self._websocket_send_bytes,
+                            sequence=self._next_sequence_to_send,
+                        )
+                    if is_last:
+                        del buffered_payloads[self._next_sequence_to_send]
+                        self._next_sequence_to_send += 1
 
                 self._payload_queue.task_done()
 
@@ -125,7 +178,7 @@ class TTSTaskManager:
             display_text=display_text,
             actions=actions,
         )
-        await self._payload_queue.put((audio_payload, sequence_number))
+        await self._payload_queue.put((audio_payload, sequence_number, True))
 
     async def _process_tts(
         self,
@@ -135,48 +188,115 @@ class TTSTaskManager:
         live2d_model: Live2dModel,
         tts_engine: TTSInterface,
         sequence_number: int,
+        priority: bool = False,
     ) -> None:
-        """Process TTS generation and queue the result for ordered delivery"""
-        audio_file_path = None
-        try:
-            audio_file_path = await self._generate_audio(tts_engine, tts_text)
-            payload = prepare_audio_payload(
-                audio_path=audio_file_path,
-                display_text=display_text,
-                actions=actions,
+        """
+        Stream the TTS audio and queue each chunk for ordered delivery.
+
+        Every chunk is sent as its own audio payload, with its own volumes.
+        Only the first one carries the actions, so that they are played once.
+        The synthesis waits for a slot of the engine's TTSScheduler first.
+        """
+        if self._phrase_bank is not None and tts_text in self._phrase_bank:
+            await self._send_phrase_payload(
+                tts_text, display_text, actions, sequence_number
             )
-            # Queue the payload with its sequence number
-            await self._payload_queue.put((payload, sequence_number))
+            return
 
+        chunk_count = 0
+        scheduler = get_tts_scheduler(tts_engine)
+        synthesis_started = None
+        try:
+            async with (
+                scheduler.slot(self._client_uid, priority=priority),
+                aclosing(self._generate_audio(tts_engine, tts_text)) as audio_stream,
+            ):
+                synthesis_started = time.monotonic()
+                async for generated_audio in audio_stream:
+                    # Decoding (e.g. edge-tts MP3 through ffmpeg), the volume
+                    # analysis and encoding to the client's codec would
+                    # otherwise block the event loop
+                    payload = await asyncio.to_thread(
+                        prepare_audio_payload,
+                        audio_path=None,
+                        display_text=display_text,
+                        actions=actions if chunk_count == 0 else None,
+                        binary=self._websocket_send_bytes is not None,
+                        generated_audio=generated_audio,
+                        allow_silence=True,
+                        codecs=self._audio_codecs,
+                    )
+                    # Queue the payload with its sequence number
+                    await self._payload_queue.put((payload, sequence_number, False))
+                    chunk_count += 1
+
+        except asyncio.CancelledError:
+            if synthesis_started is not None:
+                # Time the engine stayed busy after the interrupt, e.g. waiting
+                # for a synthesis running in a thread
+                interrupted_at = self._interrupted_at or time.monotonic()
+                scheduler.record_interrupted(
+                    time.monotonic() - max(synthesis_started, interrupted_at)
+                )
+            raise
         except Exception as e:
             logger.error(f"Error preparing audio payload: {e}")
+
+        if chunk_count == 0:
             # Queue silent payload for error case
-            payload = prepare_audio_payload(
-                audio_path=None,
-                display_text=display_text,
-                actions=actions,
-            )
-            await self._payload_queue.put((payload, sequence_number))
+            await self._send_silent_payload(display_text, actions, sequence_number)
+        else:
+            # Let the next sentence be sent
+            await self._payload_queue.put((None, sequence_number, True))
 
-        finally:
-            if audio_file_path:
-                tts_engine.remove_file(audio_file_path)
-                logger.debug("Audio cache file cleaned.")
+    async def _send_phrase_payload(
+        self,
+        tts_text: str,
+        display_text: DisplayText,
+        actions: Optional[Actions],
+        sequence_number: int,
+    ) -> None:
+        """Queue the pre-synthesized audio of a phrase of the phrase bank"""
+        logger.debug(f"🏃Serving '''{tts_text}''' from the phrase bank")
+        payload = await self._phrase_bank.get_payload(tts_text, self._audio_codecs)
+        payload["display_text"] = display_text.to_dict()
+        payload["actions"] = actions.to_dict() if actions else None
+        if self._websocket_send_bytes is None:
+            payload["audio"] = base64.b64encode(payload["audio"]).decode("utf-8")
+        await self._payload_queue.put((payload, sequence_number, True))
 
-    async def _generate_audio(self, tts_engine: TTSInterface, text: str) -> str:
-        """Generate audio file from text"""
+    def _generate_audio(
+        self, tts_engine: TTSInterface, text: str
+    ) -> AsyncIterator[GeneratedAudio]:
+        """Generate audio from text in memory, chunk by chunk"""
         logger.debug(f"🏃Generating audio for '''{text}'''...")
-        return await tts_engine.async_generate_audio(
-            text=text,
-            file_name_no_ext=f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}",
-        )
+        return tts_engine.async_stream_audio(text)
+
+    async def wait_until_done(self) -> None:
+        """Wait for the queued syntheses.
+
+        Unlike gathering the tasks, a cancellation of the caller (interrupt)
+        is raised right away without cancelling them: clear() does.
+        The next synthesis queued starts a new turn.
+        """
+        self._first_in_turn = True
+        if self.task_list:
+            await asyncio.wait(self.task_list)
 
     def clear(self) -> None:
-        """Clear all pending tasks and reset state"""
+        """Cancel the syntheses still running, clear all pending tasks and
+        reset state"""
+        in_flight = [task for task in self.task_list if not task.done()]
+        if in_flight:
+            self._interrupted_at = time.monotonic()
+            for task in in_flight:
+                task.cancel()
+            logger.info(f"🛑 Cancelled {len(in_flight)} TTS syntheses")
         self.task_list.clear()
         if self._sender_task:
             self._sender_task.cancel()
         self._sequence_counter = 0
         self._next_sequence_to_send = 0
+        self._first_in_turn = True
         # Create a new queue to clear any pending items
         self._payload_queue = asyncio.Queue()
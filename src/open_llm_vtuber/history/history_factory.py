@@ -0,0 +1,20 @@
+from .history_interface import HistoryInterface
+
+
+class HistoryFactory:
+    @staticmethod
+    def get_history_backend(backend_type: str, **kwargs) -> HistoryInterface:
+        if backend_type == "jsonl":
+            from .jsonl_history import HistoryBackend as JSONLHistoryBackend
+
+            return JSONLHistoryBackend(
+                history_dir=kwargs.get("history_dir", "chat_history"),
+            )
+        elif backend_type == "sqlite":
+            from .sqlite_history import HistoryBackend as SQLiteHistoryBackend
+
+            return SQLiteHistoryBackend(
+                db_path=kwargs.get("db_path", "chat_history/history.db"),
+            )
+        else:
+            raise ValueError(f"Unknown chat history backend type: {backend_type}")
@@ -0,0 +1,152 @@
+import abc
+from datetime import datetime
+from typing import List, Literal, Optional, TypedDict
+
+
+class HistoryMessage(TypedDict):
+    role: Literal["human", "ai"]
+    timestamp: str
+    content: str
+    # Optional display information for the message
+    name: Optional[str]
+    avatar: Optional[str]
+
+
+def create_message(
+    role: Literal["human", "ai", "system"],
+    content: str,
+    name: str | None = None,
+    avatar: str | None = None,
+) -> HistoryMessage:
+    """Build a history message stamped with the current time"""
+    message = {
+        "role": role,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "content": content,
+    }
+
+    # Add optional display information if provided
+    if name is not None:
+        message["name"] = name
+    if avatar is not None:
+        message["avatar"] = avatar
+    return message
+
+
+class HistoryInterface(metaclass=abc.ABCMeta):
+    """Storage backend for chat histories.
+
+    Histories are identified by (conf_uid, history_uid). Callers validate that
+    both are non-empty; backends only deal with storage.
+    """
+
+    @abc.abstractmethod
+    def create_new_history(self, conf_uid: str) -> str:
+        """Create a new, empty history and return its history_uid ("" on failure)"""
+        raise NotImplementedError
+
+    def store_message(
+        self,
+        conf_uid: str,
+        history_uid: str,
+        role: Literal["human", "ai", "system"],
+        content: str,
+        name: str | None = None,
+        avatar: str | None = None,
+    ) -> None:
+        """Append a message to a history, creating the history if needed"""
+        self.append_messages(
+            conf_uid, history_uid, [create_message(role, content, name, avatar)]
+        )
+
+    @abc.abstractmethod
+    def append_messages(
+        self, conf_uid: str, history_uid: str, messages: List[HistoryMessage]
+    ) -> None:
+        """Append already built messages (see `create_message`) in one write,
+        creating the history if needed"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_metadata(self, conf_uid: str, history_uid: str) -> dict:
+        """Get the metadata of a history ({} if it has none)"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def update_metadata(self, conf_uid: str, history_uid: str, metadata: dict) -> bool:
+        """Merge new fields into the metadata of an existing history"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_history(self, conf_uid: str, history_uid: str) -> List[HistoryMessage]:
+        """Get all messages of a history, oldest first, without metadata"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete_history(self, conf_uid: str, history_uid: str) -> bool:
+        """Delete a history"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_history_list(self, conf_uid: str) -> List[dict]:
+        """List the non-empty histories of a conf with their latest message.
+
+        Returns:
+            List[dict]: Items with "uid", "latest_message" and "timestamp",
+            newest first.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def modify_latest_message(
+        self,
+        conf_uid: str,
+        history_uid: str,
+        role: Literal["human", "ai", "system"],
+        new_content: str,
+    ) -> bool:
+        """Replace the content of the latest message if it has the given role"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def rename_history(
+        self, conf_uid: str, old_history_uid: str, new_history_uid: str
+    ) -> bool:
+        """Give a history a new history_uid"""
+        raise NotImplementedError
+
+    def search_history(self, conf_uid: str, query: str, limit: int = 20) -> List[dict]:
+        """Search the messages of all histories of a conf.
+
+        By default, this scans every history for a case-insensitive substring.
+        Subclasses with an index should override this method.
+
+        Returns:
+            List[dict]: Items with "uid" (history_uid), "message" and "snippet".
+        """
+        needle = query.strip().lower()
+        if not needle:
+            return []
+
+        results = []
+        for history in self.get_history_list(conf_uid):
+            for message in reversed(self.get_history(conf_uid, history["uid"])):
+                if needle in message["content"].lower():
+                    results.append(
+                        {
+                            "uid": history["uid"],
+                            "message": message,
+                            "snippet": message["content"],
+                        }
+                    )
+                    if len(results) >= limit:
+                        return results
+        return results
+
+    def sync(self) -> None:
+        """Make everything written so far durable (e.g. fsync)"""
+        pass
+
+    def close(self) -> None:
+        """Release resources held by the backend"""
+        pass
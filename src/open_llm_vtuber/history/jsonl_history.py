@@ -0,0 +1,670 @@
+import os
+import re
+import json
+import uuid
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Literal, List, Set, Tuple
+from loguru import logger
+
+from .history_interface import HistoryInterface, HistoryMessage
+
+# Histories are stored as JSON Lines: one record per line, metadata first.
+# Appending a message is a single write at the end of the file.
+HISTORY_FILE_EXT = ".jsonl"
+# Old format: a single JSON array rewritten on every message
+LEGACY_HISTORY_FILE_EXT = ".json"
+# Block size used when scanning a history file backwards for its last record
+_TAIL_BLOCK_SIZE = 4096
+# Per-conf journal of history summaries (latest message, count, empty flag),
+# so listing histories does not have to open every history file
+HISTORY_MANIFEST_FILE = ".manifest"
+# The manifest journal is compacted once it holds this many more lines than entries
+_MANIFEST_MIN_COMPACT_LINES = 64
+
+
+def _is_safe_filename(filename: str) -> bool:
+    """Validate filename for safety and allowed characters"""
+    if not filename or len(filename) > 255:
+        return False
+
+    # Allow alphanumeric, hyphen, underscore, and common unicode characters
+    # Block any filesystem special characters, control characters, and path separators
+    pattern = re.compile(r"^[\w\-_\u0020-\u007E\u00A0-\uFFFF]+$")
+    return bool(pattern.match(filename))
+
+
+def _sanitize_path_component(component: str) -> str:
+    """Sanitize and validate a path component"""
+    # Remove any path components, get just the basename
+    sanitized = os.path.basename(component.strip())
+
+    if not _is_safe_filename(sanitized):
+        raise ValueError(f"Invalid characters in path component: {component}")
+
+    return sanitized
+
+
+def _dump_record(record: dict) -> str:
+    """Serialize a single history record as one JSONL line"""
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def _read_records(filepath: str) -> List[dict]:
+    """Read all records of a JSONL history file.
+
+    A torn trailing line (e.g. after a crash mid-write) is skipped with a
+    warning instead of invalidating the whole history.
+    """
+    records = []
+    with open(filepath, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping malformed line {line_no} in {filepath}")
+    return records
+
+
+def _read_first_record(filepath: str) -> dict | None:
+    """Read only the first record of a JSONL history file"""
+    with open(filepath, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                return json.loads(line)
+    return None
+
+
+def _read_last_record(filepath: str) -> Tuple[int, dict] | None:
+    """Read the last record of a JSONL history file without parsing the rest.
+
+    Returns:
+        Tuple[int, dict] | None: Byte offset where the last record starts and
+        the record itself, or None if the file holds no records.
+    """
+    with open(filepath, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        buffer = b""
+        while pos > 0:
+            step = min(_TAIL_BLOCK_SIZE, pos)
+            pos -= step
+            f.seek(pos)
+            buffer = f.read(step) + buffer
+            stripped = buffer.rstrip(b"\r\n")
+            newline_idx = stripped.rfind(b"\n")
+            if newline_idx != -1:
+                return pos + newline_idx + 1, json.loads(stripped[newline_idx + 1 :])
+
+        stripped = buffer.rstrip(b"\r\n")
+        if not stripped:
+            return None
+        return 0, json.loads(stripped)
+
+
+def _write_records(filepath: str, records: List[dict]) -> None:
+    """Atomically replace a history file with the given records"""
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.writelines(_dump_record(record) for record in records)
+    os.replace(tmp_path, filepath)
+
+
+def _replace_tail(filepath: str, offset: int, data: bytes) -> None:
+    """Atomically replace the bytes of a history file from offset on.
+
+    The file is rewritten through a temporary file, so a crash leaves either
+    the old or the new version, never the history without its last record.
+    """
+    tmp_path = f"{filepath}.tmp"
+    with open(filepath, "rb") as src, open(tmp_path, "wb") as dst:
+        remaining = offset
+        while remaining > 0:
+            block = src.read(min(remaining, 1 << 20))
+            if not block:
+                break
+            dst.write(block)
+            remaining -= len(block)
+        dst.write(data)
+    os.replace(tmp_path, filepath)
+
+
+def _file_signature(filepath: str) -> List[int]:
+    """Get the (mtime, size) pair used to detect changes made outside the app"""
+    stat = os.stat(filepath)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _summarize_history(filepath: str) -> dict:
+    """Build a manifest entry by reading a whole history file"""
+    messages = [msg for msg in _read_records(filepath) if msg["role"] != "metadata"]
+    latest_message = messages[-1] if messages else None
+    return {
+        "latest_message": latest_message,
+        "timestamp": latest_message["timestamp"] if latest_message else None,
+        "message_count": len(messages),
+        "empty": not messages,
+        "signature": _file_signature(filepath),
+    }
+
+
+def _migrate_legacy_file(legacy_path: str, filepath: str) -> bool:
+    """Convert a legacy JSON array history file to the JSONL format"""
+    try:
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        _write_records(filepath, records)
+        os.remove(legacy_path)
+        logger.info(f"Migrated history file {legacy_path} to {filepath}")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to migrate history file {legacy_path}: {e}")
+        return False
+
+
+class HistoryBackend(HistoryInterface):
+    """Stores each history as a JSONL file under `<history_dir>/<conf_uid>/`"""
+
+    def __init__(self, history_dir: str = "chat_history", migrate_legacy: bool = True):
+        """
+        Args:
+            history_dir: Root directory of the history files
+            migrate_legacy: Convert legacy `.json` histories to JSONL right away
+        """
+        self.history_dir = os.path.normpath(history_dir)
+        self._manifest_lock = threading.RLock()
+        # conf_dir -> {history_uid: manifest entry}
+        self._manifests: Dict[str, Dict[str, dict]] = {}
+        # conf_dir -> number of lines currently in the manifest journal
+        self._manifest_journal_lengths: Dict[str, int] = {}
+        # Files appended to since the last sync()
+        self._dirty_paths: Set[str] = set()
+
+        if migrate_legacy:
+            self.migrate_legacy_histories()
+
+    # ==== Paths
+
+    def _ensure_conf_dir(self, conf_uid: str) -> str:
+        """Ensure the directory for a specific conf exists and return its path"""
+        if not conf_uid:
+            raise ValueError("conf_uid cannot be empty")
+
+        safe_conf_uid = _sanitize_path_component(conf_uid)
+        base_dir = os.path.join(self.history_dir, safe_conf_uid)
+        os.makedirs(base_dir, exist_ok=True)
+        return base_dir
+
+    def _get_safe_history_path(
+        self, conf_uid: str, history_uid: str, extension: str = HISTORY_FILE_EXT
+    ) -> str:
+        """Get sanitized path for history file"""
+        safe_conf_uid = _sanitize_path_component(conf_uid)
+        safe_history_uid = _sanitize_path_component(history_uid)
+        base_dir = os.path.join(self.history_dir, safe_conf_uid)
+        full_path = os.path.normpath(
+            os.path.join(base_dir, f"{safe_history_uid}{extension}")
+        )
+        if not full_path.startswith(base_dir):
+            raise ValueError("Invalid path: Path traversal detected")
+        return full_path
+
+    def _resolve_history_path(self, conf_uid: str, history_uid: str) -> str:
+        """Get the JSONL path of a history, migrating a legacy file on first access"""
+        filepath = self._get_safe_history_path(conf_uid, history_uid)
+        if not os.path.exists(filepath):
+            legacy_path = self._get_safe_history_path(
+                conf_uid, history_uid, LEGACY_HISTORY_FILE_EXT
+            )
+            if os.path.exists(legacy_path):
+                _migrate_legacy_file(legacy_path, filepath)
+        return filepath
+
+    def migrate_legacy_histories(self, conf_uid: str | None = None) -> int:
+        """Convert every legacy `.json` history file to the JSONL format
+
+        Args:
+            conf_uid: Only migrate the histories of this conf. Migrates all confs if None.
+
+        Returns:
+            int: Number of migrated history files
+        """
+        if conf_uid:
+            conf_dirs = [self._ensure_conf_dir(conf_uid)]
+        elif os.path.isdir(self.history_dir):
+            conf_dirs = [
+                os.path.join(self.history_dir, name)
+                for name in os.listdir(self.history_dir)
+                if os.path.isdir(os.path.join(self.history_dir, name))
+            ]
+        else:
+            return 0
+
+        migrated = 0
+        for conf_dir in conf_dirs:
+            for filename in os.listdir(conf_dir):
+                if not filename.endswith(LEGACY_HISTORY_FILE_EXT):
+                    continue
+                legacy_path = os.path.join(conf_dir, filename)
+                history_uid = filename[: -len(LEGACY_HISTORY_FILE_EXT)]
+                filepath = os.path.join(conf_dir, f"{history_uid}{HISTORY_FILE_EXT}")
+                if os.path.exists(filepath):
+                    logger.warning(
+                        f"Both legacy and JSONL history exist for {history_uid}, "
+                        "keeping the JSONL file"
+                    )
+                    continue
+                if _migrate_legacy_file(legacy_path, filepath):
+                    migrated += 1
+
+        if migrated:
+            logger.info(f"Migrated {migrated} legacy history files to JSONL")
+        return migrated
+
+    # ==== Manifest
+
+    def _load_manifest(self, conf_dir: str) -> Dict[str, dict]:
+        """Get the manifest entries of a conf directory, replaying the journal once"""
+        with self._manifest_lock:
+            if conf_dir in self._manifests:
+                return self._manifests[conf_dir]
+
+            entries: Dict[str, dict] = {}
+            journal_length = 0
+            manifest_path = os.path.join(conf_dir, HISTORY_MANIFEST_FILE)
+            if os.path.exists(manifest_path):
+                try:
+                    for record in _read_records(manifest_path):
+                        journal_length += 1
+                        if record.get("deleted"):
+                            entries.pop(record["uid"], None)
+                        else:
+                            entries[record["uid"]] = record["entry"]
+                except Exception as e:
+                    logger.error(f"Failed to read history manifest, rebuilding: {e}")
+                    entries = {}
+
+            self._manifests[conf_dir] = entries
+            self._manifest_journal_lengths[conf_dir] = journal_length
+            return entries
+
+    def _record_manifest_entry(
+        self, conf_dir: str, history_uid: str, entry: dict | None
+    ) -> None:
+        """Set (or remove, if entry is None) the manifest entry of a history"""
+        with self._manifest_lock:
+            entries = self._load_manifest(conf_dir)
+            if entry is None:
+                if history_uid not in entries:
+                    return
+                entries.pop(history_uid)
+                record = {"uid": history_uid, "deleted": True}
+            else:
+                entries[history_uid] = entry
+                record = {"uid": history_uid, "entry": entry}
+
+            manifest_path = os.path.join(conf_dir, HISTORY_MANIFEST_FILE)
+            journal_length = self._manifest_journal_lengths.get(conf_dir, 0) + 1
+            try:
+                if journal_length > max(2 * len(entries), _MANIFEST_MIN_COMPACT_LINES):
+                    _write_records(
+                        manifest_path,
+                        [{"uid": uid, "entry": e} for uid, e in entries.items()],
+                    )
+                    journal_length = len(entries)
+                else:
+                    with open(manifest_path, "a", encoding="utf-8") as f:
+                        f.write(_dump_record(record))
+                    self._dirty_paths.add(manifest_path)
+            except Exception as e:
+                logger.error(f"Failed to write history manifest: {e}")
+            self._manifest_journal_lengths[conf_dir] = journal_length
+
+    def _update_manifest_entry(
+        self,
+        conf_dir: str,
+        history_uid: str,
+        filepath: str,
+        previous_signature: List[int] | None,
+        apply: Callable[[dict], dict],
+    ) -> None:
+        """Incrementally update the manifest entry of a history after a write
+
+        Args:
+            conf_dir: Directory of the conf the history belongs to
+            history_uid: History unique identifier
+            filepath: Path of the history file that was written
+            previous_signature: File signature before the write
+            apply: Function returning the updated entry from the current one
+
+        The entry is rebuilt from the file instead if it is missing or the file
+        was changed outside the app before this write.
+        """
+        try:
+            with self._manifest_lock:
+                entry = self._load_manifest(conf_dir).get(history_uid)
+                if entry is None or entry.get("signature") != previous_signature:
+                    entry = _summarize_history(filepath)
+                else:
+                    entry = apply(dict(entry))
+                    entry["signature"] = _file_signature(filepath)
+                self._record_manifest_entry(conf_dir, history_uid, entry)
+        except Exception as e:
+            logger.error(f"Failed to update history manifest for {history_uid}: {e}")
+
+    def _sync_manifest(self, conf_dir: str) -> Dict[str, dict]:
+        """Bring the manifest of a conf directory in line with the files on disk
+
+        Only the stat of each history file is checked; files are read again only
+        when they were added or changed outside the app.
+        """
+        with self._manifest_lock:
+            entries = self._load_manifest(conf_dir)
+            on_disk = set()
+            with os.scandir(conf_dir) as dir_entries:
+                for dir_entry in dir_entries:
+                    if not dir_entry.name.endswith(HISTORY_FILE_EXT):
+                        continue
+                    history_uid = dir_entry.name[: -len(HISTORY_FILE_EXT)]
+                    on_disk.add(history_uid)
+                    try:
+                        stat = dir_entry.stat()
+                        entry = entries.get(history_uid)
+                        if entry is None or entry.get("signature") != [
+                            stat.st_mtime_ns,
+                            stat.st_size,
+                        ]:
+                            self._record_manifest_entry(
+                                conf_dir,
+                                history_uid,
+                                _summarize_history(dir_entry.path),
+                            )
+                    except Exception as e:
+                        logger.error(
+                            f"Error reading history file {dir_entry.name}: {e}"
+                        )
+
+            for history_uid in [uid for uid in entries if uid not in on_disk]:
+                self._record_manifest_entry(conf_dir, history_uid, None)
+
+            return dict(entries)
+
+    # ==== HistoryInterface
+
+    def create_new_history(self, conf_uid: str) -> str:
+        # Use uuid.uuid4().hex to generate a UUID without hyphens
+        # New format: UUID_YYYY-MM-DD_HH-MM-SS
+        history_uid = (
+            f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_{uuid.uuid4().hex}"
+        )
+        conf_dir = self._ensure_conf_dir(conf_uid)  # conf_uid is sanitized here
+
+        # Create history file with empty metadata
+        try:
+            filepath = os.path.join(conf_dir, f"{history_uid}{HISTORY_FILE_EXT}")
+            initial_metadata = {
+                "role": "metadata",
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+            }
+            with open(filepath, "w", encoding="utf-8") as f:
+                f.write(_dump_record(initial_metadata))
+            self._record_manifest_entry(
+                conf_dir, history_uid, _summarize_history(filepath)
+            )
+        except Exception as e:
+            logger.error(f"Failed to create new history file: {e}")
+            return ""
+
+        logger.debug(f"Created new history file with empty metadata: {filepath}")
+        return history_uid
+
+    def append_messages(
+        self, conf_uid: str, history_uid: str, messages: List[HistoryMessage]
+    ) -> None:
+        """Append messages as lines at the end of the file, so the cost does
+        not depend on the length of the conversation."""
+        if not messages:
+            return
+
+        filepath = self._resolve_history_path(conf_uid, history_uid)
+        logger.debug(f"Storing {len(messages)} message(s) to {filepath}")
+
+        latest_message = messages[-1]
+        with self._manifest_lock:
+            previous_signature = (
+                _file_signature(filepath) if os.path.exists(filepath) else None
+            )
+            with open(filepath, "a", encoding="utf-8") as f:
+                f.writelines(_dump_record(message) for message in messages)
+            self._dirty_paths.add(filepath)
+            self._update_manifest_entry(
+                os.path.dirname(filepath),
+                history_uid,
+                filepath,
+                previous_signature,
+                lambda entry: {
+                    **entry,
+                    "latest_message": latest_message,
+                    "timestamp": latest_message["timestamp"],
+                    "message_count": entry["message_count"] + len(messages),
+                    "empty": False,
+                },
+            )
+        logger.debug(f"Successfully stored {latest_message['role']} message")
+
+    def get_metadata(self, conf_uid: str, history_uid: str) -> dict:
+        filepath = self._resolve_history_path(conf_uid, history_uid)
+        if not os.path.exists(filepath):
+            return {}
+
+        try:
+            first_record = _read_first_record(filepath)
+            if first_record and first_record["role"] == "metadata":
+                return first_record
+        except Exception as e:
+            logger.error(f"Failed to get metadata: {e}")
+        return {}
+
+    def update_metadata(self, conf_uid: str, history_uid: str, metadata: dict) -> bool:
+        filepath = self._resolve_history_path(conf_uid, history_uid)
+        if not os.path.exists(filepath):
+            return False
+
+        try:
+            history_data = _read_records(filepath)
+
+            if history_data and history_data[0]["role"] == "metadata":
+                # Update existing metadata while preserving other fields
+                history_data[0].update(metadata)
+            else:
+                # Create new metadata with timestamp if none exists
+                new_metadata = {
+                    "role": "metadata",
+                    "timestamp": datetime.now().isoformat(timespec="seconds"),
+                }
+                new_metadata.update(metadata)  # Add new fields
+                history_data.insert(0, new_metadata)
+
+            # Metadata lives in the first line, so this is the only rewrite left
+            with self._manifest_lock:
+                previous_signature = _file_signature(filepath)
+                _write_records(filepath, history_data)
+                self._update_manifest_entry(
+                    os.path.dirname(filepath),
+                    history_uid,
+                    filepath,
+                    previous_signature,
+                    lambda entry: entry,
+                )
+
+            logger.debug(f"Updated metadata for history {history_uid}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to set metadata: {e}")
+        return False
+
+    def get_history(self, conf_uid: str, history_uid: str) -> List[HistoryMessage]:
+        filepath = self._resolve_history_path(conf_uid, history_uid)
+
+        if not os.path.exists(filepath):
+            logger.warning(f"History file not found: {filepath}")
+            return []
+
+        try:
+            history_data = _read_records(filepath)
+            # Filter out metadata
+            return [msg for msg in history_data if msg["role"] != "metadata"]
+        except Exception:
+            return []
+
+    def delete_history(self, conf_uid: str, history_uid: str) -> bool:
+        filepath = self._resolve_history_path(conf_uid, history_uid)
+        try:
+            if os.path.exists(filepath):
+                os.remove(filepath)
+                self._record_manifest_entry(
+                    os.path.dirname(filepath), history_uid, None
+                )
+                logger.debug(f"Successfully deleted history file: {filepath}")
+                return True
+        except Exception as e:
+            logger.error(f"Failed to delete history file: {e}")
+        return False
+
+    def get_history_list(self, conf_uid: str) -> List[dict]:
+        """Served from the per-conf manifest; history files are only read again
+        when they are new or were changed outside the app."""
+        histories = []
+        conf_dir = self._ensure_conf_dir(conf_uid)
+        empty_history_uids = []
+
+        try:
+            self.migrate_legacy_histories(conf_uid)
+            entries = self._sync_manifest(conf_dir)
+
+            for history_uid, entry in entries.items():
+                # Empty means the history holds nothing but metadata
+                if entry["empty"]:
+                    empty_history_uids.append(history_uid)
+                    continue
+
+                histories.append(
+                    {
+                        "uid": history_uid,
+                        "latest_message": entry["latest_message"],
+                        "timestamp": entry["timestamp"],
+                    }
+                )
+
+            # Clean up empty histories if there are other non-empty ones
+            if len(empty_history_uids) > 0 and len(entries) > 1:
+                for uid in empty_history_uids:
+                    try:
+                        os.remove(os.path.join(conf_dir, f"{uid}{HISTORY_FILE_EXT}"))
+                        self._record_manifest_entry(conf_dir, uid, None)
+                        logger.info(f"Removed empty history file: {uid}")
+                    except Exception as e:
+                        logger.error(f"Failed to remove empty history file {uid}: {e}")
+
+            histories.sort(
+                key=lambda x: x["timestamp"] if x["timestamp"] else "", reverse=True
+            )
+            return histories
+
+        except Exception as e:
+            logger.error(f"Error listing histories: {e}")
+            return []
+
+    def modify_latest_message(
+        self,
+        conf_uid: str,
+        history_uid: str,
+        role: Literal["human", "ai", "system"],
+        new_content: str,
+    ) -> bool:
+        filepath = self._resolve_history_path(conf_uid, history_uid)
+        if not os.path.exists(filepath):
+            logger.warning(f"History file not found: {filepath}")
+            return False
+
+        try:
+            last_record = _read_last_record(filepath)
+
+            if not last_record:
+                logger.warning("History is empty")
+                return False
+
+            offset, latest_message = last_record
+            if latest_message["role"] != role:
+                logger.warning(
+                    f"Latest message role ({latest_message['role']}) doesn't match requested role ({role})"
+                )
+                return False
+
+            # Replace only the last line
+            latest_message["content"] = new_content
+            with self._manifest_lock:
+                previous_signature = _file_signature(filepath)
+                _replace_tail(
+                    filepath, offset, _dump_record(latest_message).encode("utf-8")
+                )
+                self._update_manifest_entry(
+                    os.path.dirname(filepath),
+                    history_uid,
+                    filepath,
+                    previous_signature,
+                    lambda entry: {**entry, "latest_message": latest_message},
+                )
+
+            logger.debug(f"Successfully modified latest {role} message")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to modify latest message: {e}")
+            return False
+
+    def rename_history(
+        self, conf_uid: str, old_history_uid: str, new_history_uid: str
+    ) -> bool:
+        old_filepath = self._resolve_history_path(conf_uid, old_history_uid)
+        new_filepath = self._get_safe_history_path(conf_uid, new_history_uid)
+
+        try:
+            if os.path.exists(old_filepath):
+                conf_dir = os.path.dirname(old_filepath)
+                with self._manifest_lock:
+                    os.rename(old_filepath, new_filepath)
+                    entry = self._load_manifest(conf_dir).get(old_history_uid)
+                    self._record_manifest_entry(conf_dir, old_history_uid, None)
+                    self._record_manifest_entry(
+                        conf_dir,
+                        new_history_uid,
+                        {**entry, "signature": _file_signature(new_filepath)}
+                        if entry
+                        else _summarize_history(new_filepath),
+                    )
+                logger.info(
+                    f"Renamed history file from {old_history_uid} to {new_history_uid}"
+                )
+                return True
+        except Exception as e:
+            logger.error(f"Failed to rename history file: {e}")
+        return False
+
+    def sync(self) -> None:
+        """fsync every history and manifest file appended to since the last sync"""
+        with self._manifest_lock:
+            dirty_paths, self._dirty_paths = self._dirty_paths, set()
+            for filepath in dirty_paths:
+                try:
+                    with open(filepath, "a", encoding="utf-8") as f:
+                        os.fsync(f.fileno())
+                except FileNotFoundError:
+                    # Deleted or renamed since it was written
+                    continue
+                except Exception as e:
+                    logger.error(f"Failed to sync history file {filepath}: {e}")
@@ -0,0 +1,440 @@
+import os
+import json
+import uuid
+import sqlite3
+import threading
+from datetime import datetime
+from typing import List, Literal
+from loguru import logger
+
+from .history_interface import HistoryInterface, HistoryMessage
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS histories (
+    conf_uid TEXT NOT NULL,
+    history_uid TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    metadata TEXT,
+    PRIMARY KEY (conf_uid, history_uid)
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    conf_uid TEXT NOT NULL,
+    history_uid TEXT NOT NULL,
+    role TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    content TEXT NOT NULL,
+    name TEXT,
+    avatar TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_messages_history
+    ON messages (conf_uid, history_uid, id);
+"""
+
+# External-content FTS5 index over messages.content, kept in sync by triggers
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts
+    USING fts5(content, content='messages', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, content)
+        VALUES ('delete', old.id, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_au AFTER UPDATE OF content ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, content)
+        VALUES ('delete', old.id, old.content);
+    INSERT INTO messages_fts (rowid, content) VALUES (new.id, new.content);
+END;
+"""
+
+_MESSAGE_COLUMNS = "role, timestamp, content, name, avatar"
+# Same columns, qualified for queries joining the messages table as `m`
+_M_MESSAGE_COLUMNS = "m.role, m.timestamp, m.content, m.name, m.avatar"
+
+
+def _row_to_message(row: sqlite3.Row) -> HistoryMessage:
+    """Convert a messages row to the dict format used by the file backend"""
+    message = {
+        "role": row["role"],
+        "timestamp": row["timestamp"],
+        "content": row["content"],
+    }
+    # Optional display information is only present when it was stored
+    if row["name"] is not None:
+        message["name"] = row["name"]
+    if row["avatar"] is not None:
+        message["avatar"] = row["avatar"]
+    return message
+
+
+def _to_fts_query(query: str) -> str:
+    """Quote every term so user input is never parsed as FTS5 syntax"""
+    terms = [term.replace('"', '""') for term in query.split()]
+    return " ".join(f'"{term}"' for term in terms if term)
+
+
+class HistoryBackend(HistoryInterface):
+    """Stores all histories in one SQLite database (WAL mode) with an FTS5
+    full-text index over message content."""
+
+    def __init__(self, db_path: str = "chat_history/history.db"):
+        """
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        # One connection shared by the event loop and worker threads
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            db_path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        try:
+            self._conn.executescript(_FTS_SCHEMA)
+            self._fts_enabled = True
+        except sqlite3.OperationalError as e:
+            logger.warning(
+                f"SQLite FTS5 is not available ({e}), falling back to LIKE search"
+            )
+            self._fts_enabled = False
+
+        logger.info(f"Using SQLite chat history database: {db_path}")
+
+    def _ensure_history(
+        self, conf_uid: str, history_uid: str, metadata: dict | None = None
+    ) -> None:
+        """Insert the histories row if it does not exist yet"""
+        self._conn.execute(
+            "INSERT OR IGNORE INTO histories (conf_uid, history_uid, created_at, metadata) "
+            "VALUES (?, ?, ?, ?)",
+            (
+                conf_uid,
+                history_uid,
+                datetime.now().isoformat(timespec="seconds"),
+                json.dumps(metadata, ensure_ascii=False) if metadata else None,
+            ),
+        )
+
+    def _history_exists(self, conf_uid: str, history_uid: str) -> bool:
+        row = self._conn.execute(
+            "SELECT 1 FROM histories WHERE conf_uid = ? AND history_uid = ?",
+            (conf_uid, history_uid),
+        ).fetchone()
+        return row is not None
+
+    def create_new_history(self, conf_uid: str) -> str:
+        # Same uid format as the file backend: YYYY-MM-DD_HH-MM-SS_UUID
+        history_uid = (
+            f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_{uuid.uuid4().hex}"
+        )
+        try:
+            with self._lock:
+                self._ensure_history(
+                    conf_uid,
+                    history_uid,
+                    {
+                        "role": "metadata",
+                        "timestamp": datetime.now().isoformat(timespec="seconds"),
+                    },
+                )
+        except Exception as e:
+            logger.error(f"Failed to create new history: {e}")
+            return ""
+
+        logger.debug(f"Created new history with empty metadata: {history_uid}")
+        return history_uid
+
+    def append_messages(
+        self, conf_uid: str, history_uid: str, messages: List[HistoryMessage]
+    ) -> None:
+        if not messages:
+            return
+
+        logger.debug(f"Storing {len(messages)} message(s) to {conf_uid}/{history_uid}")
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._ensure_history(conf_uid, history_uid)
+                self._conn.executemany(
+                    f"INSERT INTO messages (conf_uid, history_uid, {_MESSAGE_COLUMNS}) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            conf_uid,
+                            history_uid,
+                            message["role"],
+                            message["timestamp"],
+                            message["content"],
+                            message.get("name"),
+                            message.get("avatar"),
+                        )
+                        for message in messages
+                    ],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        logger.debug(f"Successfully stored {messages[-1]['role']} message")
+
+    def get_metadata(self, conf_uid: str, history_uid: str) -> dict:
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT metadata FROM histories WHERE conf_uid = ? AND history_uid = ?",
+                    (conf_uid, history_uid),
+                ).fetchone()
+            if row and row["metadata"]:
+                return json.loads(row["metadata"])
+        except Exception as e:
+            logger.error(f"Failed to get metadata: {e}")
+        return {}
+
+    def update_metadata(self, conf_uid: str, history_uid: str, metadata: dict) -> bool:
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT metadata FROM histories WHERE conf_uid = ? AND history_uid = ?",
+                    (conf_uid, history_uid),
+                ).fetchone()
+                if row is None:
+                    return False
+
+                if row["metadata"]:
+                    # Update existing metadata while preserving other fields
+                    new_metadata = json.loads(row["metadata"])
+                else:
+                    # Create new metadata with timestamp if none exists
+                    new_metadata = {
+                        "role": "metadata",
+                        "timestamp": datetime.now().isoformat(timespec="seconds"),
+                    }
+                new_metadata.update(metadata)
+
+                self._conn.execute(
+                    "UPDATE histories SET metadata = ? WHERE conf_uid = ? AND history_uid = ?",
+                    (
+                        json.dumps(new_metadata, ensure_ascii=False),
+                        conf_uid,
+                        history_uid,
+                    ),
+                )
+
+            logger.debug(f"Updated metadata for history {history_uid}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to set metadata: {e}")
+        return False
+
+    def get_history(self, conf_uid: str, history_uid: str) -> List[HistoryMessage]:
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT {_MESSAGE_COLUMNS} FROM messages "
+                    "WHERE conf_uid = ? AND history_uid = ? ORDER BY id",
+                    (conf_uid, history_uid),
+                ).fetchall()
+            return [_row_to_message(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Failed to read history {history_uid}: {e}")
+            return []
+
+    def delete_history(self, conf_uid: str, history_uid: str) -> bool:
+        try:
+            with self._lock:
+                self._conn.execute("BEGIN")
+                try:
+                    self._conn.execute(
+                        "DELETE FROM messages WHERE conf_uid = ? AND history_uid = ?",
+                        (conf_uid, history_uid),
+                    )
+                    deleted = self._conn.execute(
+                        "DELETE FROM histories WHERE conf_uid = ? AND history_uid = ?",
+                        (conf_uid, history_uid),
+                    ).rowcount
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            if deleted:
+                logger.debug(f"Successfully deleted history: {history_uid}")
+                return True
+        except Exception as e:
+            logger.error(f"Failed to delete history: {e}")
+        return False
+
+    def get_history_list(self, conf_uid: str) -> List[dict]:
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"""
+                    SELECT h.history_uid, m.id, {_M_MESSAGE_COLUMNS}
+                    FROM histories h
+                    LEFT JOIN messages m ON m.id = (
+                        SELECT MAX(id) FROM messages
+                        WHERE conf_uid = h.conf_uid AND history_uid = h.history_uid
+                    )
+                    WHERE h.conf_uid = ?
+                    """,
+                    (conf_uid,),
+                ).fetchall()
+
+            histories = []
+            empty_history_uids = []
+            for row in rows:
+                if row["id"] is None:
+                    empty_history_uids.append(row["history_uid"])
+                    continue
+                latest_message = _row_to_message(row)
+                histories.append(
+                    {
+                        "uid": row["history_uid"],
+                        "latest_message": latest_message,
+                        "timestamp": latest_message["timestamp"],
+                    }
+                )
+
+            # Clean up empty histories if there are other non-empty ones
+            if empty_history_uids and len(rows) > 1:
+                for uid in empty_history_uids:
+                    if self.delete_history(conf_uid, uid):
+                        logger.info(f"Removed empty history: {uid}")
+
+            histories.sort(
+                key=lambda x: x["timestamp"] if x["timestamp"] else "", reverse=True
+            )
+            return histories
+
+        except Exception as e:
+            logger.error(f"Error listing histories: {e}")
+            return []
+
+    def modify_latest_message(
+        self,
+        conf_uid: str,
+        history_uid: str,
+        role: Literal["human", "ai", "system"],
+        new_content: str,
+    ) -> bool:
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT id, role FROM messages WHERE conf_uid = ? AND history_uid = ? "
+                    "ORDER BY id DESC LIMIT 1",
+                    (conf_uid, history_uid),
+                ).fetchone()
+
+                if row is None:
+                    logger.warning("History is empty")
+                    return False
+
+                if row["role"] != role:
+                    logger.warning(
+                        f"Latest message role ({row['role']}) doesn't match requested role ({role})"
+                    )
+                    return False
+
+                self._conn.execute(
+                    "UPDATE messages SET content = ? WHERE id = ?",
+                    (new_content, row["id"]),
+                )
+
+            logger.debug(f"Successfully modified latest {role} message")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to modify latest message: {e}")
+            return False
+
+    def rename_history(
+        self, conf_uid: str, old_history_uid: str, new_history_uid: str
+    ) -> bool:
+        try:
+            with self._lock:
+                if not self._history_exists(conf_uid, old_history_uid):
+                    return False
+                self._conn.execute("BEGIN")
+                try:
+                    for table in ("histories", "messages"):
+                        self._conn.execute(
+                            f"UPDATE {table} SET history_uid = ? "
+                            "WHERE conf_uid = ? AND history_uid = ?",
+                            (new_history_uid, conf_uid, old_history_uid),
+                        )
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            logger.info(f"Renamed history from {old_history_uid} to {new_history_uid}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to rename history: {e}")
+        return False
+
+    def search_history(self, conf_uid: str, query: str, limit: int = 20) -> List[dict]:
+        """Full-text search over the messages of a conf, best matches first"""
+        if not query.strip():
+            return []
+
+        with self._lock:
+            if self._fts_enabled:
+                rows = self._conn.execute(
+                    f"""
+                    SELECT m.history_uid, {_M_MESSAGE_COLUMNS},
+                        snippet(messages_fts, 0, '[', ']', '...', 16) AS snippet
+                    FROM messages_fts
+                    JOIN messages m ON m.id = messages_fts.rowid
+                    WHERE messages_fts MATCH ? AND m.conf_uid = ?
+                    ORDER BY messages_fts.rank
+                    LIMIT ?
+                    """,
+                    (_to_fts_query(query), conf_uid, limit),
+                ).fetchall()
+            else:
+                escaped = (
+                    query.strip()
+                    .replace("\\", "\\\\")
+                    .replace("%", "\\%")
+                    .replace("_", "\\_")
+                )
+                rows = self._conn.execute(
+                    f"""
+                    SELECT m.history_uid, {_M_MESSAGE_COLUMNS}, m.content AS snippet
+                    FROM messages m
+                    WHERE m.conf_uid = ? AND m.content LIKE ? ESCAPE '\\'
+                    ORDER BY m.id DESC
+                    LIMIT ?
+                    """,
+                    (conf_uid, f"%{escaped}%", limit),
+                ).fetchall()
+
+        return [
+            {
+                "uid": row["history_uid"],
+                "message": _row_to_message(row),
+                "snippet": row["snippet"],
+            }
+            for row in rows
+        ]
+
+    def sync(self) -> None:
+        """With synchronous=NORMAL, commits are not fsynced until the WAL is
+        checkpointed; checkpoint now so everything is on disk."""
+        try:
+            with self._lock:
+                self._conn.execute("PRAGMA wal_checkpoint(FULL)")
+        except Exception as e:
+            logger.error(f"Failed to checkpoint history database: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,273 @@
+import asyncio
+import threading
+from typing import Dict, List, Literal, Tuple
+from loguru import logger
+
+from .history_interface import HistoryInterface, HistoryMessage
+
+HistoryKey = Tuple[str, str]
+
+
+class WriteBehindHistory(HistoryInterface):
+    """Wraps a history backend so that storing a message never touches the
+    disk on the event loop.
+
+    Messages stored from a coroutine are timestamped and queued in memory,
+    then written per history in batches by a background task, when
+    `flush_interval` seconds have passed or `max_batch_size` messages are
+    waiting. Stores made outside of an event loop are written through.
+
+    get_history includes queued messages (read-your-writes). Every other
+    operation on a history first writes its queued messages, so the wrapped
+    backend always sees messages in order. Those operations do backend I/O,
+    so coroutines call them through `asyncio.to_thread`; storing a message
+    never waits for the disk, even while a flush is writing. Call `aclose`
+    (or `close`) on shutdown to flush and fsync everything.
+    """
+
+    def __init__(
+        self,
+        backend: HistoryInterface,
+        flush_interval: float = 0.5,
+        max_batch_size: int = 32,
+    ):
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+
+        # Messages waiting for the next flush
+        self._pending: Dict[HistoryKey, List[HistoryMessage]] = {}
+        self._pending_count = 0
+        # Messages taken by a running flush but not written yet
+        self._in_flight: Dict[HistoryKey, List[HistoryMessage]] = {}
+        # Guards the two dicts above. Only held to read or swap them, never
+        # during backend I/O, so storing a message never waits for the disk.
+        self._lock = threading.Lock()
+        # Serializes the calls into the backend, so the batches of a history
+        # are written in order and a reader never sees a batch both in
+        # memory and on disk. Taken before self._lock, never while holding it.
+        self._io_lock = threading.RLock()
+
+        self._flusher: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._flush_lock: asyncio.Lock | None = None
+
+    # ---- write-behind machinery ----
+
+    def _ensure_flusher(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start the background flush task on the given loop if needed"""
+        if self._flusher is not None and not self._flusher.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flusher = loop.create_task(self._run_flusher())
+
+    async def _run_flusher(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing chat history: {e}")
+
+    async def flush(self) -> None:
+        """Write all queued messages without blocking the event loop"""
+        if self._flush_lock is None:
+            await asyncio.to_thread(self._drain_all)
+            return
+
+        async with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                batches = list(self._pending)
+                for key, messages in self._pending.items():
+                    self._in_flight.setdefault(key, []).extend(messages)
+                self._pending = {}
+                self._pending_count = 0
+            await asyncio.to_thread(self._write_in_flight, batches)
+
+    def _write_in_flight(self, keys: List[HistoryKey]) -> None:
+        for key in keys:
+            with self._io_lock:
+                with self._lock:
+                    messages = self._in_flight.pop(key, None)
+                self._write_batch(key, messages)
+
+    def _write_batch(self, key: HistoryKey, messages: List[HistoryMessage]) -> None:
+        """Write one batch to the backend. The caller holds self._io_lock."""
+        if not messages:
+            return
+        try:
+            self.backend.append_messages(key[0], key[1], messages)
+        except Exception as e:
+            logger.error(
+                f"Failed to write {len(messages)} message(s) to history "
+                f"{key[0]}/{key[1]}: {e}"
+            )
+
+    def _drain(self, key: HistoryKey) -> None:
+        """Write everything queued for one history. The caller holds
+        self._io_lock."""
+        with self._lock:
+            messages = self._in_flight.pop(key, [])
+            pending = self._pending.pop(key, None)
+            if pending:
+                self._pending_count -= len(pending)
+                messages += pending
+        self._write_batch(key, messages)
+
+    def _drain_conf(self, conf_uid: str) -> None:
+        """Write everything queued for the histories of a conf. The caller
+        holds self._io_lock."""
+        with self._lock:
+            keys = {
+                key for key in [*self._in_flight, *self._pending] if key[0] == conf_uid
+            }
+        for key in keys:
+            self._drain(key)
+
+    def _drain_all(self) -> None:
+        with self._io_lock:
+            with self._lock:
+                keys = set(self._in_flight) | set(self._pending)
+            for key in keys:
+                self._drain(key)
+
+    def _discard(self, key: HistoryKey) -> None:
+        """Drop everything queued for one history"""
+        with self._lock:
+            self._in_flight.pop(key, None)
+            messages = self._pending.pop(key, None)
+            if messages:
+                self._pending_count -= len(messages)
+
+    # ---- HistoryInterface ----
+    # Every method but append_messages does backend I/O: call them from a
+    # thread (asyncio.to_thread) when on the event loop.
+
+    def create_new_history(self, conf_uid: str) -> str:
+        with self._io_lock:
+            return self.backend.create_new_history(conf_uid)
+
+    def append_messages(
+        self, conf_uid: str, history_uid: str, messages: List[HistoryMessage]
+    ) -> None:
+        key = (conf_uid, history_uid)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is None:
+            # Not called from a coroutine: write through, after anything queued
+            with self._io_lock:
+                self._drain(key)
+                self.backend.append_messages(conf_uid, history_uid, messages)
+            return
+
+        self._ensure_flusher(loop)
+        with self._lock:
+            self._pending.setdefault(key, []).extend(messages)
+            self._pending_count += len(messages)
+            batch_full = self._pending_count >= self.max_batch_size
+        if batch_full:
+            self._wakeup.set()
+
+    def get_metadata(self, conf_uid: str, history_uid: str) -> dict:
+        with self._io_lock:
+            return self.backend.get_metadata(conf_uid, history_uid)
+
+    def update_metadata(self, conf_uid: str, history_uid: str, metadata: dict) -> bool:
+        with self._io_lock:
+            self._drain((conf_uid, history_uid))
+            return self.backend.update_metadata(conf_uid, history_uid, metadata)
+
+    def get_history(self, conf_uid: str, history_uid: str) -> List[HistoryMessage]:
+        key = (conf_uid, history_uid)
+        with self._io_lock:
+            messages = self.backend.get_history(conf_uid, history_uid)
+            with self._lock:
+                return (
+                    messages + self._in_flight.get(key, []) + self._pending.get(key, [])
+                )
+
+    def delete_history(self, conf_uid: str, history_uid: str) -> bool:
+        with self._io_lock:
+            self._discard((conf_uid, history_uid))
+            return self.backend.delete_history(conf_uid, history_uid)
+
+    def get_history_list(self, conf_uid: str) -> List[dict]:
+        with self._io_lock:
+            self._drain_conf(conf_uid)
+            return self.backend.get_history_list(conf_uid)
+
+    def modify_latest_message(
+        self,
+        conf_uid: str,
+        history_uid: str,
+        role: Literal["human", "ai", "system"],
+        new_content: str,
+    ) -> bool:
+        key = (conf_uid, history_uid)
+        with self._io_lock:
+            with self._lock:
+                pending = self._pending.get(key)
+                if pending:
+                    # The latest message has not been written yet: edit it
+                    # in memory
+                    if pending[-1]["role"] != role:
+                        logger.warning(
+                            f"Latest message role ({pending[-1]['role']}) "
+                            f"doesn't match requested role ({role})"
+                        )
+                        return False
+                    pending[-1]["content"] = new_content
+                    return True
+
+            self._drain(key)
+            return self.backend.modify_latest_message(
+                conf_uid, history_uid, role, new_content
+            )
+
+    def rename_history(
+        self, conf_uid: str, old_history_uid: str, new_history_uid: str
+    ) -> bool:
+        with self._io_lock:
+            self._drain((conf_uid, old_history_uid))
+            return self.backend.rename_history(
+                conf_uid, old_history_uid, new_history_uid
+            )
+
+    def search_history(self, conf_uid: str, query: str, limit: int = 20) -> List[dict]:
+        with self._io_lock:
+            self._drain_conf(conf_uid)
+            return self.backend.search_history(conf_uid, query, limit)
+
+    def sync(self) -> None:
+        with self._io_lock:
+            self._drain_all()
+            self.backend.sync()
+
+    async def aclose(self) -> None:
+        """Stop the flush task, then write, fsync and close everything"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await asyncio.to_thread(self.close)
+
+    def close(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        with self._io_lock:
+            self.sync()
+            self.backend.close()
@@ -5,6 +5,8 @@ from phonemizer import phonemize
 from phonemizer.separator import Separator
 from typing import List
 
+from .utils.cache_manager import get_cache_manager
+
 _PHONEME_TO_VISEME = {
     "AA": "A", "AE": "A", "AH": "A", "AO": "O",
     "AW": "O", "AY": "A", "EH": "E", "ER": "E",
@@ -25,11 +27,15 @@ class LipSyncEngine:
 
     def _transcribe(self, audio_bytes: bytes) -> str:
         buf = io.BytesIO(audio_bytes)
+        cache_manager = get_cache_manager()
         with wave.open(buf, "rb") as _:
-            tmp = "tmp_whisper.wav"
+            tmp = cache_manager.temp_path("whisper_", ".wav")
             with open(tmp, "wb") as f:
                 f.write(audio_bytes)
-        result = self.whisper.transcribe(tmp)
+        try:
+            result = self.whisper.transcribe(tmp)
+        finally:
+            cache_manager.release(tmp)
         return result["text"]
 
     def _text_to_phonemes(self, text: str) -> List[str]:
@@ -1,12 +1,18 @@
 import json
+import asyncio
 from uuid import uuid4
+from typing import Awaitable, Callable, List, Optional, Set
 import numpy as np
-from datetime import datetime
 from fastapi import APIRouter, WebSocket, UploadFile, File, Response
 from starlette.websockets import WebSocketDisconnect
 from loguru import logger
 from .service_context import ServiceContext
 from .websocket_handler import WebSocketHandler
+from .tts.tts_interface import GeneratedAudio
+from .tts.tts_scheduler import get_tts_scheduler, get_tts_scheduler_stats
+from .asr.asr_batcher import get_asr_batcher_stats
+from .utils.sentence_divider import SentenceDivider
+from .utils.cache_manager import get_cache_manager, set_cache_owner
 
 
 def init_client_ws_route(default_context_cache: ServiceContext) -> APIRouter:
@@ -28,6 +34,8 @@ def init_client_ws_route(default_context_cache: ServiceContext) -> APIRouter:
         """WebSocket endpoint for client connections"""
         await websocket.accept()
         client_uid = str(uuid4())
+        # Cache files created for this client are removed when it disconnects
+        set_cache_owner(client_uid)
 
         try:
             await ws_handler.handle_new_connection(websocket, client_uid)
@@ -65,6 +73,21 @@ def init_webtool_routes(default_context_cache: ServiceContext) -> APIRouter:
         """Redirect /web_tool to /web_tool/index.html"""
         return Response(status_code=302, headers={"Location": "/web-tool/index.html"})
 
+    @router.get("/tts-stats")
+    async def tts_stats():
+        """Queue depth and wait times of the TTS engines in use"""
+        return {"schedulers": get_tts_scheduler_stats()}
+
+    @router.get("/asr-stats")
+    async def asr_stats():
+        """Batch sizes and wait times of the local ASR models in use"""
+        return {"batchers": get_asr_batcher_stats()}
+
+    @router.get("/cache-stats")
+    async def cache_stats():
+        """Disk usage and cleanups of the cache directory"""
+        return get_cache_manager().stats()
+
     @router.post("/asr")
     async def transcribe_audio(file: UploadFile = File(...)):
         """
@@ -127,9 +150,26 @@ def init_webtool_routes(default_context_cache: ServiceContext) -> APIRouter:
 
     @router.websocket("/tts-ws")
     async def tts_endpoint(websocket: WebSocket):
-        """WebSocket endpoint for TTS generation"""
+        """
+        WebSocket endpoint for TTS generation
+
+        Each message {"text": ..., "request_id": optional} is split into
+        sentences, which are synthesized concurrently (bounded by the TTS
+        scheduler of the engine) and sent back in order as each one is ready.
+        Requests with a request_id run concurrently and their messages carry
+        it; requests without one are served one after another.
+        """
         await websocket.accept()
         logger.info("TTS WebSocket connection established")
+        session_uid = f"tts-ws-{uuid4()}"
+        set_cache_owner(session_uid)
+        send_lock = asyncio.Lock()
+        request_tasks: Set[asyncio.Task] = set()
+
+        async def send_json(message: dict) -> None:
+            # Concurrent requests share the socket
+            async with send_lock:
+                await websocket.send_json(message)
 
         try:
             while True:
@@ -138,44 +178,124 @@ def init_webtool_routes(default_context_cache: ServiceContext) -> APIRouter:
                 if not text:
                     continue
 
+                request_id = data.get("request_id")
                 logger.info(f"Received text for TTS: {text}")
-
-                # Split text into sentences
-                sentences = [s.strip() for s in text.split(".") if s.strip()]
-
-                try:
-                    # Generate and send audio for each sentence
-                    for sentence in sentences:
-                        sentence = sentence + "."  # Add back the period
-                        file_name = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{str(uuid4())[:8]}"
-                        audio_path = (
-                            await default_context_cache.tts_engine.async_generate_audio(
-                                text=sentence, file_name_no_ext=file_name
-                            )
-                        )
-                        logger.info(
-                            f"Generated audio for sentence: {sentence} at: {audio_path}"
-                        )
-
-                        await websocket.send_json(
-                            {
-                                "status": "partial",
-                                "audioPath": audio_path,
-                                "text": sentence,
-                            }
-                        )
-
-                    # Send completion signal
-                    await websocket.send_json({"status": "complete"})
-
-                except Exception as e:
-                    logger.error(f"Error generating TTS: {e}")
-                    await websocket.send_json({"status": "error", "message": str(e)})
+                stream = _stream_tts_sentences(
+                    default_context_cache, text, send_json, session_uid, request_id
+                )
+                if request_id is None:
+                    await stream
+                else:
+                    task = asyncio.create_task(stream)
+                    request_tasks.add(task)
+                    task.add_done_callback(request_tasks.discard)
 
         except WebSocketDisconnect:
             logger.info("TTS WebSocket client disconnected")
         except Exception as e:
             logger.error(f"Error in TTS WebSocket connection: {e}")
             await websocket.close()
+        finally:
+            for task in request_tasks:
+                task.cancel()
+            get_cache_manager().release_owner(session_uid)
 
     return router
+
+
+async def _divide_sentences(context: ServiceContext, text: str) -> List[str]:
+    """Split text into sentences like the agent does for its answers"""
+    agent_settings = context.character_config.agent_config.agent_settings
+    basic_memory_config = agent_settings.basic_memory_agent
+    divider = SentenceDivider(
+        faster_first_response=(
+            basic_memory_config.faster_first_response if basic_memory_config else True
+        ),
+        segment_method=(
+            basic_memory_config.segment_method if basic_memory_config else "pysbd"
+        ),
+    )
+
+    async def segments():
+        yield text
+
+    return [
+        sentence.text
+        async for sentence in divider.process_stream(segments())
+        if sentence.text.strip()
+    ]
+
+
+async def _stream_tts_sentences(
+    context: ServiceContext,
+    text: str,
+    send_json: Callable[[dict], Awaitable[None]],
+    session_uid: str,
+    request_id: Optional[str] = None,
+) -> None:
+    """Synthesize the sentences of a /tts-ws request concurrently and send
+    their audio paths in order.
+
+    The audio is written to temporary files of the cache directory, which is
+    served at /cache and where the web tool fetches it. They belong to the
+    session and are removed when it ends (or by the cache quota).
+    """
+    tts_engine = context.tts_engine
+    scheduler = get_tts_scheduler(tts_engine)
+    request_fields = {} if request_id is None else {"request_id": request_id}
+
+    async def synthesize(index: int, sentence: str) -> Optional[str]:
+        # The first sentence is scheduled first, as in conversations
+        async with scheduler.slot(session_uid, priority=index == 0):
+            audio = await tts_engine.async_generate_audio_bytes(sentence)
+        if audio is None:
+            return None
+        return await asyncio.to_thread(_write_audio_file, audio)
+
+    tasks: List[asyncio.Task] = []
+    sent = 0
+    try:
+        sentences = await _divide_sentences(context, text)
+        tasks = [
+            asyncio.create_task(synthesize(index, sentence))
+            for index, sentence in enumerate(sentences)
+        ]
+        for sentence, task in zip(sentences, tasks):
+            audio_path = await task
+            logger.info(f"Generated audio for sentence: {sentence} at: {audio_path}")
+            await send_json(
+                {
+                    "status": "partial",
+                    "audioPath": audio_path,
+                    "text": sentence,
+                    **request_fields,
+                }
+            )
+            sent += 1
+
+        # Send completion signal
+        await send_json({"status": "complete", **request_fields})
+
+    except Exception as e:
+        logger.error(f"Error generating TTS: {e}")
+        await send_json({"status": "error", "message": str(e), **request_fields})
+    finally:
+        # Stop the syntheses of a failed or cancelled request and remove the
+        # audio the client will never be told about
+        unsent = tasks[sent:]
+        for task in unsent:
+            task.cancel()
+        if unsent:
+            await asyncio.wait(unsent)
+        for task in unsent:
+            if not task.cancelled() and task.exception() is None and task.result():
+                get_cache_manager().release(task.result())
+
+
+def _write_audio_file(audio: GeneratedAudio) -> str:
+    """Write audio to a temporary file of the cache directory, owned by the
+    session of the current task"""
+    path = get_cache_manager().temp_path("tts_", f".{audio.format}")
+    with open(path, "wb") as f:
+        f.write(audio.data)
+    return path
@@ -8,7 +8,12 @@ from starlette.responses import Response
 
 from .routes import init_client_ws_route, init_webtool_routes
 from .service_context import ServiceContext
+from .chat_history_manager import set_history_backend, close_history_backend
+from .history.history_factory import HistoryFactory
+from .history.write_behind import WriteBehindHistory
 from .config_manager.utils import Config
+from .utils.http_client import configure_http_client, close_http_client
+from .utils.cache_manager import configure_cache_manager, get_cache_manager
 
 
 class CustomStaticFiles(StaticFiles):
@@ -41,9 +46,32 @@ class WebSocketServer:
         )
 
         # Load configurations and initialize the default context cache
+        # The HTTP client is configured first: the TTS may be used at init
+        configure_http_client(config.system_config.http_client_config)
+        configure_cache_manager(config.system_config.cache_dir_config)
         default_context_cache = ServiceContext()
         default_context_cache.load_from_config(config)
 
+        # Select the chat history backend before any client connects
+        history_config = default_context_cache.system_config.chat_history_config
+        history_backend = HistoryFactory.get_history_backend(
+            history_config.history_backend,
+            **getattr(history_config, history_config.history_backend).model_dump(),
+        )
+        if history_config.write_behind:
+            history_backend = WriteBehindHistory(
+                history_backend,
+                flush_interval=history_config.flush_interval,
+                max_batch_size=history_config.max_batch_size,
+            )
+        set_history_backend(history_backend)
+        # Write out queued messages before the process exits
+        self.app.add_event_handler("shutdown", close_history_backend)
+        self.app.add_event_handler("shutdown", close_http_client)
+        # Keep the temporary files of the cache directory under the quota
+        self.app.add_event_handler("startup", get_cache_manager().start)
+        self.app.add_event_handler("shutdown", get_cache_manager().stop)
+
         # Include routes
         self.app.include_router(
             init_client_ws_route(default_context_cache=default_context_cache),
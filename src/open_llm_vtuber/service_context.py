@@ -1,5 +1,7 @@
 import os
 import json
+import asyncio
+from typing import List
 
 from loguru import logger
 from fastapi import WebSocket
@@ -13,7 +15,13 @@ from .agent.agents.agent_interface import AgentInterface
 from .translate.translate_interface import TranslateInterface
 
 from .asr.asr_factory import ASRFactory
+from .asr.asr_batcher import get_asr_batcher
 from .tts.tts_factory import TTSFactory
+from .tts.tts_cache import CachedTTSEngine, get_audio_cache
+from .tts.tts_scheduler import get_tts_scheduler
+from .tts.tts_process_pool import PROCESS_POOL_ENGINES, ProcessPoolTTSEngine
+from .tts.phrase_bank import PhraseBank, build_phrase_bank
+from .utils.http_client import close_http_client
 from .vad.vad_factory import VADFactory
 from .agent.agent_factory import AgentFactory
 from .translate.translate_factory import TranslateFactory
@@ -27,6 +35,7 @@ from .config_manager import (
     TTSConfig,
     VADConfig,
     TranslatorConfig,
+    TTSPreprocessorConfig,
     read_yaml,
     validate_config,
 )
@@ -48,11 +57,18 @@ class ServiceContext:
         # translate_engine can be none if translation is disabled
         self.vad_engine: VADInterface | None = None
         self.translate_engine: TranslateInterface | None = None
+        # Pre-synthesized audio of the character's frequent lines, if any
+        self.phrase_bank: PhraseBank | None = None
+        self._phrase_bank_task: asyncio.Task | None = None
 
         # the system prompt is a combination of the persona prompt and live2d expression prompt
         self.system_prompt: str = None
 
         self.history_uid: str = ""  # Add history_uid field
+        # Set when the client negotiated binary WebSocket frames for audio
+        self.binary_audio: bool = False
+        # Audio codecs the client plays, preferred first
+        self.audio_codecs: List[str] = ["wav"]
 
     def __str__(self):
         return (
@@ -84,6 +100,7 @@ class ServiceContext:
         vad_engine: VADInterface,
         agent_engine: AgentInterface,
         translate_engine: TranslateInterface | None,
+        phrase_bank: PhraseBank | None = None,
     ) -> None:
         """
         Load the ServiceContext with the reference of the provided instances.
@@ -103,6 +120,7 @@ class ServiceContext:
         self.vad_engine = vad_engine
         self.agent_engine = agent_engine
         self.translate_engine = translate_engine
+        self.phrase_bank = phrase_bank
 
         logger.debug(f"Loaded service context with cache: {character_config}")
 
@@ -133,6 +151,10 @@ class ServiceContext:
 
         # init tts from character config
         self.init_tts(config.character_config.tts_config)
+        self.init_phrase_bank(
+            config.character_config.phrase_bank,
+            config.character_config.tts_preprocessor_config,
+        )
 
         # init vad from character config
         self.init_vad(config.character_config.vad_config)
@@ -168,6 +190,13 @@ class ServiceContext:
                 asr_config.asr_model,
                 **getattr(asr_config, asr_config.asr_model).model_dump(),
             )
+            # Transcriptions of all clients sharing the engine are batched
+            batch_config = self.system_config.asr_batch_config
+            get_asr_batcher(
+                self.asr_engine,
+                max_batch_size=batch_config.max_batch_size,
+                max_wait_ms=batch_config.max_wait_ms,
+            )
             # saving config should be done after successful initialization
             self.character_config.asr_config = asr_config
         else:
@@ -176,15 +205,98 @@ class ServiceContext:
     def init_tts(self, tts_config: TTSConfig) -> None:
         if not self.tts_engine or (self.character_config.tts_config != tts_config):
             logger.info(f"Initializing TTS: {tts_config.tts_model}")
-            self.tts_engine = TTSFactory.get_tts_engine(
-                tts_config.tts_model,
-                **getattr(tts_config, tts_config.tts_model.lower()).model_dump(),
+            engine_config = getattr(tts_config, tts_config.tts_model.lower())
+            engine_config = engine_config.model_dump() if engine_config else {}
+            if (
+                tts_config.worker_processes > 0
+                and tts_config.tts_model in PROCESS_POOL_ENGINES
+            ):
+                # Session contexts share the engine of the default context:
+                # the workers of a pool are stopped once no context uses it
+                self.tts_engine = ProcessPoolTTSEngine(
+                    tts_config.tts_model,
+                    engine_config,
+                    num_workers=tts_config.worker_processes,
+                    request_timeout=tts_config.worker_timeout_seconds,
+                )
+            else:
+                self.tts_engine = TTSFactory.get_tts_engine(
+                    tts_config.tts_model, **engine_config
+                )
+            cache_config = self.system_config.tts_cache_config
+            if cache_config.enabled:
+                self.tts_engine = CachedTTSEngine(
+                    self.tts_engine,
+                    engine_key=json.dumps(
+                        [tts_config.tts_model, engine_config],
+                        sort_keys=True,
+                        default=str,
+                    ),
+                    cache=get_audio_cache(
+                        cache_config.cache_dir,
+                        cache_config.max_size_mb,
+                        cache_config.ttl_seconds,
+                    ),
+                )
+            # Syntheses of all clients sharing the engine are queued together.
+            # Only engines running in the server compete for its CPU or GPU:
+            # servers and APIs are left to handle their own load.
+            scheduler_config = self.system_config.tts_scheduler_config
+            get_tts_scheduler(
+                self.tts_engine,
+                max_concurrency=(
+                    scheduler_config.max_concurrency
+                    if tts_config.tts_model in PROCESS_POOL_ENGINES
+                    else scheduler_config.remote_max_concurrency
+                ),
+                first_sentence_priority=scheduler_config.first_sentence_priority,
             )
             # saving config should be done after successful initialization
             self.character_config.tts_config = tts_config
         else:
             logger.info("TTS already initialized with the same config.")
 
+    def init_phrase_bank(
+        self, phrases: List[str], tts_preprocessor_config: TTSPreprocessorConfig
+    ) -> None:
+        """Build the phrase bank of the character and synthesize it, again
+        whenever the TTS engine or the phrases change"""
+        phrase_bank = None
+        if phrases and self.tts_engine is not None:
+            phrase_bank = build_phrase_bank(
+                self.tts_engine, phrases, tts_preprocessor_config
+            )
+        if (
+            self.phrase_bank is not None
+            and phrase_bank is not None
+            and self.phrase_bank.tts_engine is self.tts_engine
+            and self.phrase_bank.phrases == phrase_bank.phrases
+        ):
+            logger.info("Phrase bank already built for the same TTS and phrases.")
+            return
+
+        if self._phrase_bank_task is not None:
+            self._phrase_bank_task.cancel()
+            self._phrase_bank_task = None
+        self.phrase_bank = phrase_bank
+        if phrase_bank is None:
+            return
+
+        logger.info(f"Synthesizing phrase bank: {len(phrase_bank.phrases)} phrases")
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # At startup, before the server runs: warm up now
+            asyncio.run(self._warm_up_phrase_bank_at_startup())
+        else:
+            # On switch-config: phrases are served once they are ready
+            self._phrase_bank_task = loop.create_task(phrase_bank.warm_up())
+
+    async def _warm_up_phrase_bank_at_startup(self) -> None:
+        await self.phrase_bank.warm_up()
+        # The client belongs to this temporary event loop
+        await close_http_client()
+
     def init_vad(self, vad_config: VADConfig) -> None:
         if not self.vad_engine or (self.character_config.vad_config != vad_config):
             logger.info(f"Initializing VAD: {vad_config.vad_model}")
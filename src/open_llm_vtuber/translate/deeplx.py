@@ -2,6 +2,7 @@ import json
 import httpx
 from loguru import logger
 from .translate_interface import TranslateInterface
+from ..utils.http_client import http_request
 
 
 class DeepLXTranslate(TranslateInterface):
@@ -14,15 +15,33 @@ class DeepLXTranslate(TranslateInterface):
 
     # translate v2 endpoint from DeepLX
     def translate(self, text: str) -> str:
+        req = None
         try:
-            data = {"text": [text], "target_lang": self.target_lang}
-            post_data = json.dumps(data)
-            req = httpx.post(url=self.api_endpoint, data=post_data).text
-            res = json.loads(req)["translations"]
-            res = " ".join([d["text"] for d in res])
+            req = httpx.post(url=self.api_endpoint, data=self._post_data(text)).text
+            return self._parse_response(req)
         except Exception as e:
             logger.critical(f"Error translating text '{text}'. Error message: {e}")
             logger.critical(f"Response: {req}")
             raise e
 
-        return res
+    async def async_translate(self, text: str) -> str:
+        req = None
+        try:
+            response = await http_request(
+                "POST", self.api_endpoint, content=self._post_data(text)
+            )
+            req = response.text
+            return self._parse_response(req)
+        except Exception as e:
+            logger.critical(f"Error translating text '{text}'. Error message: {e}")
+            logger.critical(f"Response: {req}")
+            raise e
+
+    def _post_data(self, text: str) -> str:
+        data = {"text": [text], "target_lang": self.target_lang}
+        return json.dumps(data)
+
+    @staticmethod
+    def _parse_response(req: str) -> str:
+        res = json.loads(req)["translations"]
+        return " ".join([d["text"] for d in res])
@@ -8,6 +8,7 @@ import httpx
 from loguru import logger
 
 from .translate_interface import TranslateInterface
+from ..utils.http_client import http_request
 
 
 def sign(key, msg):
@@ -93,8 +94,8 @@ class TencentTranslate(TranslateInterface):
 
         return headers
 
-    def translate(self, text: str) -> str:
-        """Translate text"""
+    def _prepare_request(self, text: str) -> tuple[str, dict]:
+        """Build the signed payload and headers of a translation request"""
         timestamp = int(time.time())
         date = datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d")
 
@@ -108,6 +109,11 @@ class TencentTranslate(TranslateInterface):
         )
 
         headers = self._prepare_headers(payload, timestamp, date)
+        return payload, headers
+
+    def translate(self, text: str) -> str:
+        """Translate text"""
+        payload, headers = self._prepare_request(text)
 
         try:
             response = httpx.post(
@@ -119,3 +125,18 @@ class TencentTranslate(TranslateInterface):
         except Exception as e:
             logger.critical(f"API call error: {e}")
             raise e
+
+    async def async_translate(self, text: str) -> str:
+        """Translate text with the shared HTTP client, reusing the connection"""
+        payload, headers = self._prepare_request(text)
+
+        try:
+            response = await http_request(
+                "POST", "https://" + self.host, headers=headers, content=payload
+            )
+            res = response.json()
+            logger.info(f"Request successful: {res}")
+            return res.get("Response", {}).get("TargetText", "Translation failed")
+        except Exception as e:
+            logger.critical(f"API call error: {e}")
+            raise e
@@ -1,4 +1,5 @@
 import abc
+import asyncio
 
 
 class TranslateInterface(metaclass=abc.ABCMeta):
@@ -7,3 +8,13 @@ class TranslateInterface(metaclass=abc.ABCMeta):
         """
         Translate the input text to the target language."""
         raise NotImplementedError
+
+    async def async_translate(self, text: str) -> str:
+        """
+        Asynchronously translate the input text to the target language.
+
+        By default, this runs the synchronous translate in a thread.
+        Translators calling a web API should override this method with a
+        request made with the shared HTTP client (utils.http_client).
+        """
+        return await asyncio.to_thread(self.translate, text)
@@ -1,8 +1,10 @@
 import sys
 import os
+from typing import AsyncIterator, Iterator
 import azure.cognitiveservices.speech as speechsdk
 from loguru import logger
-from .tts_interface import TTSInterface
+from .tts_interface import TTSInterface, GeneratedAudio
+from .pcm_stream import PCMChunker, iterate_in_thread
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
@@ -12,6 +14,8 @@ class TTSEngine(TTSInterface):
     temp_audio_file = "temp"
     file_extension = "wav"
     new_audio_dir = "cache"
+    # Raw PCM format used when streaming
+    stream_sample_rate = 24000
 
     def __init__(self, api_key, region, voice, pitch=0, rate=1.0):
         """
@@ -32,6 +36,15 @@ class TTSEngine(TTSInterface):
         # The language of the voice that speaks.
         self.speech_config.speech_synthesis_voice_name = voice
 
+        # Streamed audio is read as raw PCM, without a WAV header
+        self.stream_speech_config = speechsdk.SpeechConfig(
+            subscription=api_key, region=region
+        )
+        self.stream_speech_config.speech_synthesis_voice_name = voice
+        self.stream_speech_config.set_speech_synthesis_output_format(
+            speechsdk.SpeechSynthesisOutputFormat.Raw24Khz16BitMonoPcm
+        )
+
         # Initialize pitch and rate
         self.pitch = pitch
         self.rate = rate
@@ -62,6 +75,60 @@ class TTSEngine(TTSInterface):
         self.__speak_with_audio_config(text, audio_config=file_audio_config)
         return file_name
 
+    async def async_stream_audio(self, text: str) -> AsyncIterator[GeneratedAudio]:
+        """Yield the audio while Azure is still synthesizing it"""
+        if not isinstance(text, str) or text.strip() == "":
+            logger.warning("AzureTTS: There is no text to speak.")
+            return
+
+        chunker = PCMChunker(self.stream_sample_rate)
+        try:
+            async for data in iterate_in_thread(self._stream_pcm(text.strip())):
+                for chunk in chunker.feed(data):
+                    yield chunk
+        except Exception as e:
+            logger.error(f"AzureTTS: Failed to stream audio: {e}")
+            return
+
+        last_chunk = chunker.flush()
+        if last_chunk is not None:
+            yield last_chunk
+
+    def _stream_pcm(self, text: str) -> Iterator[bytes]:
+        """Start synthesizing and read the PCM as it is produced (blocking)"""
+        speech_synthesizer = speechsdk.SpeechSynthesizer(
+            speech_config=self.stream_speech_config, audio_config=None
+        )
+        result = speech_synthesizer.start_speaking_ssml_async(
+            self._build_ssml(text)
+        ).get()
+        audio_stream = speechsdk.AudioDataStream(result)
+        buffer = bytes(9600)
+        while True:
+            filled = audio_stream.read_data(buffer)
+            if filled == 0:
+                break
+            yield buffer[:filled]
+
+        if audio_stream.status == speechsdk.StreamStatus.Canceled:
+            details = audio_stream.cancellation_details
+            raise RuntimeError(
+                f"Speech synthesis canceled: {details.reason} {details.error_details}"
+            )
+        logger.info(f">> Speech synthesized for text [{text}]")
+
+    def _build_ssml(self, text: str) -> str:
+        """Wrap the text with SSML to adjust pitch and rate"""
+        return f"""
+        <speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang="en-US">
+            <voice name="{self.speech_config.speech_synthesis_voice_name}">
+                <prosody pitch="{self.pitch}%" rate="{self.rate}">
+                    {text}
+                </prosody>
+            </voice>
+        </speak>
+        """
+
     def __speak_with_audio_config(
         self,
         text,
@@ -96,16 +163,7 @@ class TTSEngine(TTSInterface):
             logger.info(f"Received text: {text}")
             return
 
-        # Wrap the text with SSML to adjust pitch and rate
-        ssml_text = f"""
-        <speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang="en-US">
-            <voice name="{self.speech_config.speech_synthesis_voice_name}">
-                <prosody pitch="{self.pitch}%" rate="{self.rate}">
-                    {text}
-                </prosody>
-            </voice>
-        </speak>
-        """
+        ssml_text = self._build_ssml(text)
 
         if on_speak_start_callback is not None:
             on_speak_start_callback()
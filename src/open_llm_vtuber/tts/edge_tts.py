@@ -1,9 +1,11 @@
 import sys
 import os
+import asyncio
+from pathlib import Path
 
 import edge_tts
 from loguru import logger
-from .tts_interface import TTSInterface
+from .tts_interface import TTSInterface, GeneratedAudio
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
@@ -49,6 +51,39 @@ class TTSEngine(TTSInterface):
 
         return file_name
 
+    async def async_generate_audio(self, text, file_name_no_ext=None):
+        """
+        Stream the audio from edge-tts on the running event loop and write it
+        in one go, instead of running save_sync (and a new event loop) in a
+        thread.
+        """
+        audio = await self.async_generate_audio_bytes(text)
+        if audio is None:
+            return None
+
+        file_name = self.generate_cache_file_name(file_name_no_ext, self.file_extension)
+        await asyncio.to_thread(Path(file_name).write_bytes, audio.data)
+        return file_name
+
+    async def async_generate_audio_bytes(self, text: str) -> GeneratedAudio | None:
+        """Collect the MP3 stream from edge-tts in memory, without a cache file"""
+        audio_data = bytearray()
+        try:
+            communicate = edge_tts.Communicate(text, self.voice)
+            async for chunk in communicate.stream():
+                if chunk["type"] == "audio":
+                    audio_data.extend(chunk["data"])
+        except Exception as e:
+            logger.critical(f"\nError: edge-tts unable to generate audio: {e}")
+            logger.critical("It's possible that edge-tts is blocked in your region.")
+            return None
+
+        if not audio_data:
+            logger.error("edge-tts returned no audio")
+            return None
+        # edge-tts outputs 24 kHz mono MP3
+        return GeneratedAudio(bytes(audio_data), 24000, self.file_extension)
+
 
 # en-US-AvaMultilingualNeural
 # en-US-EmmaMultilingualNeural
@@ -1,7 +1,8 @@
-from typing import Literal
+from typing import AsyncIterator, Literal
 from fish_audio_sdk import Session, TTSRequest
 from loguru import logger
-from .tts_interface import TTSInterface
+from .tts_interface import TTSInterface, GeneratedAudio
+from .pcm_stream import PCMChunker
 
 
 class TTSEngine(TTSInterface):
@@ -10,6 +11,8 @@ class TTSEngine(TTSInterface):
     """
 
     file_extension: str = "wav"
+    # Sample rate of the raw PCM requested when streaming
+    stream_sample_rate: int = 44100
 
     def __init__(
         self,
@@ -58,3 +61,45 @@ class TTSEngine(TTSInterface):
             return None
 
         return file_name
+
+    async def async_generate_audio_bytes(self, text: str) -> GeneratedAudio | None:
+        """Collect the audio stream from the Fish TTS API in memory"""
+        audio_data = bytearray()
+        try:
+            async for chunk in self.session.tts.awaitable(
+                TTSRequest(
+                    text=text, reference_id=self.reference_id, latency=self.latency
+                )
+            ):
+                audio_data.extend(chunk)
+        except Exception as e:
+            logger.critical(f"\nError: Fish TTS API fail to generate audio: {e}")
+            return None
+
+        if not audio_data:
+            logger.error("Fish TTS API returned no audio")
+            return None
+        return GeneratedAudio.from_bytes(bytes(audio_data), self.file_extension)
+
+    async def async_stream_audio(self, text: str) -> AsyncIterator[GeneratedAudio]:
+        """Request raw PCM from the Fish TTS API and yield it as it arrives"""
+        chunker = PCMChunker(self.stream_sample_rate)
+        try:
+            async for data in self.session.tts.awaitable(
+                TTSRequest(
+                    text=text,
+                    reference_id=self.reference_id,
+                    latency=self.latency,
+                    format="pcm",
+                    sample_rate=self.stream_sample_rate,
+                )
+            ):
+                for chunk in chunker.feed(data):
+                    yield chunk
+        except Exception as e:
+            logger.critical(f"\nError: Fish TTS API fail to stream audio: {e}")
+            return
+
+        last_chunk = chunker.flush()
+        if last_chunk is not None:
+            yield last_chunk
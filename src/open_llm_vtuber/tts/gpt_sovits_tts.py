@@ -3,9 +3,14 @@
 ####
 
 import re
+import asyncio
+from pathlib import Path
 import requests
+from typing import AsyncIterator
 from loguru import logger
-from .tts_interface import TTSInterface
+from .tts_interface import TTSInterface, GeneratedAudio
+from .pcm_stream import WavStreamChunker
+from ..utils.http_client import http_request, http_stream
 
 
 class TTSEngine(TTSInterface):
@@ -31,11 +36,9 @@ class TTSEngine(TTSInterface):
         self.media_type = media_type
         self.streaming_mode = streaming_mode
 
-    def generate_audio(self, text, file_name_no_ext=None):
-        file_name = self.generate_cache_file_name(file_name_no_ext, self.media_type)
+    def _request_params(self, text: str) -> dict:
         cleaned_text = re.sub(r"\[.*?\]", "", text)
-        # Prepare the data for the POST request
-        data = {
+        return {
             "text": cleaned_text,
             "text_lang": self.text_lang,
             "ref_audio_path": self.ref_audio_path,
@@ -47,18 +50,92 @@ class TTSEngine(TTSInterface):
             "streaming_mode": self.streaming_mode,
         }
 
+    def _request_audio(self, text: str) -> bytes | None:
+        """Request the audio from the GPT-SoVITS API server"""
         # Send POST request to the TTS API
-        response = requests.get(self.api_url, params=data, timeout=120)
+        response = requests.get(
+            self.api_url, params=self._request_params(text), timeout=120
+        )
+        return self._response_audio(response.status_code, response.content)
+
+    async def _async_request_audio(self, text: str) -> bytes | None:
+        """Request the audio with the shared HTTP client, reusing connections"""
+        response = await http_request(
+            "GET", self.api_url, params=self._request_params(text), timeout=120
+        )
+        return self._response_audio(response.status_code, response.content)
 
+    @staticmethod
+    def _response_audio(status_code: int, content: bytes) -> bytes | None:
         # Check if the request was successful
-        if response.status_code == 200:
-            # Save the audio content to a file
-            with open(file_name, "wb") as audio_file:
-                audio_file.write(response.content)
-            return file_name
-        else:
-            # Handle errors or unsuccessful requests
-            logger.critical(
-                f"Error: Failed to generate audio. Status code: {response.status_code}"
-            )
+        if status_code == 200:
+            return content
+        # Handle errors or unsuccessful requests
+        logger.critical(f"Error: Failed to generate audio. Status code: {status_code}")
+        return None
+
+    def generate_audio(self, text, file_name_no_ext=None):
+        file_name = self.generate_cache_file_name(file_name_no_ext, self.media_type)
+
+        audio_data = self._request_audio(text)
+        if audio_data is None:
+            return None
+
+        # Save the audio content to a file
+        with open(file_name, "wb") as audio_file:
+            audio_file.write(audio_data)
+        return file_name
+
+    async def async_generate_audio(self, text, file_name_no_ext=None):
+        file_name = self.generate_cache_file_name(file_name_no_ext, self.media_type)
+
+        try:
+            audio_data = await self._async_request_audio(text)
+        except Exception as e:
+            logger.critical(f"Error: Failed to generate audio: {e}")
+            return None
+        if audio_data is None:
+            return None
+
+        await asyncio.to_thread(Path(file_name).write_bytes, audio_data)
+        return file_name
+
+    async def async_generate_audio_bytes(self, text: str) -> GeneratedAudio | None:
+        """Return the audio from the API server without writing a cache file"""
+        try:
+            audio_data = await self._async_request_audio(text)
+        except Exception as e:
+            logger.critical(f"Error: Failed to generate audio: {e}")
+            return None
+        if audio_data is None:
             return None
+        return GeneratedAudio.from_bytes(audio_data, self.media_type)
+
+    async def async_stream_audio(self, text: str) -> AsyncIterator[GeneratedAudio]:
+        """With streaming_mode and WAV output, yield the audio as the server
+        streams it; otherwise, yield the whole audio at once."""
+        if str(self.streaming_mode).lower() != "true" or self.media_type != "wav":
+            async for chunk in super().async_stream_audio(text):
+                yield chunk
+            return
+
+        chunker = WavStreamChunker()
+        try:
+            async with http_stream(
+                "GET", self.api_url, params=self._request_params(text), timeout=120
+            ) as response:
+                if response.status_code != 200:
+                    logger.critical(
+                        f"Error: Failed to generate audio. Status code: {response.status_code}"
+                    )
+                    return
+                async for data in response.aiter_bytes():
+                    for chunk in chunker.feed(data):
+                        yield chunk
+        except Exception as e:
+            logger.critical(f"Error: Failed to stream audio from GPT-SoVITS: {e}")
+            return
+
+        last_chunk = chunker.flush()
+        if last_chunk is not None:
+            yield last_chunk
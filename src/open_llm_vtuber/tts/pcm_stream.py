@@ -0,0 +1,161 @@
+import io
+import wave
+import struct
+import asyncio
+from typing import AsyncIterator, Iterable, List, Tuple, TypeVar
+
+from .tts_interface import GeneratedAudio
+
+T = TypeVar("T")
+
+_END = object()
+
+
+async def iterate_in_thread(iterable: Iterable[T]) -> AsyncIterator[T]:
+    """Iterate a blocking iterable (e.g. a streamed HTTP response) without
+    blocking the event loop, advancing it in a worker thread."""
+    iterator = iter(iterable)
+    while True:
+        item = await asyncio.to_thread(next, iterator, _END)
+        if item is _END:
+            return
+        yield item
+
+
+def parse_wav_header(data: bytes) -> Tuple[int, int, int, int] | None:
+    """Parse the header of a (possibly streamed) PCM WAV.
+
+    Returns:
+        (sample_rate, channels, sample_width, data_offset), or None if data
+        does not hold the whole header yet.
+
+    Raises:
+        ValueError: If data is not a PCM WAV.
+    """
+    if len(data) < 12:
+        return None
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("Not a WAV stream")
+
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id = data[offset : offset + 4]
+        (chunk_size,) = struct.unpack("<I", data[offset + 4 : offset + 8])
+        if chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAV stream has no fmt chunk")
+            return (*fmt, offset + 8)
+        if offset + 8 + chunk_size > len(data):
+            return None
+        if chunk_id == b"fmt ":
+            audio_format, channels, sample_rate, _, _, bits = struct.unpack(
+                "<HHIIHH", data[offset + 8 : offset + 24]
+            )
+            if audio_format != 1:
+                raise ValueError(f"Unsupported WAV encoding {audio_format}")
+            fmt = (sample_rate, channels, bits // 8)
+        # Chunks are padded to an even size
+        offset += 8 + chunk_size + (chunk_size & 1)
+    return None
+
+
+class PCMChunker:
+    """Regroups a stream of raw PCM bytes into WAV chunks of at least
+    `min_chunk_ms`, cut on frame boundaries, so that each chunk can be played
+    and analyzed on its own."""
+
+    def __init__(
+        self,
+        sample_rate: int,
+        channels: int = 1,
+        sample_width: int = 2,
+        min_chunk_ms: int = 200,
+    ):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.frame_size = channels * sample_width
+        self.min_chunk_bytes = int(sample_rate * min_chunk_ms / 1000) * self.frame_size
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[GeneratedAudio]:
+        """Add PCM bytes and return the chunks that are complete"""
+        self._buffer.extend(data)
+        if len(self._buffer) < self.min_chunk_bytes:
+            return []
+        usable = len(self._buffer) - len(self._buffer) % self.frame_size
+        pcm = bytes(self._buffer[:usable])
+        del self._buffer[:usable]
+        return [self._to_wav(pcm)]
+
+    def flush(self) -> GeneratedAudio | None:
+        """Return what is left at the end of the stream, if anything"""
+        usable = len(self._buffer) - len(self._buffer) % self.frame_size
+        pcm = bytes(self._buffer[:usable])
+        self._buffer.clear()
+        return self._to_wav(pcm) if pcm else None
+
+    def _to_wav(self, pcm: bytes) -> GeneratedAudio:
+        return GeneratedAudio.from_pcm(
+            pcm, self.sample_rate, self.channels, self.sample_width
+        )
+
+
+class WavStreamChunker:
+    """Like PCMChunker, for a streamed WAV: the header is read from the first
+    bytes and the rest of the stream is treated as PCM, whatever the sizes
+    written in the header (streaming servers can't know them in advance)."""
+
+    def __init__(self, min_chunk_ms: int = 200):
+        self.min_chunk_ms = min_chunk_ms
+        self._header = bytearray()
+        self._pcm_chunker: PCMChunker | None = None
+
+    def feed(self, data: bytes) -> List[GeneratedAudio]:
+        if self._pcm_chunker is not None:
+            return self._pcm_chunker.feed(data)
+
+        self._header.extend(data)
+        header = parse_wav_header(bytes(self._header))
+        if header is None:
+            return []
+        sample_rate, channels, sample_width, data_offset = header
+        self._pcm_chunker = PCMChunker(
+            sample_rate, channels, sample_width, self.min_chunk_ms
+        )
+        return self._pcm_chunker.feed(bytes(self._header[data_offset:]))
+
+    def flush(self) -> GeneratedAudio | None:
+        if self._pcm_chunker is None:
+            return None
+        return self._pcm_chunker.flush()
+
+
+def join_wav_chunks(chunks: List[GeneratedAudio]) -> GeneratedAudio | None:
+    """Join streamed PCM WAV chunks into one WAV.
+
+    Returns None if the chunks are not all PCM WAV with the same parameters.
+    """
+    if not chunks:
+        return None
+    if len(chunks) == 1:
+        return chunks[0]
+
+    params = None
+    frames = []
+    try:
+        for chunk in chunks:
+            with wave.open(io.BytesIO(chunk.data), "rb") as wav_file:
+                chunk_params = wav_file.getparams()[:3]
+                if params is not None and chunk_params != params:
+                    return None
+                params = chunk_params
+                frames.append(wav_file.readframes(wav_file.getnframes()))
+    except (wave.Error, EOFError):
+        return None
+
+    channels, sample_width, sample_rate = params
+    return GeneratedAudio.from_pcm(
+        b"".join(frames), sample_rate, channels, sample_width
+    )
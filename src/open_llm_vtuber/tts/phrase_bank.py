@@ -0,0 +1,115 @@
+import asyncio
+from typing import Dict, List, Sequence, Tuple
+from loguru import logger
+
+from .tts_interface import TTSInterface, GeneratedAudio
+from .tts_scheduler import get_tts_scheduler
+from .pcm_stream import join_wav_chunks
+from ..utils.stream_audio import prepare_audio_payload
+from ..utils.tts_preprocessor import tts_filter
+from ..config_manager import TTSPreprocessorConfig
+
+# Scheduler client the warm-up syntheses are queued as
+_WARM_UP_CLIENT = "phrase-bank"
+
+
+class PhraseBank:
+    """Audio of lines spoken often (greetings, error fallbacks...),
+    synthesized ahead of time and kept in memory.
+
+    Phrases are looked up by their exact text after the TTS preprocessor,
+    so `phrases` maps that text to the phrase as configured. Payloads are
+    prepared once per set of client codecs, volumes included.
+    """
+
+    def __init__(self, tts_engine: TTSInterface, phrases: Dict[str, str]):
+        self.tts_engine = tts_engine
+        self.phrases = phrases
+        self.hits = 0
+        self._audio: Dict[str, GeneratedAudio] = {}
+        # Payloads without display text and actions, by (text, codecs)
+        self._payloads: Dict[Tuple[str, Tuple[str, ...]], dict] = {}
+
+    def __contains__(self, tts_text: str) -> bool:
+        return tts_text in self._audio
+
+    async def warm_up(self) -> None:
+        """Synthesize the phrases that are not ready yet, one at a time and
+        behind conversations in the engine's scheduler"""
+        scheduler = get_tts_scheduler(self.tts_engine)
+        for tts_text in self.phrases:
+            if tts_text in self._audio:
+                continue
+            try:
+                async with scheduler.slot(_WARM_UP_CLIENT):
+                    chunks = [
+                        chunk
+                        async for chunk in self.tts_engine.async_stream_audio(tts_text)
+                    ]
+                audio = chunks[0] if len(chunks) == 1 else join_wav_chunks(chunks)
+                if audio is None:
+                    logger.warning(f"No audio generated for phrase '''{tts_text}'''")
+                    continue
+                # Compute the volumes now, for the default codec
+                await self._get_payload(tts_text, audio, ("wav",))
+                self._audio[tts_text] = audio
+            except Exception as e:
+                logger.error(f"Failed to synthesize phrase '''{tts_text}''': {e}")
+        logger.info(
+            f"Phrase bank ready: {len(self._audio)}/{len(self.phrases)} phrases"
+        )
+
+    async def get_payload(
+        self, tts_text: str, codecs: Sequence[str] = ("wav",)
+    ) -> dict | None:
+        """Get a copy of the audio payload of a phrase (with binary audio and
+        without display text and actions), or None if it is not in the bank"""
+        audio = self._audio.get(tts_text)
+        if audio is None:
+            return None
+        self.hits += 1
+        return dict(await self._get_payload(tts_text, audio, tuple(codecs)))
+
+    async def _get_payload(
+        self, tts_text: str, audio: GeneratedAudio, codecs: Tuple[str, ...]
+    ) -> dict:
+        payload = self._payloads.get((tts_text, codecs))
+        if payload is None:
+            payload = await asyncio.to_thread(
+                prepare_audio_payload,
+                audio_path=None,
+                binary=True,
+                generated_audio=audio,
+                codecs=codecs,
+            )
+            self._payloads[(tts_text, codecs)] = payload
+        return payload
+
+    def stats(self) -> dict:
+        return {
+            "phrases": len(self.phrases),
+            "ready": len(self._audio),
+            "hits": self.hits,
+        }
+
+
+def build_phrase_bank(
+    tts_engine: TTSInterface,
+    phrases: List[str],
+    tts_preprocessor_config: TTSPreprocessorConfig,
+) -> PhraseBank:
+    """Create the bank of a character's phrases, keyed by the text the TTS
+    preprocessor makes of them (as conversations do before TTS)"""
+    filtered = {}
+    for phrase in phrases:
+        tts_text = tts_filter(
+            text=phrase,
+            remove_special_char=tts_preprocessor_config.remove_special_char,
+            ignore_brackets=tts_preprocessor_config.ignore_brackets,
+            ignore_parentheses=tts_preprocessor_config.ignore_parentheses,
+            ignore_asterisks=tts_preprocessor_config.ignore_asterisks,
+            ignore_angle_brackets=tts_preprocessor_config.ignore_angle_brackets,
+        )
+        if tts_text.strip():
+            filtered[tts_text] = phrase
+    return PhraseBank(tts_engine, filtered)
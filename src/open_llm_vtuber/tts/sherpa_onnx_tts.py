@@ -4,7 +4,7 @@ import os
 import sherpa_onnx
 import soundfile as sf
 from loguru import logger
-from .tts_interface import TTSInterface
+from .tts_interface import TTSInterface, GeneratedAudio, run_in_thread
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
@@ -110,3 +110,23 @@ class TTSEngine(TTSInterface):
         except Exception as e:
             logger.critical(f"\nError: sherpa-onnx unable to generate audio: {e}")
             return None
+
+    async def async_generate_audio_bytes(self, text: str) -> GeneratedAudio | None:
+        """Generate speech as 16-bit WAV in memory, without a cache file"""
+        return await run_in_thread(self._generate_audio_bytes, text)
+
+    def _generate_audio_bytes(self, text: str) -> GeneratedAudio | None:
+        try:
+            audio = self.tts.generate(text, sid=self.sid, speed=self.speed)
+
+            if len(audio.samples) == 0:
+                logger.error(
+                    "Error in generating audios. Please read previous error messages."
+                )
+                return None
+
+            return GeneratedAudio.from_samples(audio.samples, audio.sample_rate)
+
+        except Exception as e:
+            logger.critical(f"\nError: sherpa-onnx unable to generate audio: {e}")
+            return None
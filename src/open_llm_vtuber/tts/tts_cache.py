@@ -0,0 +1,343 @@
+import os
+import time
+import asyncio
+import uuid
+import shutil
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Tuple
+from loguru import logger
+
+from .tts_interface import TTSInterface, GeneratedAudio
+from .pcm_stream import join_wav_chunks
+from ..utils.cache_manager import get_cache_manager
+
+
+@dataclass
+class _CacheEntry:
+    path: str
+    size: int
+    created: float
+    last_used: float
+    # Number of readers that have not released the file yet
+    pins: int = 0
+
+
+class AudioCache:
+    """Size-bounded LRU directory of synthesized audio, addressed by key.
+
+    Files are named after the key, written atomically (temp file + rename)
+    and evicted least recently used first once the directory is over
+    `max_size_mb`, or when older than `ttl_seconds` (0 to keep forever).
+    Files handed out with `acquire` are pinned until `release`d, so a file
+    being read is never evicted under it. Paths given to clients are copies
+    made with `copy_out`, which the cache does not have to keep.
+    """
+
+    def __init__(
+        self, cache_dir: str, max_size_mb: float = 256, ttl_seconds: float = 0
+    ):
+        self.cache_dir = os.path.normpath(cache_dir)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.ttl_seconds = ttl_seconds
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _CacheEntry] = {}
+        self._total_size = 0
+        self._load()
+
+    def _load(self) -> None:
+        """Index the files already in the cache directory"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        for entry in os.scandir(self.cache_dir):
+            if not entry.is_file():
+                continue
+            key, _ = os.path.splitext(entry.name)
+            if ".tmp-" in entry.name:
+                # Left over by an interrupted write
+                self._remove_path(entry.path)
+                continue
+            stat = entry.stat()
+            self._entries[key] = _CacheEntry(
+                entry.path, stat.st_size, stat.st_mtime, stat.st_mtime
+            )
+            self._total_size += stat.st_size
+        with self._lock:
+            self._evict()
+        logger.info(
+            f"TTS audio cache: {len(self._entries)} files, "
+            f"{self._total_size / 1024 / 1024:.1f} MB in {self.cache_dir}"
+        )
+
+    @staticmethod
+    def make_key(engine_key: str, text: str) -> str:
+        return hashlib.sha256(f"{engine_key}\0{text}".encode("utf-8")).hexdigest()
+
+    def acquire(self, key: str) -> str | None:
+        """Return the pinned path of a cached file, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.time()
+            if entry is not None and self._expired(entry, now):
+                self._drop(key)
+                entry = None
+            if entry is None or not os.path.exists(entry.path):
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            entry.last_used = now
+            entry.pins += 1
+            self.hits += 1
+            return entry.path
+
+    def store(self, key: str, audio_path: str) -> None:
+        """Add a copy of a freshly generated file to the cache. The file
+        itself stays with the caller."""
+        _, ext = os.path.splitext(audio_path)
+        path = os.path.join(self.cache_dir, f"{key}{ext}")
+        tmp_path = f"{path}.tmp-{uuid.uuid4().hex[:8]}"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            _link_or_copy(audio_path, tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Failed to store audio in TTS cache: {e}")
+            self._remove_path(tmp_path)
+            return
+        self._add_entry(key, path, pins=0)
+
+    def copy_out(self, key: str) -> str | None:
+        """Copy a cached file to a temporary file of the cache directory,
+        which is served to clients and managed by the cache manager, and
+        return its path, or None on a miss"""
+        cached_path = self.acquire(key)
+        if cached_path is None:
+            return None
+        try:
+            path = get_cache_manager().temp_path(
+                suffix=os.path.splitext(cached_path)[1]
+            )
+            _link_or_copy(cached_path, path)
+            return path
+        except Exception as e:
+            logger.error(f"Failed to copy TTS cache file {cached_path}: {e}")
+            return None
+        finally:
+            self.release(cached_path)
+
+    def store_bytes(self, key: str, data: bytes, extension: str) -> None:
+        """Write audio generated in memory into the cache"""
+        path = os.path.join(self.cache_dir, f"{key}.{extension}")
+        tmp_path = f"{path}.tmp-{uuid.uuid4().hex[:8]}"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Failed to store audio in TTS cache: {e}")
+            self._remove_path(tmp_path)
+            return
+        self._add_entry(key, path, pins=0)
+
+    def read(self, key: str) -> Tuple[bytes, str] | None:
+        """Read a cached file and its extension, or None on a miss"""
+        path = self.acquire(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read(), os.path.splitext(path)[1].lstrip(".")
+        except Exception as e:
+            logger.error(f"Failed to read TTS cache file {path}: {e}")
+            return None
+        finally:
+            self.release(path)
+
+    def _add_entry(self, key: str, path: str, pins: int) -> None:
+        size = os.path.getsize(path)
+        now = time.time()
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous is not None:
+                self._total_size -= previous.size
+                pins += previous.pins
+                if previous.path != path:
+                    self._remove_path(previous.path)
+            self._entries[key] = _CacheEntry(path, size, now, now, pins)
+            self._total_size += size
+            self._evict()
+
+    def release(self, path: str) -> None:
+        """Unpin a path returned by acquire"""
+        key, _ = os.path.splitext(os.path.basename(path))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.pins > 0:
+                entry.pins -= 1
+            self._evict()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "files": len(self._entries),
+                "size_bytes": self._total_size,
+            }
+
+    def _expired(self, entry: _CacheEntry, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - entry.created > self.ttl_seconds
+
+    def _evict(self) -> None:
+        """Drop expired entries, then the least recently used ones until the
+        cache fits. The caller holds self._lock."""
+        now = time.time()
+        for key, entry in list(self._entries.items()):
+            if entry.pins == 0 and self._expired(entry, now):
+                self._drop(key)
+
+        if self._total_size <= self.max_size_bytes:
+            return
+        for key, entry in sorted(
+            self._entries.items(), key=lambda item: item[1].last_used
+        ):
+            if self._total_size <= self.max_size_bytes:
+                break
+            if entry.pins == 0:
+                self._drop(key)
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._total_size -= entry.size
+        self.evictions += 1
+        self._remove_path(entry.path)
+
+    @staticmethod
+    def _remove_path(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Failed to remove TTS cache file {path}: {e}")
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    """Hard link src to dst, or copy it where links are not supported (e.g.
+    across file systems)"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+_audio_caches: Dict[str, AudioCache] = {}
+_audio_caches_lock = threading.Lock()
+
+
+def get_audio_cache(
+    cache_dir: str, max_size_mb: float = 256, ttl_seconds: float = 0
+) -> AudioCache:
+    """Get the cache of a directory, shared by every engine using it"""
+    with _audio_caches_lock:
+        cache = _audio_caches.get(os.path.normpath(cache_dir))
+        if cache is None:
+            cache = AudioCache(cache_dir, max_size_mb, ttl_seconds)
+            _audio_caches[cache.cache_dir] = cache
+        else:
+            cache.max_size_bytes = int(max_size_mb * 1024 * 1024)
+            cache.ttl_seconds = ttl_seconds
+        return cache
+
+
+class CachedTTSEngine(TTSInterface):
+    """Wraps a TTS engine so that repeated lines are served from disk.
+
+    The cache key is a hash of `engine_key` (engine type and its config) and
+    the text. Returned paths are temporary files of the cache directory, like
+    the ones of the wrapped engine (cache hits are copied out of the cache),
+    so `remove_file` deletes them and the cache keeps its size bound. Other
+    attributes are read from the wrapped engine.
+    """
+
+    def __init__(self, tts_engine: TTSInterface, engine_key: str, cache: AudioCache):
+        self.tts_engine = tts_engine
+        self.engine_key = engine_key
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.tts_engine, name)
+
+    async def async_generate_audio(self, text: str, file_name_no_ext=None) -> str:
+        key = AudioCache.make_key(self.engine_key, text)
+        cached_path = await asyncio.to_thread(self.cache.copy_out, key)
+        if cached_path:
+            logger.debug(f"TTS cache hit for '''{text}'''")
+            return cached_path
+
+        audio_path = await self.tts_engine.async_generate_audio(text, file_name_no_ext)
+        return self._store(key, audio_path)
+
+    def generate_audio(self, text: str, file_name_no_ext=None) -> str:
+        key = AudioCache.make_key(self.engine_key, text)
+        cached_path = self.cache.copy_out(key)
+        if cached_path:
+            logger.debug(f"TTS cache hit for '''{text}'''")
+            return cached_path
+
+        audio_path = self.tts_engine.generate_audio(text, file_name_no_ext)
+        return self._store(key, audio_path)
+
+    async def async_generate_audio_bytes(self, text: str) -> GeneratedAudio | None:
+        key = AudioCache.make_key(self.engine_key, text)
+        cached = await asyncio.to_thread(self.cache.read, key)
+        if cached:
+            logger.debug(f"TTS cache hit for '''{text}'''")
+            return GeneratedAudio.from_bytes(*cached)
+
+        audio = await self.tts_engine.async_generate_audio_bytes(text)
+        if audio is not None:
+            await asyncio.to_thread(
+                self.cache.store_bytes, key, audio.data, audio.format
+            )
+        return audio
+
+    async def async_stream_audio(self, text: str) -> AsyncIterator[GeneratedAudio]:
+        key = AudioCache.make_key(self.engine_key, text)
+        cached = await asyncio.to_thread(self.cache.read, key)
+        if cached:
+            logger.debug(f"TTS cache hit for '''{text}'''")
+            yield GeneratedAudio.from_bytes(*cached)
+            return
+
+        chunks: List[GeneratedAudio] = []
+        async for chunk in self.tts_engine.async_stream_audio(text):
+            chunks.append(chunk)
+            yield chunk
+
+        # Only reached by complete streams: a stream closed early (e.g. on
+        # interrupt) is not cached
+        audio = join_wav_chunks(chunks)
+        if audio is not None:
+            await asyncio.to_thread(
+                self.cache.store_bytes, key, audio.data, audio.format
+            )
+
+    def _store(self, key: str, audio_path: str | None) -> str | None:
+        # Engines return None or a missing path when synthesis failed
+        if audio_path and os.path.exists(audio_path):
+            self.cache.store(key, audio_path)
+        return audio_path
+
+    def remove_file(self, filepath: str, verbose: bool = True) -> None:
+        self.tts_engine.remove_file(filepath, verbose)
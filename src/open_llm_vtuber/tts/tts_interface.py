@@ -1,9 +1,99 @@
 import abc
+import io
 import os
+import glob
+import uuid
+import wave
 import asyncio
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, TypeVar
 
+import numpy as np
 from loguru import logger
 
+from ..utils.cache_manager import get_cache_manager
+
+
+def detect_audio_format(data: bytes, default: str = "wav") -> str:
+    """Guess the container format of encoded audio from its first bytes"""
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return "wav"
+    if data[:3] == b"ID3" or (len(data) > 1 and data[0] == 0xFF and data[1] >= 0xE0):
+        return "mp3"
+    if data[:4] == b"OggS":
+        return "ogg"
+    if data[:4] == b"fLaC":
+        return "flac"
+    return default
+
+
+T = TypeVar("T")
+
+
+async def run_in_thread(func: Callable[..., T], *args, **kwargs) -> T:
+    """Like asyncio.to_thread, but when cancelled, wait for the thread to
+    finish before raising. Work in a thread can't be stopped: waiting keeps
+    the caller (and the TTS scheduler slot it holds) busy until the engine
+    really is free, and lets it clean up what the work left behind."""
+    future = asyncio.ensure_future(asyncio.to_thread(func, *args, **kwargs))
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        # Retrieve the result so that a failure is not reported as unhandled
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        await asyncio.wait([future])
+        raise
+
+
+@dataclass
+class GeneratedAudio:
+    """Audio synthesized in memory by a TTS engine"""
+
+    data: bytes
+    # Sample rate of the audio, if the engine knows it without decoding
+    sample_rate: int | None = None
+    # Container format of data ("wav", "mp3", ...)
+    format: str = "wav"
+
+    @classmethod
+    def from_bytes(cls, data: bytes, default_format: str = "wav") -> "GeneratedAudio":
+        """Wrap encoded audio, detecting its format and, for WAV, its sample rate"""
+        audio_format = detect_audio_format(data, default_format)
+        sample_rate = None
+        if audio_format == "wav":
+            try:
+                with wave.open(io.BytesIO(data), "rb") as wav_file:
+                    sample_rate = wav_file.getframerate()
+            except Exception:
+                # e.g. float WAV, which the wave module cannot read
+                pass
+        return cls(data, sample_rate, audio_format)
+
+    @classmethod
+    def from_samples(cls, samples, sample_rate: int) -> "GeneratedAudio":
+        """Encode mono float samples in [-1, 1] as 16-bit PCM WAV"""
+        pcm = (
+            np.clip(np.asarray(samples, dtype=np.float32), -1.0, 1.0) * 32767
+        ).astype("<i2")
+        return cls.from_pcm(pcm.tobytes(), sample_rate)
+
+    @classmethod
+    def from_pcm(
+        cls,
+        pcm: bytes,
+        sample_rate: int,
+        channels: int = 1,
+        sample_width: int = 2,
+    ) -> "GeneratedAudio":
+        """Wrap raw little-endian PCM frames in a WAV header"""
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav_file:
+            wav_file.setnchannels(channels)
+            wav_file.setsampwidth(sample_width)
+            wav_file.setframerate(sample_rate)
+            wav_file.writeframes(pcm)
+        return cls(buffer.getvalue(), sample_rate, "wav")
+
 
 class TTSInterface(metaclass=abc.ABCMeta):
     async def async_generate_audio(self, text: str, file_name_no_ext=None) -> str:
@@ -22,7 +112,76 @@ class TTSInterface(metaclass=abc.ABCMeta):
         str: the path to the generated audio file
 
         """
-        return await asyncio.to_thread(self.generate_audio, text, file_name_no_ext)
+        return await run_in_thread(self.generate_audio, text, file_name_no_ext)
+
+    async def async_generate_audio_bytes(self, text: str) -> GeneratedAudio | None:
+        """
+        Asynchronously generate speech audio in memory, without a cache file.
+
+        By default, this generates a file with async_generate_audio, reads it
+        and removes it. Subclasses that can get the audio without writing a
+        file should override this method.
+
+        text: str
+            the text to speak
+
+        Returns:
+        GeneratedAudio | None: the encoded audio (WAV or the engine's native
+        format) with its sample rate, or None if generation failed
+
+        """
+        file_name_no_ext = f"bytes_{uuid.uuid4().hex}"
+        try:
+            file_path = await self.async_generate_audio(
+                text, file_name_no_ext=file_name_no_ext
+            )
+        except asyncio.CancelledError:
+            self._remove_partial_files(file_name_no_ext)
+            raise
+        if not file_path or not os.path.exists(file_path):
+            return None
+        return await asyncio.to_thread(self._read_and_remove_file, file_path)
+
+    async def async_stream_audio(self, text: str) -> AsyncIterator[GeneratedAudio]:
+        """
+        Generate speech audio in memory, yielding chunks as they are ready.
+
+        Each chunk is a complete audio file that can be played on its own,
+        in order. By default, this yields the whole result of
+        async_generate_audio_bytes as a single chunk. Engines whose API
+        streams audio should override this method to yield the audio as it
+        arrives (see pcm_stream.PCMChunker).
+
+        text: str
+            the text to speak
+
+        Yields:
+        GeneratedAudio: the next chunk of audio. Nothing is yielded if
+        generation failed.
+
+        """
+        audio = await self.async_generate_audio_bytes(text)
+        if audio is not None:
+            yield audio
+
+    def _remove_partial_files(self, file_name_no_ext: str) -> None:
+        """Remove the cache files an interrupted generation may have left"""
+        pattern = os.path.join(
+            glob.escape(get_cache_manager().cache_dir),
+            f"{glob.escape(file_name_no_ext)}.*",
+        )
+        for file_path in glob.glob(pattern):
+            self.remove_file(file_path, verbose=False)
+
+    def _read_and_remove_file(self, file_path: str) -> GeneratedAudio:
+        try:
+            with open(file_path, "rb") as audio_file:
+                data = audio_file.read()
+        finally:
+            self.remove_file(file_path, verbose=False)
+        return GeneratedAudio.from_bytes(
+            data, os.path.splitext(file_path)[1].lstrip(".") or "wav"
+        )
 
     @abc.abstractmethod
     def generate_audio(self, text: str, file_name_no_ext=None) -> str:
@@ -55,6 +214,7 @@ class TTSInterface(metaclass=abc.ABCMeta):
         try:
             logger.debug(f"Removing file {filepath}") if verbose else None
             os.remove(filepath)
+            get_cache_manager().untrack(filepath)
         except Exception as e:
             logger.error(f"Failed to remove file {filepath}: {e}")
 
@@ -68,14 +228,15 @@ class TTSInterface(metaclass=abc.ABCMeta):
             file extension
 
         Returns:
-        str: the path to the generated cache file
+        str: the path to the generated cache file, tracked by the cache
+        manager. A unique name is used when file_name_no_ext is None.
         """
-        cache_dir = "cache"
-        if not os.path.exists(cache_dir):
-            os.makedirs(cache_dir)
-
+        cache_manager = get_cache_manager()
         if file_name_no_ext is None:
-            file_name_no_ext = "temp"
+            return cache_manager.temp_path("temp_", f".{file_extension}")
 
+        os.makedirs(cache_manager.cache_dir, exist_ok=True)
         file_name = f"{file_name_no_ext}.{file_extension}"
-        return os.path.join(cache_dir, file_name)
+        file_path = os.path.join(cache_manager.cache_dir, file_name)
+        cache_manager.track(file_path)
+        return file_path
@@ -0,0 +1,279 @@
+import os
+import time
+import uuid
+import weakref
+import threading
+import multiprocessing
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Tuple
+from loguru import logger
+
+from .tts_interface import TTSInterface, GeneratedAudio, run_in_thread
+
+# Local engines whose synthesis is CPU-bound and serialized by the GIL or by
+# their own locks, so that they gain from running in several processes
+PROCESS_POOL_ENGINES = {
+    "sherpa_onnx_tts",
+    "melo_tts",
+    "coqui_tts",
+    "bark_tts",
+    "pyttsx3_tts",
+}
+
+# How often a waiting request checks that its worker is still alive
+_POLL_INTERVAL = 0.5
+# How long a starting worker may take to load the engine, in seconds
+_LOAD_TIMEOUT = 600
+
+
+def _worker_main(conn: Connection, tts_model: str, engine_config: dict) -> None:
+    """Entry point of a worker process: load the engine once, then serve
+    requests until told to stop.
+
+    Messages sent back are ("ready", None), ("error", message), or
+    ("ok", (shared_memory_name, size, extension)) for a synthesized text.
+    """
+    from .tts_factory import TTSFactory
+
+    try:
+        engine = TTSFactory.get_tts_engine(tts_model, **engine_config)
+    except Exception as e:
+        conn.send(("error", f"Failed to load {tts_model}: {e}"))
+        return
+    conn.send(("ready", None))
+
+    while True:
+        try:
+            text = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if text is None:
+            return
+
+        try:
+            file_path = engine.generate_audio(
+                text, file_name_no_ext=f"worker_{os.getpid()}_{uuid.uuid4().hex}"
+            )
+            if not file_path or not os.path.exists(file_path):
+                conn.send(("error", "The engine generated no audio"))
+                continue
+            try:
+                with open(file_path, "rb") as f:
+                    data = f.read()
+            finally:
+                os.remove(file_path)
+
+            # The parent copies the audio out of the block, then unlinks it.
+            # The block belongs to the parent from now on, so it is removed from
+            # the tracker of this process (which would unlink it on exit).
+            shm = SharedMemory(create=True, size=max(len(data), 1))
+            resource_tracker.unregister(shm._name, "shared_memory")
+            shm.buf[: len(data)] = data
+            extension = os.path.splitext(file_path)[1].lstrip(".") or "wav"
+            conn.send(("ok", (shm.name, len(data), extension)))
+            shm.close()
+        except Exception as e:
+            conn.send(("error", str(e)))
+
+
+class _TTSWorker:
+    """One worker process and its pipe. Requests to a worker are serialized
+    by the pool, which only hands out idle workers."""
+
+    def __init__(
+        self,
+        index: int,
+        tts_model: str,
+        engine_config: dict,
+        request_timeout: float = 60,
+    ):
+        self.index = index
+        self.tts_model = tts_model
+        self.engine_config = engine_config
+        self.request_timeout = request_timeout
+        self.restarts = 0
+        self._process: multiprocessing.Process | None = None
+        self._conn: Connection | None = None
+        self._ready = False
+
+    def start(self) -> None:
+        context = multiprocessing.get_context("spawn")
+        parent_conn, child_conn = context.Pipe()
+        self._process = context.Process(
+            target=_worker_main,
+            args=(child_conn, self.tts_model, self.engine_config),
+            name=f"tts-worker-{self.tts_model}-{self.index}",
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+        self._ready = False
+
+    def restart(self) -> None:
+        self.stop()
+        self.restarts += 1
+        logger.warning(
+            f"Restarting TTS worker {self.index} of {self.tts_model} "
+            f"(restart #{self.restarts})"
+        )
+        self.start()
+
+    def kill(self) -> None:
+        """Stop a worker that does not answer"""
+        if self._process is not None:
+            self._process.kill()
+        self.stop()
+
+    def stop(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.send(None)
+            except Exception:
+                pass
+            self._conn.close()
+            self._conn = None
+        if self._process is not None:
+            self._process.join(timeout=2)
+            if self._process.is_alive():
+                self._process.kill()
+            self._process = None
+
+    def _recv(self, timeout: float):
+        """Wait for the next message, restarting the worker if it died or did
+        not answer within `timeout` seconds"""
+        deadline = time.monotonic() + timeout
+        while not self._conn.poll(_POLL_INTERVAL):
+            if not self._process.is_alive():
+                exit_code = self._process.exitcode
+                self.restart()
+                raise RuntimeError(
+                    f"TTS worker {self.index} exited with code {exit_code}"
+                )
+            if time.monotonic() > deadline:
+                self.kill()
+                self.restart()
+                raise TimeoutError(
+                    f"TTS worker {self.index} did not answer within {timeout:g} s"
+                )
+        try:
+            return self._conn.recv()
+        except EOFError:
+            self.restart()
+            raise RuntimeError(f"TTS worker {self.index} closed its pipe")
+
+    def synthesize(self, text: str) -> Tuple[bytes, str]:
+        """Synthesize text in the worker (blocking).
+
+        Returns:
+            (audio bytes, file extension)
+        """
+        if self._process is None or not self._process.is_alive():
+            self.restart()
+        if not self._ready:
+            status, message = self._recv(_LOAD_TIMEOUT)
+            if status != "ready":
+                # The worker could not load the engine and has exited
+                self.stop()
+                raise RuntimeError(message)
+            self._ready = True
+
+        self._conn.send(text)
+        status, result = self._recv(self.request_timeout)
+        if status != "ok":
+            raise RuntimeError(result)
+
+        shm_name, size, extension = result
+        shm = SharedMemory(name=shm_name)
+        try:
+            return bytes(shm.buf[:size]), extension
+        finally:
+            shm.close()
+            shm.unlink()
+
+
+class ProcessPoolTTSEngine(TTSInterface):
+    """Runs a local TTS engine in `num_workers` processes, each loading the
+    engine once, so that sentences are synthesized in parallel on several
+    cores instead of one at a time behind the GIL.
+
+    Audio is sent back through shared memory. A worker that crashes, or
+    takes longer than `request_timeout` seconds for a sentence, is
+    restarted; the request it was serving fails.
+    """
+
+    def __init__(
+        self,
+        tts_model: str,
+        engine_config: dict,
+        num_workers: int,
+        request_timeout: float = 60,
+    ):
+        self.tts_model = tts_model
+        self.workers: List[_TTSWorker] = [
+            _TTSWorker(index, tts_model, engine_config, request_timeout)
+            for index in range(max(1, num_workers))
+        ]
+        for worker in self.workers:
+            worker.start()
+        logger.info(f"Started {len(self.workers)} TTS worker processes for {tts_model}")
+
+        # Idle workers, shared by threads (sync calls) and coroutines
+        self._idle: List[_TTSWorker] = list(self.workers)
+        self._idle_condition = threading.Condition()
+        weakref.finalize(self, ProcessPoolTTSEngine._stop_workers, self.workers)
+
+    def _synthesize(self, text: str) -> GeneratedAudio:
+        with self._idle_condition:
+            while not self._idle:
+                self._idle_condition.wait()
+            worker = self._idle.pop()
+        try:
+            data, extension = worker.synthesize(text)
+        finally:
+            with self._idle_condition:
+                self._idle.append(worker)
+                self._idle_condition.notify()
+        return GeneratedAudio.from_bytes(data, extension)
+
+    def generate_audio(self, text, file_name_no_ext=None):
+        try:
+            audio = self._synthesize(text)
+        except Exception as e:
+            logger.error(f"TTS worker failed to generate audio: {e}")
+            return None
+
+        file_name = self.generate_cache_file_name(file_name_no_ext, audio.format)
+        with open(file_name, "wb") as f:
+            f.write(audio.data)
+        return file_name
+
+    async def async_generate_audio_bytes(self, text: str) -> GeneratedAudio | None:
+        """Synthesize in a worker process; only waiting happens in a thread.
+        When cancelled, the worker is waited for rather than killed, which
+        would cost a reload of the engine."""
+        try:
+            return await run_in_thread(self._synthesize, text)
+        except Exception as e:
+            logger.error(f"TTS worker failed to generate audio: {e}")
+            return None
+
+    @staticmethod
+    def _stop_workers(workers: List[_TTSWorker]) -> None:
+        """Stop the workers of a pool no longer referenced by any client.
+
+        Called when the pool is garbage collected, which may happen on the
+        event loop: workers are joined in a thread instead.
+        """
+
+        def stop() -> None:
+            for worker in workers:
+                worker.stop()
+
+        try:
+            threading.Thread(target=stop, name="tts-pool-stop", daemon=True).start()
+        except RuntimeError:
+            # No new threads at interpreter shutdown
+            stop()
@@ -0,0 +1,198 @@
+import time
+import asyncio
+import weakref
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque
+from loguru import logger
+
+
+@dataclass(eq=False)
+class _Waiter:
+    client_uid: str
+    future: asyncio.Future
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+class TTSScheduler:
+    """Limits how many syntheses run at once on one TTS engine (no limit if
+    `max_concurrency` is 0).
+
+    Waiting requests are served in this order:
+    - requests marked `priority` (the first sentence of a turn), first come
+      first served, so the first audio of a client does not wait behind the
+      rest of the answers of other clients;
+    - then the other requests, round-robin across clients, so a client with
+      a long answer does not starve the others.
+    """
+
+    def __init__(self, max_concurrency: int = 2, first_sentence_priority: bool = True):
+        self.max_concurrency = max(0, max_concurrency)
+        self.first_sentence_priority = first_sentence_priority
+
+        self._active = 0
+        self._priority: Deque[_Waiter] = deque()
+        # Waiters of each client; the client served next comes first
+        self._queues: OrderedDict[str, Deque[_Waiter]] = OrderedDict()
+
+        self.scheduled = 0
+        self.max_queue_depth = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        # Syntheses cancelled by interrupts, while running or still queued
+        self.interrupted = 0
+        self.interrupted_queued = 0
+        self._wasted_after_interrupt = 0.0
+
+    @asynccontextmanager
+    async def slot(
+        self, client_uid: str, priority: bool = False
+    ) -> AsyncIterator[None]:
+        """Wait for a synthesis slot and hold it for the body of the block"""
+        await self._acquire(client_uid, priority and self.first_sentence_priority)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, client_uid: str, priority: bool) -> None:
+        if self._has_free_slot() and self.queue_depth == 0:
+            self._active += 1
+            self._record_wait(0.0)
+            return
+
+        waiter = _Waiter(client_uid, asyncio.get_running_loop().create_future())
+        if priority:
+            self._priority.append(waiter)
+        else:
+            self._queues.setdefault(client_uid, deque()).append(waiter)
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # The slot was granted just before the cancellation: pass it on
+                self._release()
+            else:
+                self._remove(waiter)
+                self.interrupted_queued += 1
+            raise
+        self._record_wait(time.monotonic() - waiter.queued_at)
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        """Grant free slots to the next waiters"""
+        while self._has_free_slot():
+            waiter = self._pop_next()
+            if waiter is None:
+                return
+            if waiter.future.done():
+                continue
+            self._active += 1
+            waiter.future.set_result(None)
+
+    def _has_free_slot(self) -> bool:
+        return not self.max_concurrency or self._active < self.max_concurrency
+
+    def _pop_next(self) -> _Waiter | None:
+        if self._priority:
+            return self._priority.popleft()
+        if not self._queues:
+            return None
+        client_uid, queue = next(iter(self._queues.items()))
+        waiter = queue.popleft()
+        if queue:
+            # Round-robin: the client goes back to the end of the line
+            self._queues.move_to_end(client_uid)
+        else:
+            del self._queues[client_uid]
+        return waiter
+
+    def _remove(self, waiter: _Waiter) -> None:
+        if waiter in self._priority:
+            self._priority.remove(waiter)
+            return
+        queue = self._queues.get(waiter.client_uid)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del self._queues[waiter.client_uid]
+
+    def record_interrupted(self, wasted_seconds: float) -> None:
+        """Record a running synthesis cancelled by an interrupt, and how long
+        it kept the engine busy after the interrupt"""
+        self.interrupted += 1
+        self._wasted_after_interrupt += max(0.0, wasted_seconds)
+
+    def _record_wait(self, wait: float) -> None:
+        self.scheduled += 1
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._priority) + sum(len(queue) for queue in self._queues.values())
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self._active,
+            "queued": self.queue_depth,
+            "queued_priority": len(self._priority),
+            "clients_waiting": len(self._queues),
+            "max_queue_depth": self.max_queue_depth,
+            "scheduled": self.scheduled,
+            "avg_wait_ms": (
+                self._total_wait / self.scheduled * 1000 if self.scheduled else 0.0
+            ),
+            "max_wait_ms": self._max_wait * 1000,
+            "interrupted": self.interrupted,
+            "interrupted_queued": self.interrupted_queued,
+            "synthesis_seconds_wasted_after_interrupt": self._wasted_after_interrupt,
+        }
+
+
+# One scheduler per engine instance, shared by every client using the engine
+_schedulers: "weakref.WeakKeyDictionary[object, TTSScheduler]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _engine_name(tts_engine) -> str:
+    # Engine classes are all named TTSEngine: use their module (e.g. edge_tts),
+    # looking through wrappers such as CachedTTSEngine
+    engine = getattr(tts_engine, "tts_engine", tts_engine)
+    return type(engine).__module__.rsplit(".", 1)[-1]
+
+
+def get_tts_scheduler(
+    tts_engine,
+    max_concurrency: int | None = None,
+    first_sentence_priority: bool | None = None,
+) -> TTSScheduler:
+    """Get the scheduler of a TTS engine, creating it if needed. Settings given
+    here are applied to the scheduler."""
+    scheduler = _schedulers.get(tts_engine)
+    if scheduler is None:
+        scheduler = TTSScheduler()
+        _schedulers[tts_engine] = scheduler
+        logger.debug(f"Created TTS scheduler for {_engine_name(tts_engine)}")
+    if max_concurrency is not None:
+        scheduler.max_concurrency = max(0, max_concurrency)
+        scheduler._wake()
+    if first_sentence_priority is not None:
+        scheduler.first_sentence_priority = first_sentence_priority
+    return scheduler
+
+
+def get_tts_scheduler_stats() -> list:
+    """Queue metrics of every TTS engine in use"""
+    return [
+        {"engine": _engine_name(engine), **scheduler.stats()}
+        for engine, scheduler in list(_schedulers.items())
+    ]
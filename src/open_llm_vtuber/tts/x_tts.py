@@ -1,6 +1,9 @@
+import asyncio
+from pathlib import Path
 import requests
 from loguru import logger
-from .tts_interface import TTSInterface
+from .tts_interface import TTSInterface, GeneratedAudio
+from ..utils.http_client import http_request
 
 
 class TTSEngine(TTSInterface):
@@ -16,28 +19,70 @@ class TTSEngine(TTSInterface):
         self.new_audio_dir = "cache"
         self.file_extension = "wav"
 
-    def generate_audio(self, text, file_name_no_ext=None):
-        file_name = self.generate_cache_file_name(file_name_no_ext, self.file_extension)
-
-        # Prepare the data for the POST request
-        data = {
+    def _request_data(self, text: str) -> dict:
+        return {
             "text": text,
             "speaker_wav": self.speaker_wav,
             "language": self.language,
         }
 
+    def _request_audio(self, text: str) -> bytes | None:
+        """Request the audio from the XTTS API server"""
         # Send POST request to the TTS API
-        response = requests.post(self.api_url, json=data, timeout=120)
+        response = requests.post(
+            self.api_url, json=self._request_data(text), timeout=120
+        )
+        return self._response_audio(response.status_code, response.content)
 
+    async def _async_request_audio(self, text: str) -> bytes | None:
+        """Request the audio with the shared HTTP client, reusing connections"""
+        response = await http_request(
+            "POST", self.api_url, json=self._request_data(text), timeout=120
+        )
+        return self._response_audio(response.status_code, response.content)
+
+    @staticmethod
+    def _response_audio(status_code: int, content: bytes) -> bytes | None:
         # Check if the request was successful
-        if response.status_code == 200:
-            # Save the audio content to a file
-            with open(file_name, "wb") as audio_file:
-                audio_file.write(response.content)
-            return file_name
-        else:
-            # Handle errors or unsuccessful requests
-            logger.critical(
-                f"Error: Failed to generate audio. Status code: {response.status_code}"
-            )
+        if status_code == 200:
+            return content
+        # Handle errors or unsuccessful requests
+        logger.critical(f"Error: Failed to generate audio. Status code: {status_code}")
+        return None
+
+    def generate_audio(self, text, file_name_no_ext=None):
+        file_name = self.generate_cache_file_name(file_name_no_ext, self.file_extension)
+
+        audio_data = self._request_audio(text)
+        if audio_data is None:
+            return None
+
+        # Save the audio content to a file
+        with open(file_name, "wb") as audio_file:
+            audio_file.write(audio_data)
+        return file_name
+
+    async def async_generate_audio(self, text, file_name_no_ext=None):
+        file_name = self.generate_cache_file_name(file_name_no_ext, self.file_extension)
+
+        try:
+            audio_data = await self._async_request_audio(text)
+        except Exception as e:
+            logger.critical(f"Error: Failed to generate audio: {e}")
+            return None
+        if audio_data is None:
+            return None
+
+        await asyncio.to_thread(Path(file_name).write_bytes, audio_data)
+        return file_name
+
+    async def async_generate_audio_bytes(self, text: str) -> GeneratedAudio | None:
+        """Return the audio from the API server without writing a cache file"""
+        try:
+            audio_data = await self._async_request_audio(text)
+        except Exception as e:
+            logger.critical(f"Error: Failed to generate audio: {e}")
+            return None
+        if audio_data is None:
             return None
+        return GeneratedAudio.from_bytes(audio_data, self.file_extension)
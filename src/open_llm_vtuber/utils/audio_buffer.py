@@ -0,0 +1,77 @@
+"""
+Audio of the utterance a client is speaking, received chunk by chunk.
+"""
+
+import numpy as np
+from loguru import logger
+
+
+class AudioBuffer:
+    """Growable float32 buffer of mono samples.
+
+    Capacity doubles when full, so appending a chunk copies only the chunk
+    (amortized), where np.append copied the whole utterance every time.
+    Samples beyond `max_seconds` are dropped.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        max_seconds: float | None = None,
+        initial_seconds: float = 4.0,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.max_samples = int(max_seconds * sample_rate) if max_seconds else None
+        self._initial_capacity = max(1, int(initial_seconds * sample_rate))
+        self._data = np.empty(self._initial_capacity, dtype=np.float32)
+        self._length = 0
+        self._truncated = False
+
+    def __len__(self) -> int:
+        return self._length
+
+    def append(self, samples: np.ndarray) -> None:
+        """Add samples at the end, converted to float32"""
+        samples = np.asarray(samples, dtype=np.float32).ravel()
+        if self.max_samples is not None:
+            room = self.max_samples - self._length
+            if len(samples) > room:
+                if not self._truncated:
+                    logger.warning(
+                        f"Utterance longer than {self.max_samples / self.sample_rate:g} "
+                        f"seconds: dropping the rest of the audio"
+                    )
+                    self._truncated = True
+                samples = samples[: max(0, room)]
+        if len(samples) == 0:
+            return
+
+        end = self._length + len(samples)
+        if end > len(self._data):
+            capacity = max(end, 2 * len(self._data))
+            if self.max_samples is not None:
+                capacity = min(capacity, self.max_samples)
+            data = np.empty(capacity, dtype=np.float32)
+            data[: self._length] = self._data[: self._length]
+            self._data = data
+        self._data[self._length : end] = samples
+        self._length = end
+
+    def view(self) -> np.ndarray:
+        """Get the samples without copying them. The view is only valid until
+        the next append or clear."""
+        return self._data[: self._length]
+
+    def take(self) -> np.ndarray:
+        """Get the samples without copying them and start a new utterance.
+        The returned array is not reused by the buffer."""
+        samples = self.view()
+        self._data = np.empty(self._initial_capacity, dtype=np.float32)
+        self._length = 0
+        self._truncated = False
+        return samples
+
+    def clear(self) -> None:
+        """Forget the samples, keeping the memory for the next utterance"""
+        self._length = 0
+        self._truncated = False
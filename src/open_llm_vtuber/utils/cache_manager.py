@@ -0,0 +1,241 @@
+"""
+Lifecycle of the temporary files written to the cache directory (synthesized
+audio, Hume AI audio, ASR and lip sync input...): unique paths, ownership by
+session, a disk quota and a background sweep of orphans.
+"""
+
+import os
+import time
+import uuid
+import asyncio
+import threading
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from loguru import logger
+
+from ..config_manager import CacheDirConfig
+
+CACHE_DIR = "cache"
+
+# Files younger than this are never removed by the sweep: they may still be
+# written, or about to be sent
+_GRACE_SECONDS = 60
+
+# Session that owns the files created by the current task, and by the tasks and
+# threads it starts
+_current_owner: ContextVar[str | None] = ContextVar("cache_owner", default=None)
+
+
+def set_cache_owner(owner: str | None) -> None:
+    """Make the files created from now on in the current task belong to a
+    session (e.g. a client uid), to be removed when it ends"""
+    _current_owner.set(owner)
+
+
+@dataclass
+class _TrackedFile:
+    owner: str | None
+    created: float = field(default_factory=time.time)
+
+
+class CacheManager:
+    """Keeps the cache directory bounded.
+
+    Files handed out by `temp_path` (or registered with `track`) belong to
+    the session of the task that created them until `release`d, or until
+    `release_owner` is called when the session ends. The sweep removes
+    other files (orphans, e.g. left by a crash) once older than
+    `orphan_ttl_seconds`, then the least recently modified files until the
+    directory is under `max_size_mb`.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, config: CacheDirConfig = None):
+        self.cache_dir = os.path.normpath(cache_dir)
+        self.configure(config or CacheDirConfig())
+
+        self.swept = 0
+        self.evicted = 0
+        self.released = 0
+        self._usage: Tuple[int, int] = (0, 0)
+        self._last_sweep: float | None = None
+
+        self._lock = threading.Lock()
+        self._tracked: Dict[str, _TrackedFile] = {}
+        self._sweeper: asyncio.Task | None = None
+
+    def configure(self, config: CacheDirConfig) -> None:
+        self.max_size_bytes = int(config.max_size_mb * 1024 * 1024)
+        self.orphan_ttl_seconds = config.orphan_ttl_seconds
+        self.sweep_interval_seconds = config.sweep_interval_seconds
+
+    def temp_path(
+        self, prefix: str = "tmp_", suffix: str = ".wav", owner: str | None = None
+    ) -> str:
+        """Get a unique path in the cache directory, owned by `owner` (the
+        session of the current task by default)"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, f"{prefix}{uuid.uuid4().hex}{suffix}")
+        self.track(path, owner)
+        return path
+
+    def track(self, path: str, owner: str | None = None) -> None:
+        """Register a file of the cache directory created by a component"""
+        if owner is None:
+            owner = _current_owner.get()
+        with self._lock:
+            self._tracked[os.path.normpath(path)] = _TrackedFile(owner)
+
+    def untrack(self, path: str) -> None:
+        """Forget a file that was removed"""
+        with self._lock:
+            self._tracked.pop(os.path.normpath(path), None)
+
+    def release(self, path: str) -> None:
+        """Remove a file that is no longer needed"""
+        self.untrack(path)
+        if self._remove_path(path):
+            self.released += 1
+
+    def release_owner(self, owner: str) -> None:
+        """Remove the files of a session that ended"""
+        with self._lock:
+            paths = [
+                path
+                for path, tracked in self._tracked.items()
+                if tracked.owner == owner
+            ]
+        for path in paths:
+            self.release(path)
+        if paths:
+            logger.debug(f"Removed {len(paths)} cache files of {owner}")
+
+    def sweep(self) -> None:
+        """Remove old orphans, then evict files until the directory fits the
+        quota (blocking)"""
+        now = time.time()
+        files: List[Tuple[float, int, str]] = []
+        if os.path.isdir(self.cache_dir):
+            for entry in os.scandir(self.cache_dir):
+                try:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        files.append((stat.st_mtime, stat.st_size, entry.path))
+                except FileNotFoundError:
+                    continue
+
+        existing = {os.path.normpath(path) for _, _, path in files}
+        with self._lock:
+            # Forget files removed without release (or never written)
+            for path, tracked in list(self._tracked.items()):
+                if path not in existing and now - tracked.created > max(
+                    self.orphan_ttl_seconds, _GRACE_SECONDS
+                ):
+                    del self._tracked[path]
+            tracked_paths = set(self._tracked)
+
+        kept = []
+        total_size = 0
+        for mtime, size, path in files:
+            age = now - mtime
+            if (
+                os.path.normpath(path) not in tracked_paths
+                and age > max(self.orphan_ttl_seconds, _GRACE_SECONDS)
+                and self._remove_path(path)
+            ):
+                self.swept += 1
+                continue
+            kept.append((mtime, size, path))
+            total_size += size
+
+        file_count = len(kept)
+        if total_size > self.max_size_bytes:
+            # Least recently modified first, owned or not
+            for mtime, size, path in sorted(kept):
+                if total_size <= self.max_size_bytes:
+                    break
+                if now - mtime < _GRACE_SECONDS:
+                    continue
+                self.untrack(path)
+                if self._remove_path(path):
+                    self.evicted += 1
+                    file_count -= 1
+                    total_size -= size
+
+        self._usage = (file_count, total_size)
+        self._last_sweep = now
+        if total_size > self.max_size_bytes:
+            logger.warning(
+                f"Cache directory is over its quota with recent files: "
+                f"{total_size / 1024 / 1024:.1f} MB"
+            )
+
+    def clear(self) -> None:
+        """Remove every file of the cache directory that no session owns"""
+        with self._lock:
+            tracked_paths = set(self._tracked)
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            return
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and os.path.normpath(entry.path) not in tracked_paths:
+                self._remove_path(entry.path)
+
+    async def start(self) -> None:
+        """Start the background sweeper"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._run_sweeper())
+
+    async def stop(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+    async def _run_sweeper(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                logger.error(f"Failed to sweep the cache directory: {e}")
+            await asyncio.sleep(self.sweep_interval_seconds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            tracked = len(self._tracked)
+            owners = len({t.owner for t in self._tracked.values() if t.owner})
+        files, size = self._usage
+        return {
+            "files": files,
+            "size_bytes": size,
+            "max_size_bytes": self.max_size_bytes,
+            "tracked": tracked,
+            "owners": owners,
+            "released": self.released,
+            "swept": self.swept,
+            "evicted": self.evicted,
+            "last_sweep": self._last_sweep,
+        }
+
+    @staticmethod
+    def _remove_path(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.error(f"Failed to remove cache file {path}: {e}")
+            return False
+
+
+_cache_manager = CacheManager()
+
+
+def get_cache_manager() -> CacheManager:
+    """Get the manager of the cache directory, shared by the whole server"""
+    return _cache_manager
+
+
+def configure_cache_manager(config: CacheDirConfig) -> None:
+    _cache_manager.configure(config)
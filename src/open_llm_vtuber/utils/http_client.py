@@ -0,0 +1,90 @@
+"""
+One httpx.AsyncClient shared by the engines that call HTTP APIs for every
+sentence (remote TTS, translation), so that connections are kept alive and
+reused instead of paying a TCP (and TLS) handshake per sentence.
+"""
+
+import asyncio
+import importlib.util
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+from urllib.parse import urlsplit
+
+import httpx
+from loguru import logger
+
+from ..config_manager import HTTPClientConfig
+
+_config = HTTPClientConfig()
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+# Requests in progress per host, to bound the load put on a single server
+_host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def configure_http_client(config: HTTPClientConfig) -> None:
+    """Set the settings of the shared client. Applies to clients created
+    afterwards."""
+    global _config
+    _config = config
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared client of the running event loop, creating it if needed"""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is not None and not _client.is_closed and _client_loop is loop:
+        return _client
+
+    http2 = _config.http2 and importlib.util.find_spec("h2") is not None
+    if _config.http2 and not http2:
+        logger.info("h2 is not installed: the shared HTTP client uses HTTP/1.1")
+    _client = httpx.AsyncClient(
+        http2=http2,
+        timeout=httpx.Timeout(_config.timeout, connect=_config.connect_timeout),
+        limits=httpx.Limits(
+            max_connections=_config.max_connections,
+            max_keepalive_connections=_config.max_keepalive_connections,
+            keepalive_expiry=_config.keepalive_expiry,
+        ),
+    )
+    _client_loop = loop
+    _host_semaphores.clear()
+    return _client
+
+
+def _host_semaphore(url: str) -> asyncio.Semaphore:
+    host = urlsplit(url).netloc
+    semaphore = _host_semaphores.get(host)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(_config.max_connections_per_host)
+        _host_semaphores[host] = semaphore
+    return semaphore
+
+
+async def http_request(method: str, url: str, **kwargs) -> httpx.Response:
+    """Send a request with the shared client. Takes the arguments of
+    httpx.AsyncClient.request."""
+    client = get_http_client()
+    async with _host_semaphore(url):
+        return await client.request(method, url, **kwargs)
+
+
+@asynccontextmanager
+async def http_stream(method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+    """Send a request with the shared client and stream the response body
+    (see httpx.AsyncClient.stream)"""
+    client = get_http_client()
+    async with _host_semaphore(url):
+        async with client.stream(method, url, **kwargs) as response:
+            yield response
+
+
+async def close_http_client() -> None:
+    """Close the shared client and its connections (on shutdown)"""
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+    _host_semaphores.clear()
@@ -1,27 +1,191 @@
+import io
+import os
+import json
 import base64
+import subprocess
+from functools import lru_cache
+from math import ceil
+from typing import Awaitable, Callable, List, Optional, Sequence
+
+import numpy as np
+from loguru import logger
 from pydub import AudioSegment
-from pydub.utils import make_chunks
+from pydub.utils import which
 from ..agent.output_types import Actions
 from ..agent.output_types import DisplayText
+from ..tts.tts_interface import GeneratedAudio, detect_audio_format
+
+
+_SAMPLE_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+# Codecs audio payloads can be sent in, with the arguments used to encode them
+AUDIO_CODECS = {
+    "wav": {"format": "wav"},
+    "mp3": {"format": "mp3", "bitrate": "64k"},
+    "opus": {"format": "ogg", "codec": "libopus", "bitrate": "32k"},
+}
+# Container (as named by detect_audio_format) each codec is sent in
+_CODEC_CONTAINERS = {"wav": "wav", "mp3": "mp3", "opus": "ogg"}
+# ffmpeg encoder needed to encode each compressed codec
+_CODEC_ENCODERS = {"mp3": "libmp3lame", "opus": "libopus"}
+
+
+@lru_cache(maxsize=None)
+def get_encodable_codecs() -> tuple:
+    """Codecs this server can encode to: WAV, plus those ffmpeg has an
+    encoder for"""
+    codecs = ["wav"]
+    ffmpeg = which("ffmpeg")
+    if not ffmpeg:
+        return tuple(codecs)
+    try:
+        encoders = subprocess.run(
+            [ffmpeg, "-hide_banner", "-encoders"],
+            capture_output=True,
+            text=True,
+            timeout=10,
+        ).stdout
+    except Exception as e:
+        logger.warning(f"Failed to list ffmpeg encoders: {e}")
+        return tuple(codecs)
+    codecs += [
+        codec for codec, encoder in _CODEC_ENCODERS.items() if encoder in encoders
+    ]
+    return tuple(codecs)
+
+
+def negotiate_audio_codecs(client_codecs: Sequence[str] | None) -> List[str]:
+    """Filter the codecs a client can play (in its order of preference) down to
+    those the server knows. WAV is always accepted, as the last resort."""
+    codecs = [
+        codec
+        for codec in dict.fromkeys(str(c).lower() for c in client_codecs or [])
+        if codec in AUDIO_CODECS
+    ]
+    if "wav" not in codecs:
+        codecs.append("wav")
+    return codecs
 
 
-def _get_volume_by_chunks(audio: AudioSegment, chunk_length_ms: int) -> list:
+def _choose_codec(source_format: str | None, codecs: Sequence[str]) -> str:
+    """Pick the codec to send audio in: the source's own compressed codec if
+    the client plays it (no transcoding), else the client's preferred codec
+    that can be encoded here"""
+    for codec in codecs:
+        if codec != "wav" and _CODEC_CONTAINERS.get(codec) == source_format:
+            return codec
+    encodable = get_encodable_codecs()
+    for codec in codecs:
+        if codec in encodable:
+            return codec
+    return "wav"
+
+
+def _get_volume_by_chunks(
+    audio: AudioSegment, chunk_length_ms: int, allow_silence: bool = False
+) -> list:
     """
     Calculate the normalized volume (RMS) for each chunk of the audio.
 
+    The chunks and RMS values are the same as with pydub's make_chunks and
+    AudioSegment.rms, but computed in one NumPy pass over the samples.
+
     Parameters:
         audio (AudioSegment): The audio segment to process.
         chunk_length_ms (int): The length of each audio chunk in milliseconds.
+        allow_silence (bool): Return zeros for silent audio instead of raising.
 
     Returns:
         list: Normalized volumes for each chunk.
     """
-    chunks = make_chunks(audio, chunk_length_ms)
-    volumes = [chunk.rms for chunk in chunks]
-    max_volume = max(volumes)
+    dtype = _SAMPLE_DTYPES.get(audio.sample_width)
+    if dtype is not None:
+        samples = np.frombuffer(audio.raw_data, dtype=dtype)
+    else:
+        samples = np.array(audio.get_array_of_samples())
+    channels = audio.channels
+    frame_count = len(samples) // channels
+
+    # Chunk boundaries in frames, computed like AudioSegment slicing
+    duration_ms = len(audio)
+    num_chunks = ceil(duration_ms / chunk_length_ms)
+    if num_chunks == 0:
+        raise ValueError("Audio is empty or all zero.")
+    boundaries_ms = np.minimum(np.arange(num_chunks + 1) * chunk_length_ms, duration_ms)
+    boundaries = (boundaries_ms * (audio.frame_rate / 1000.0)).astype(np.int64)
+    # Chunks are zero-padded up to their expected length, like pydub does
+    sample_counts = np.diff(boundaries) * channels
+
+    # Sum of squares of the (interleaved) samples of each chunk
+    starts = np.minimum(boundaries[:-1], frame_count) * channels
+    ends = np.minimum(boundaries[1:], frame_count) * channels
+    power = samples[: ends[-1]].astype(np.float64) ** 2
+    sums = np.zeros(num_chunks)
+    nonempty = ends > starts
+    if nonempty.any():
+        sums[nonempty] = np.add.reduceat(power, starts[nonempty])
+
+    volumes = np.zeros(num_chunks)
+    counted = sample_counts > 0
+    # audioop.rms truncates to an integer
+    volumes[counted] = np.floor(np.sqrt(sums[counted] / sample_counts[counted]))
+    max_volume = volumes.max()
     if max_volume == 0:
+        if allow_silence:
+            return volumes.tolist()
         raise ValueError("Audio is empty or all zero.")
-    return [volume / max_volume for volume in volumes]
+    return (volumes / max_volume).tolist()
+
+
+def _load_generated_audio(
+    generated_audio: GeneratedAudio,
+) -> tuple[AudioSegment, bytes | None]:
+    """Decode audio generated in memory.
+
+    PCM WAV is parsed without ffmpeg and its bytes are returned to be sent
+    as-is; for other formats the WAV bytes are None.
+    """
+    data = generated_audio.data
+    audio_format = detect_audio_format(data, generated_audio.format)
+    if audio_format == "wav":
+        try:
+            return AudioSegment.from_file(io.BytesIO(data), format="wav"), data
+        except Exception:
+            # e.g. float WAV, which only ffmpeg can decode
+            pass
+    audio = AudioSegment.from_file(io.BytesIO(data), format=audio_format)
+    return audio, None
+
+
+def _is_passthrough(codec: str, source_data: bytes, source_format: str) -> bool:
+    """Whether the source bytes can be sent as they are in a compressed codec"""
+    if codec == "wav" or source_format != _CODEC_CONTAINERS[codec]:
+        return False
+    # Ogg can also hold Vorbis: only Opus streams are sent as opus
+    return codec != "opus" or b"OpusHead" in source_data[:64]
+
+
+def _encode_audio(
+    audio: AudioSegment,
+    codec: str,
+    source_data: bytes | None,
+    source_format: str,
+    wav_bytes: bytes | None,
+) -> tuple[bytes, str]:
+    """Get the audio bytes to send, and their codec. The source bytes are
+    reused when they already are in the codec; otherwise the decoded audio
+    is encoded, falling back to WAV if the encoder fails."""
+    if source_data is not None and _is_passthrough(codec, source_data, source_format):
+        return source_data, codec
+    if codec == "wav" and wav_bytes is not None:
+        return wav_bytes, codec
+    try:
+        return audio.export(**AUDIO_CODECS[codec]).read(), codec
+    except Exception as e:
+        if codec == "wav":
+            raise
+        logger.warning(f"Failed to encode audio to {codec}, sending WAV: {e}")
+        return wav_bytes or audio.export(format="wav").read(), "wav"
 
 
 def prepare_audio_payload(
@@ -30,16 +194,30 @@ def prepare_audio_payload(
     display_text: DisplayText = None,
     actions: Actions = None,
     forwarded: bool = False,
+    binary: bool = False,
+    generated_audio: GeneratedAudio | None = None,
+    allow_silence: bool = False,
+    codecs: Sequence[str] = ("wav",),
 ) -> dict[str, any]:
     """
     Prepares the audio payload for sending to a broadcast endpoint.
-    If audio_path is None, returns a payload with audio=None for silent display.
+    If neither audio_path nor generated_audio is given, returns a payload with
+    audio=None for silent display.
 
     Parameters:
         audio_path (str | None): The path to the audio file to be processed, or None for silent display
         chunk_length_ms (int): The length of each audio chunk in milliseconds
         display_text (DisplayText, optional): Text to be displayed with the audio
         actions (Actions, optional): Actions associated with the audio
+        binary (bool): Keep the audio bytes as-is in "audio" instead of base64
+            encoding them, for clients that receive audio in binary frames
+            (see send_audio_payload)
+        generated_audio (GeneratedAudio, optional): Audio generated in memory,
+            used instead of audio_path
+        allow_silence (bool): Accept all-zero audio (e.g. a pause in streamed
+            audio), with zero volumes, instead of raising
+        codecs (Sequence[str]): Codecs the client plays, preferred first (see
+            negotiate_audio_codecs). The codec used is named in "codec".
 
     Returns:
         dict: The audio payload to be sent
@@ -47,7 +225,7 @@ def prepare_audio_payload(
     if isinstance(display_text, DisplayText):
         display_text = display_text.to_dict()
 
-    if not audio_path:
+    if not audio_path and generated_audio is None:
         # Return payload for silent display
         return {
             "type": "audio",
@@ -60,18 +238,33 @@ def prepare_audio_payload(
         }
 
     try:
-        audio = AudioSegment.from_file(audio_path)
-        audio_bytes = audio.export(format="wav").read()
+        if generated_audio is None:
+            with open(audio_path, "rb") as f:
+                data = f.read()
+            extension = os.path.splitext(audio_path)[1].lstrip(".").lower()
+            generated_audio = GeneratedAudio(data, format=extension or "wav")
+        source_data = generated_audio.data
+        source_format = detect_audio_format(source_data, generated_audio.format)
+        audio, wav_bytes = _load_generated_audio(generated_audio)
+        audio_bytes, codec = _encode_audio(
+            audio,
+            _choose_codec(source_format, codecs),
+            source_data,
+            source_format,
+            wav_bytes,
+        )
     except Exception as e:
         raise ValueError(
-            f"Error loading or converting generated audio file to wav file '{audio_path}': {e}"
+            f"Error loading or converting audio '{audio_path or generated_audio.format}': {e}"
         )
-    audio_base64 = base64.b64encode(audio_bytes).decode("utf-8")
-    volumes = _get_volume_by_chunks(audio, chunk_length_ms)
+    volumes = _get_volume_by_chunks(audio, chunk_length_ms, allow_silence)
 
     payload = {
         "type": "audio",
-        "audio": audio_base64,
+        "audio": (
+            audio_bytes if binary else base64.b64encode(audio_bytes).decode("utf-8")
+        ),
+        "codec": codec,
         "volumes": volumes,
         "slice_length": chunk_length_ms,
         "display_text": display_text,
@@ -82,5 +275,49 @@ def prepare_audio_payload(
     return payload
 
 
+async def send_audio_payload(
+    payload: dict,
+    websocket_send: Callable[[str], Awaitable[None]],
+    websocket_send_bytes: Optional[Callable[[bytes], Awaitable[None]]] = None,
+    sequence: int | None = None,
+) -> None:
+    """
+    Send a payload from prepare_audio_payload.
+
+    Payloads prepared with binary=True are sent as a JSON header with
+    "audio_format": "binary" and the byte length of the audio, immediately
+    followed by a binary frame with the audio bytes (in the payload's
+    "codec"). Other payloads are sent as
+    a single JSON message.
+
+    Parameters:
+        payload (dict): The audio payload
+        websocket_send: Function sending a text frame
+        websocket_send_bytes: Function sending a binary frame
+        sequence (int, optional): Position of the payload in the response
+    """
+    audio = payload.get("audio")
+    if not isinstance(audio, bytes):
+        await websocket_send(json.dumps(payload))
+        return
+
+    if websocket_send_bytes is None:
+        # The client cannot receive binary frames: fall back to base64
+        payload = {**payload, "audio": base64.b64encode(audio).decode("utf-8")}
+        await websocket_send(json.dumps(payload))
+        return
+
+    header = {
+        **payload,
+        "audio": None,
+        "audio_format": "binary",
+        "audio_length": len(audio),
+    }
+    if sequence is not None:
+        header["sequence"] = sequence
+    await websocket_send(json.dumps(header))
+    await websocket_send_bytes(audio)
+
+
 # Example usage:
 # payload, duration = prepare_audio_payload("path/to/audio.mp3", display_text="Hello", expression_list=[0,1,2])
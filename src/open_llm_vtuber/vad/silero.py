@@ -1,6 +1,9 @@
 import asyncio
+import threading
 from collections import deque
+from dataclasses import dataclass
 from enum import Enum
+from typing import List, Optional, Tuple
 
 import numpy as np
 import torch
@@ -21,6 +24,212 @@ class SileroVADConfig(BaseModel):
     smoothing_window: int = 5
 
 
+class SileroVADModel:
+    """The Silero VAD model, loaded once and shared by every session.
+
+    The model is recurrent: each window is evaluated from the state the
+    previous window of the same stream left. Windows of different streams
+    are independent, so they are evaluated together: one forward pass per
+    window index, with the states of the streams stacked along the batch
+    dimension. Calls are serialized, as the model holds the state while it
+    runs.
+    """
+
+    def __init__(self, sample_rate: int = 16000):
+        self.sample_rate = sample_rate
+        self.model = self.load_vad_model()
+        self._lock = threading.Lock()
+
+        self._queue: List[_Request] = []
+        self._queued = asyncio.Event()
+        self._worker: asyncio.Task | None = None
+        self._worker_loop: asyncio.AbstractEventLoop | None = None
+
+    def load_vad_model(self):
+        logger.info("Loading Silero-VAD model...")
+        return load_silero_vad()
+
+    def speech_probs(
+        self, requests: List[Tuple["RecurrentState", np.ndarray]]
+    ) -> List[np.ndarray]:
+        """Speech probabilities of the windows ([n, window size] float32) of
+        several streams, continuing from their states, which are updated"""
+        results = [np.zeros(len(windows), dtype=np.float32) for _, windows in requests]
+        # Longest first, so the streams still running are the first rows
+        order = sorted(
+            (i for i, (_, windows) in enumerate(requests) if len(windows)),
+            key=lambda i: -len(requests[i][1]),
+        )
+        if not order:
+            return results
+
+        with self._lock, torch.no_grad():
+            states = [requests[i][0] for i in order]
+            state, context = RecurrentState.stack(states, self.sample_rate)
+            rows = len(order)
+            for k in range(len(requests[order[0]][1])):
+                running = rows
+                while len(requests[order[running - 1]][1]) <= k:
+                    running -= 1
+                if running < rows:
+                    RecurrentState.unstack(
+                        states[running:rows], state, context, running
+                    )
+                    state, context = state[:, :running], context[:running]
+                    rows = running
+
+                x = torch.from_numpy(
+                    np.stack([requests[i][1][k] for i in order[:rows]])
+                )
+                self.model._state = state
+                self.model._context = context
+                self.model._last_sr = self.sample_rate
+                self.model._last_batch_size = rows
+                probs = self.model(x, self.sample_rate)
+                state, context = self.model._state, self.model._context
+
+                for i, prob in zip(order, probs.numpy().reshape(-1)):
+                    results[i][k] = prob
+            RecurrentState.unstack(states[:rows], state, context, 0)
+        return results
+
+    async def async_speech_probs(
+        self, recurrent_state: "RecurrentState", windows: np.ndarray
+    ) -> np.ndarray:
+        """Like speech_probs for one stream, in a thread, together with the
+        windows the other sessions submit meanwhile"""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker_loop is not loop:
+            self._queued = asyncio.Event()
+            self._worker = loop.create_task(self._run())
+            self._worker_loop = loop
+        request = _Request(recurrent_state, windows, loop.create_future())
+        self._queue.append(request)
+        self._queued.set()
+        return await request.future
+
+    async def _run(self) -> None:
+        while True:
+            if not self._queue:
+                self._queued.clear()
+                await self._queued.wait()
+
+            # While a batch runs, the chunks of the other clients queue up for
+            # the next one. A stream is only once in a batch: its windows
+            # depend on the state its previous ones leave.
+            batch, deferred, streams = [], [], set()
+            for request in self._queue:
+                if id(request.recurrent_state) in streams:
+                    deferred.append(request)
+                elif not request.future.done():
+                    streams.add(id(request.recurrent_state))
+                    batch.append(request)
+            self._queue = deferred
+            if not batch:
+                continue
+
+            try:
+                results = await asyncio.to_thread(
+                    self.speech_probs,
+                    [(request.recurrent_state, request.windows) for request in batch],
+                )
+            except Exception as e:
+                logger.error(f"VAD inference on {len(batch)} streams failed: {e}")
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                continue
+            for request, probs in zip(batch, results):
+                if not request.future.done():
+                    request.future.set_result(probs)
+
+
+@dataclass(eq=False)
+class RecurrentState:
+    """Recurrent state of the Silero model for one audio stream"""
+
+    state: Optional[torch.Tensor] = None
+    context: Optional[torch.Tensor] = None
+
+    @staticmethod
+    def stack(
+        states: List["RecurrentState"], sample_rate: int
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """State and context of a batch of streams, zeros for new streams"""
+        context_size = 64 if sample_rate == 16000 else 32
+        return (
+            torch.cat(
+                [
+                    s.state if s.state is not None else torch.zeros(2, 1, 128)
+                    for s in states
+                ],
+                dim=1,
+            ),
+            torch.cat(
+                [
+                    s.context if s.context is not None else torch.zeros(1, context_size)
+                    for s in states
+                ],
+                dim=0,
+            ),
+        )
+
+    @staticmethod
+    def unstack(
+        states: List["RecurrentState"],
+        state: torch.Tensor,
+        context: torch.Tensor,
+        offset: int,
+    ) -> None:
+        """Save rows offset.. of a batch state into the streams"""
+        for row, s in enumerate(states, start=offset):
+            s.state = state[:, row : row + 1]
+            s.context = context[row : row + 1]
+
+
+@dataclass(eq=False)
+class _Request:
+    recurrent_state: RecurrentState
+    windows: np.ndarray
+    future: asyncio.Future
+
+
+class VADSession(VADInterface):
+    """Speech detection in one audio stream (one client): the state machine,
+    with its smoothing windows and pre-buffer, and the recurrent state of
+    the shared model"""
+
+    def __init__(self, model: SileroVADModel, config: SileroVADConfig):
+        self.model = model
+        self.config = config
+        self.state = StateMachine(config)
+        self.recurrent_state = RecurrentState()
+        self.window_size_samples = 512 if config.target_sr == 16000 else 256
+        # 512 / 16000 = 0.032s
+
+    def create_session(self) -> "VADSession":
+        return VADSession(self.model, self.config)
+
+    def _windows(self, audio_data: list[float]) -> np.ndarray:
+        """The complete windows of a chunk, as rows (the rest is dropped)"""
+        audio_np = np.asarray(audio_data, dtype=np.float32)
+        count = len(audio_np) // self.window_size_samples
+        return audio_np[: count * self.window_size_samples].reshape(
+            count, self.window_size_samples
+        )
+
+    def detect_speech(self, audio_data: list[float]):
+        windows = self._windows(audio_data)
+        [probs] = self.model.speech_probs([(self.recurrent_state, windows)])
+        for _, _, chunk in self.state.get_result(probs, windows):
+            yield bytes(chunk)
+
+    async def async_detect_speech(self, audio_data: list[float]) -> List[bytes]:
+        windows = self._windows(audio_data)
+        probs = await self.model.async_speech_probs(self.recurrent_state, windows)
+        return [bytes(chunk) for _, _, chunk in self.state.get_result(probs, windows)]
+
+
 class VADEngine(VADInterface):
     def __init__(
         self,
@@ -41,38 +250,18 @@ class VADEngine(VADInterface):
             required_misses=required_misses,
             smoothing_window=smoothing_window,
         )
-        self.model = self.load_vad_model()
-        self.state = StateMachine(self.config)
-        self.window_size_samples = 512 if self.config.target_sr == 16000 else 256
-        # 512 / 16000 = 0.032s
+        self.model = SileroVADModel(target_sr)
+        # Session of the callers of detect_speech on the engine itself
+        self._session = VADSession(self.model, self.config)
 
-    def load_vad_model(self):
-        logger.info("Loading Silero-VAD model...")
-        return load_silero_vad()
+    def create_session(self) -> VADSession:
+        return VADSession(self.model, self.config)
 
     def detect_speech(self, audio_data: list[float]):
-        audio_np = np.array(audio_data, dtype=np.float32)
-        for i in range(0, len(audio_np), self.window_size_samples):
-            chunk_np = audio_np[i : i + self.window_size_samples]
-            if len(chunk_np) < self.window_size_samples:
-                break
-            chunk = torch.Tensor(chunk_np)
-
-            with torch.no_grad():
-                speech_prob = self.model(chunk, self.config.target_sr).item()
-
-            if speech_prob:
-                # print(speech_prob)
-                iter = self.state.get_result(speech_prob, chunk_np)
-
-                for probs, dbs, chunk in iter:  # detected a sequence of voice bytes
-                    # rounded_probs = [round(x, 2) for x in probs]
-                    # rounded_dbs = [round(y, 2) for y in dbs]
+        return self._session.detect_speech(audio_data)
 
-                    audio_chunk = bytes(chunk)
-                    yield audio_chunk
-
-        del audio_np
+    async def async_detect_speech(self, audio_data: list[float]) -> List[bytes]:
+        return await self._session.async_detect_speech(audio_data)
 
 
 # Define state enumeration
@@ -107,6 +296,13 @@ class StateMachine:
         rms = np.sqrt(np.mean(np.square(audio_data)))
         return 20 * np.log10(rms + 1e-7) if rms > 0 else -np.inf
 
+    @classmethod
+    def calculate_dbs(cls, audio_data: np.ndarray) -> np.ndarray:
+        """calculate_db of each row"""
+        rms = np.sqrt(np.mean(np.square(audio_data), axis=1))
+        with np.errstate(divide="ignore"):
+            return np.where(rms > 0, 20 * np.log10(rms + 1e-7), -np.inf)
+
     def update(self, chunk_bytes, prob, db):
         self.probs.append(prob)
         self.dbs.append(db)
@@ -120,15 +316,22 @@ class StateMachine:
     def get_smoothed_values(self, prob, db):
         self.prob_window.append(prob)
         self.db_window.append(db)
-        smoothed_prob = np.mean(self.prob_window)
-        smoothed_db = np.mean(self.db_window)
+        smoothed_prob = sum(self.prob_window) / len(self.prob_window)
+        smoothed_db = sum(self.db_window) / len(self.db_window)
         return smoothed_prob, smoothed_db
 
-    def process(self, prob, float_chunk_np: np.ndarray):
-        int_chunk_np = float_chunk_np * 32767
-        chunk_bytes = int_chunk_np.astype(np.int16).tobytes()
-        db = self.calculate_db(int_chunk_np)
+    def process(self, probs: np.ndarray, float_chunks_np: np.ndarray):
+        """Run the windows of a chunk ([n, window size]) with their speech
+        probabilities through the state machine"""
+        int_chunks_np = float_chunks_np * 32767
+        chunks_bytes = int_chunks_np.astype(np.int16)
+        dbs = self.calculate_dbs(int_chunks_np).tolist()
+
+        for prob, db, chunk_np in zip(probs.tolist(), dbs, chunks_bytes):
+            if prob:
+                yield from self._step(prob, db, chunk_np.tobytes())
 
+    def _step(self, prob: float, db: float, chunk_bytes: bytes):
         # 获取平滑后的 prob 和 db
         smoothed_prob, smoothed_db = self.get_smoothed_values(prob, db)
 
@@ -184,8 +387,8 @@ class StateMachine:
                         self.reset_buffers()
                     self.pre_buffer.clear()
 
-    def get_result(self, input_num, chunk_np):
-        yield from self.process(input_num, chunk_np)
+    def get_result(self, probs, chunks_np):
+        yield from self.process(probs, chunks_np)
 
 
 async def vad_main():
@@ -10,3 +10,22 @@ class VADInterface(ABC):
         :return: Returns a sequence of audio bytes containing human voice if voice activity is detected
         """
         pass
+
+    async def async_detect_speech(self, audio_data: bytes) -> list:
+        """
+        Asynchronous version of detect_speech. Engines can override it to
+        run the model off the event loop, together with other sessions.
+        :param audio_data: Input audio data
+        :return: The audio bytes detect_speech would yield
+        """
+        return list(self.detect_speech(audio_data))
+
+    @abstractmethod
+    def create_session(self) -> "VADInterface":
+        """
+        Create the detector of one more audio stream (one client), sharing the
+        model of this engine. Streams must not share a detector: it holds the
+        state of the stream.
+        :return: A detector with its own state
+        """
+        pass
@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional, Callable, TypedDict
+from typing import Dict, List, Optional, Callable, Tuple, TypedDict
 from fastapi import WebSocket, WebSocketDisconnect
 import asyncio
 import json
@@ -14,12 +14,20 @@ from .chat_group import (
     broadcast_to_group,
 )
 from .message_handler import message_handler
-from .utils.stream_audio import prepare_audio_payload
+from .utils.stream_audio import prepare_audio_payload, negotiate_audio_codecs
+from .utils.cache_manager import get_cache_manager
+from .utils.audio_buffer import AudioBuffer
+from .asr.asr_stream import ASRStream
+from .vad.vad_interface import VADInterface
 from .chat_history_manager import (
+    HistoryMessage,
     create_new_history,
     get_history,
+    get_metadata,
     delete_history,
     get_history_list,
+    search_history,
+    paginate_history,
 )
 from .config_manager.utils import scan_config_alts_directory, scan_bg_directory
 from .conversations.conversation_handler import (
@@ -36,12 +44,14 @@ class MessageType(Enum):
     HISTORY = [
         "fetch-history-list",
         "fetch-and-set-history",
+        "fetch-history-page",
         "create-new-history",
         "delete-history",
+        "search-history",
     ]
     CONVERSATION = ["mic-audio-end", "text-input", "ai-speak-signal"]
     CONFIG = ["fetch-configs", "switch-config"]
-    CONTROL = ["interrupt-signal", "audio-play-start"]
+    CONTROL = ["interrupt-signal", "audio-play-start", "audio-capabilities"]
     DATA = ["mic-audio-data"]
 
 
@@ -56,6 +66,12 @@ class WSMessage(TypedDict, total=False):
     history_uid: Optional[str]
     file: Optional[str]
     display_text: Optional[dict]
+    query: Optional[str]
+    limit: Optional[int]
+    cursor: Optional[int]
+    page_size: Optional[int]
+    binary: Optional[bool]
+    codecs: Optional[List[str]]
 
 
 class WebSocketHandler:
@@ -68,7 +84,14 @@ class WebSocketHandler:
         self.chat_group_manager = ChatGroupManager()
         self.current_conversation_tasks: Dict[str, Optional[asyncio.Task]] = {}
         self.default_context_cache = default_context_cache
-        self.received_data_buffers: Dict[str, np.ndarray] = {}
+        self.received_data_buffers: Dict[str, AudioBuffer] = {}
+        # Utterances being transcribed while the user speaks, by client_uid
+        self.asr_streams: Dict[str, ASRStream] = {}
+        # Speech detection state of each client; the VAD model is shared
+        self.vad_sessions: Dict[str, VADInterface] = {}
+        # client_uid -> (history_uid, displayed messages) of the last history
+        # read for the client, so older pages are served without re-reading
+        self.client_history_cache: Dict[str, Tuple[str, List[HistoryMessage]]] = {}
 
         # Message handlers mapping
         self._message_handlers = self._init_message_handlers()
@@ -81,8 +104,10 @@ class WebSocketHandler:
             "request-group-info": self._handle_group_info,
             "fetch-history-list": self._handle_history_list_request,
             "fetch-and-set-history": self._handle_fetch_history,
+            "fetch-history-page": self._handle_fetch_history_page,
             "create-new-history": self._handle_create_history,
             "delete-history": self._handle_delete_history,
+            "search-history": self._handle_search_history,
             "interrupt-signal": self._handle_interrupt,
             "mic-audio-data": self._handle_audio_data,
             "mic-audio-end": self._handle_conversation_trigger,
@@ -93,6 +118,7 @@ class WebSocketHandler:
             "switch-config": self._handle_config_switch,
             "fetch-backgrounds": self._handle_fetch_backgrounds,
             "audio-play-start": self._handle_audio_play_start,
+            "audio-capabilities": self._handle_audio_capabilities,
         }
 
     async def handle_new_connection(
@@ -137,7 +163,9 @@ class WebSocketHandler:
         """Store client data and initialize group status"""
         self.client_connections[client_uid] = websocket
         self.client_contexts[client_uid] = session_service_context
-        self.received_data_buffers[client_uid] = np.array([])
+        self.received_data_buffers[client_uid] = AudioBuffer(
+            max_seconds=session_service_context.system_config.max_utterance_seconds
+        )
 
         self.chat_group_manager.client_group_map[client_uid] = ""
         await self.send_group_update(websocket, client_uid)
@@ -188,6 +216,7 @@ class WebSocketHandler:
             vad_engine=self.default_context_cache.vad_engine,
             agent_engine=self.default_context_cache.agent_engine,
             translate_engine=self.default_context_cache.translate_engine,
+            phrase_bank=self.default_context_cache.phrase_bank,
         )
         return session_service_context
 
@@ -291,12 +320,18 @@ class WebSocketHandler:
         self.client_connections.pop(client_uid, None)
         self.client_contexts.pop(client_uid, None)
         self.received_data_buffers.pop(client_uid, None)
+        asr_stream = self.asr_streams.pop(client_uid, None)
+        if asr_stream is not None:
+            asr_stream.cancel()
+        self.vad_sessions.pop(client_uid, None)
+        self.client_history_cache.pop(client_uid, None)
         if client_uid in self.current_conversation_tasks:
             task = self.current_conversation_tasks[client_uid]
             if task and not task.done():
                 task.cancel()
             self.current_conversation_tasks.pop(client_uid, None)
 
+        get_cache_manager().release_owner(client_uid)
         logger.info(f"Client {client_uid} disconnected")
         message_handler.cleanup_client(client_uid)
 
@@ -366,37 +401,100 @@ class WebSocketHandler:
     ) -> None:
         """Handle request for chat history list"""
         context = self.client_contexts[client_uid]
-        histories = get_history_list(context.character_config.conf_uid)
+        histories = await asyncio.to_thread(
+            get_history_list, context.character_config.conf_uid
+        )
         await websocket.send_text(
             json.dumps({"type": "history-list", "histories": histories})
         )
 
+    async def _load_history(
+        self, client_uid: str, history_uid: str
+    ) -> List[HistoryMessage]:
+        """Read a history once, off the event loop, and cache the messages
+        shown to the client for later page requests"""
+        context = self.client_contexts[client_uid]
+        messages = await asyncio.to_thread(
+            get_history, context.character_config.conf_uid, history_uid
+        )
+        self.client_history_cache[client_uid] = (
+            history_uid,
+            [msg for msg in messages if msg["role"] != "system"],
+        )
+        return messages
+
     async def _handle_fetch_history(
-        self, websocket: WebSocket, client_uid: str, data: dict
+        self, websocket: WebSocket, client_uid: str, data: WSMessage
     ):
-        """Handle fetching and setting specific chat history"""
+        """Handle fetching and setting specific chat history
+
+        If "page_size" is given, only the latest page is sent, with a
+        "cursor" for fetching older messages with fetch-history-page.
+        """
         history_uid = data.get("history_uid")
         if not history_uid:
             return
 
         context = self.client_contexts[client_uid]
+        messages = await self._load_history(client_uid, history_uid)
+        metadata = await asyncio.to_thread(
+            get_metadata, context.character_config.conf_uid, history_uid
+        )
+
         # Update history_uid in service context
         context.history_uid = history_uid
         context.agent_engine.set_memory_from_history(
             conf_uid=context.character_config.conf_uid,
             history_uid=history_uid,
+            messages=messages,
+            metadata=metadata,
         )
 
-        messages = [
-            msg
-            for msg in get_history(
-                context.character_config.conf_uid,
-                history_uid,
+        displayed = self.client_history_cache[client_uid][1]
+        page_size = data.get("page_size")
+        if not page_size:
+            await websocket.send_text(
+                json.dumps({"type": "history-data", "messages": displayed})
             )
-            if msg["role"] != "system"
-        ]
+            return
+
         await websocket.send_text(
-            json.dumps({"type": "history-data", "messages": messages})
+            json.dumps(
+                {
+                    "type": "history-data",
+                    "history_uid": history_uid,
+                    **paginate_history(displayed, None, page_size),
+                }
+            )
+        )
+
+    async def _handle_fetch_history_page(
+        self, websocket: WebSocket, client_uid: str, data: WSMessage
+    ) -> None:
+        """Handle fetching one page of a chat history, going back from
+        "cursor" (the latest messages if absent)"""
+        context = self.client_contexts[client_uid]
+        history_uid = data.get("history_uid") or context.history_uid
+        if not history_uid:
+            return
+
+        cursor = data.get("cursor")
+        cached = self.client_history_cache.get(client_uid)
+        if cursor is not None and cached and cached[0] == history_uid:
+            # Older messages do not change, so the cached read is still valid
+            displayed = cached[1]
+        else:
+            await self._load_history(client_uid, history_uid)
+            displayed = self.client_history_cache[client_uid][1]
+
+        await websocket.send_text(
+            json.dumps(
+                {
+                    "type": "history-page",
+                    "history_uid": history_uid,
+                    **paginate_history(displayed, cursor, data.get("page_size") or 50),
+                }
+            )
         )
 
     async def _handle_create_history(
@@ -404,12 +502,20 @@ class WebSocketHandler:
     ) -> None:
         """Handle creation of new chat history"""
         context = self.client_contexts[client_uid]
-        history_uid = create_new_history(context.character_config.conf_uid)
+        history_uid = await asyncio.to_thread(
+            create_new_history, context.character_config.conf_uid
+        )
         if history_uid:
+            metadata = await asyncio.to_thread(
+                get_metadata, context.character_config.conf_uid, history_uid
+            )
             context.history_uid = history_uid
+            self.client_history_cache[client_uid] = (history_uid, [])
             context.agent_engine.set_memory_from_history(
                 conf_uid=context.character_config.conf_uid,
                 history_uid=history_uid,
+                messages=[],
+                metadata=metadata,
             )
             await websocket.send_text(
                 json.dumps(
@@ -429,7 +535,8 @@ class WebSocketHandler:
             return
 
         context = self.client_contexts[client_uid]
-        success = delete_history(
+        success = await asyncio.to_thread(
+            delete_history,
             context.character_config.conf_uid,
             history_uid,
         )
@@ -444,6 +551,34 @@ class WebSocketHandler:
         )
         if history_uid == context.history_uid:
             context.history_uid = None
+        cached = self.client_history_cache.get(client_uid)
+        if cached and cached[0] == history_uid:
+            self.client_history_cache.pop(client_uid, None)
+
+    async def _handle_search_history(
+        self, websocket: WebSocket, client_uid: str, data: WSMessage
+    ) -> None:
+        """Handle full-text search over the chat histories of the current character"""
+        query = data.get("query", "")
+        if not query:
+            return
+
+        context = self.client_contexts[client_uid]
+        results = await asyncio.to_thread(
+            search_history,
+            context.character_config.conf_uid,
+            query,
+            data.get("limit") or 20,
+        )
+        await websocket.send_text(
+            json.dumps(
+                {
+                    "type": "history-search-results",
+                    "query": query,
+                    "results": results,
+                }
+            )
+        )
 
     async def _handle_audio_data(
         self, websocket: WebSocket, client_uid: str, data: WSMessage
@@ -451,19 +586,42 @@ class WebSocketHandler:
         """Handle incoming audio data"""
         audio_data = data.get("audio", [])
         if audio_data:
-            self.received_data_buffers[client_uid] = np.append(
-                self.received_data_buffers[client_uid],
-                np.array(audio_data, dtype=np.float32),
-            )
+            audio = np.array(audio_data, dtype=np.float32)
+            self.received_data_buffers[client_uid].append(audio)
+            await self._feed_asr_stream(websocket, client_uid, audio)
+
+    async def _feed_asr_stream(
+        self, websocket: WebSocket, client_uid: str, audio: np.ndarray
+    ) -> None:
+        """Transcribe the utterance while the user speaks, if the ASR engine
+        can, and send the partial transcripts"""
+        asr_stream = self.asr_streams.get(client_uid)
+        if asr_stream is None:
+
+            async def send_partial(text: str) -> None:
+                await websocket.send_text(
+                    json.dumps({"type": "user-input-partial", "text": text})
+                )
+
+            context = self.client_contexts[client_uid]
+            asr_stream = context.asr_engine.create_stream(on_partial=send_partial)
+            if asr_stream is None:
+                return
+            self.asr_streams[client_uid] = asr_stream
+        await asr_stream.accept_audio(audio)
 
     async def _handle_raw_audio_data(
         self, websocket: WebSocket, client_uid: str, data: WSMessage
     ) -> None:
         """Handle incoming raw audio data for VAD processing"""
-        context = self.client_contexts[client_uid]
         chunk = data.get("audio", [])
         if chunk:
-            for audio_bytes in context.vad_engine.detect_speech(chunk):
+            vad = self.vad_sessions.get(client_uid)
+            if vad is None:
+                context = self.client_contexts[client_uid]
+                vad = context.vad_engine.create_session()
+                self.vad_sessions[client_uid] = vad
+            for audio_bytes in await vad.async_detect_speech(chunk):
                 if audio_bytes == b"<|PAUSE|>":
                     await websocket.send_text(
                         json.dumps({"type": "control", "text": "interrupt"})
@@ -472,9 +630,8 @@ class WebSocketHandler:
                     pass
                 elif len(audio_bytes) > 1024:
                     # Detected audio activity (voice)
-                    self.received_data_buffers[client_uid] = np.append(
-                        self.received_data_buffers[client_uid],
-                        np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32),
+                    self.received_data_buffers[client_uid].append(
+                        np.frombuffer(audio_bytes, dtype=np.int16)
                     )
                     await websocket.send_text(
                         json.dumps({"type": "control", "text": "mic-audio-end"})
@@ -494,6 +651,7 @@ class WebSocketHandler:
             client_connections=self.client_connections,
             chat_group_manager=self.chat_group_manager,
             received_data_buffers=self.received_data_buffers,
+            asr_streams=self.asr_streams,
             current_conversation_tasks=self.current_conversation_tasks,
             broadcast_to_group=self.broadcast_to_group,
         )
@@ -516,6 +674,11 @@ class WebSocketHandler:
         if config_file_name:
             context = self.client_contexts[client_uid]
             await context.handle_config_switch(websocket, config_file_name)
+            # The VAD and ASR engines may have changed
+            self.vad_sessions.pop(client_uid, None)
+            asr_stream = self.asr_streams.pop(client_uid, None)
+            if asr_stream is not None:
+                asr_stream.cancel()
 
     async def _handle_fetch_backgrounds(
         self, websocket: WebSocket, client_uid: str, data: WSMessage
@@ -546,6 +709,31 @@ class WebSocketHandler:
                     group_members, silent_payload, exclude_uid=client_uid
                 )
 
+    async def _handle_audio_capabilities(
+        self, websocket: WebSocket, client_uid: str, data: WSMessage
+    ) -> None:
+        """
+        Handle audio transport negotiation
+
+        With "binary": true, audio is sent as a JSON header followed by a
+        binary frame with the audio bytes instead of base64 inside the JSON.
+        "codecs" lists the codecs the client plays ("opus", "mp3", "wav"),
+        preferred first; each payload names the codec it is in. The ack
+        returns the codecs kept. Applies from the next conversation turn.
+        """
+        context = self.client_contexts[client_uid]
+        context.binary_audio = bool(data.get("binary"))
+        context.audio_codecs = negotiate_audio_codecs(data.get("codecs"))
+        await websocket.send_text(
+            json.dumps(
+                {
+                    "type": "audio-capabilities-ack",
+                    "binary": context.binary_audio,
+                    "codecs": context.audio_codecs,
+                }
+            )
+        )
+
     async def _handle_group_info(
         self, websocket: WebSocket, client_uid: str, data: WSMessage
     ) -> None: